@@ -1,824 +1,3807 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, url_for, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException, BadRequest, RequestEntityTooLarge, UnsupportedMediaType
+import click
+from collections import OrderedDict, deque
 import re
+import io
+import math
 import os
+import sys
+import json
+import time
+import codecs
+import hashlib
+import sqlite3
+import threading
+import functools
+import itertools
+import bisect
 import logging
+import zlib
+import gzip
+import mimetypes
+import queue
+import secrets
+import posixpath
+import html
+import uuid
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+try:
+    import brotli
+except ImportError:  # Optional, static assets are still served gzipped
+    brotli = None
+
+# Configure logging. DEBUG logs every converted input in full.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+logging.basicConfig(level=LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__, static_folder='static', static_url_path='/static')
+# Serverless platforms start a fresh process per cold start, where
+# forking workers costs more than it isolates
+SERVERLESS = bool(os.environ.get('VERCEL') or os.environ.get('AWS_LAMBDA_FUNCTION_NAME'))
+
+# Static files are served by serve_static below, not Flask's static route
+app = Flask(__name__, static_folder=None)
 CORS(app, resources={r"/*": {"origins": "*"}})
 
-# Enable debug logging
-logging.getLogger('werkzeug').setLevel(logging.DEBUG)
+# Largest request body accepted, in bytes
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
+
+@app.before_request
+def limit_request_size():
+    # Refuse oversized bodies up front, before any endpoint reads them
+    limit = app.config['MAX_CONTENT_LENGTH']
+    if request.content_length is not None and request.content_length > limit:
+        return jsonify({'error': f'Request body exceeds the limit of {limit} bytes'}), 413
+
+# Static assets
+#
+# Every file in static/ is read, content-hashed and precompressed on the
+# first request for one. References to /static/ files in HTML are
+# rewritten to hashed names, which never change content and are cached
+# for a year; the
+# unhashed names, index.html included, are revalidated by ETag.
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+STATIC_IMMUTABLE = 'public, max-age=31536000, immutable'
+STATIC_REVALIDATE = 'no-cache'
+STATIC_COMPRESSIBLE = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+STATIC_REFERENCE_PATTERN = re.compile(r'(["\'])/static/([^"\']+)\1')
+
+def compress_asset(data, mimetype):
+    """An asset's body in each content encoding worth serving"""
+    encodings = {'identity': data}
+    if mimetype.startswith(STATIC_COMPRESSIBLE):
+        encodings['gzip'] = gzip.compress(data, 9, mtime=0)
+        if brotli is not None:
+            encodings['br'] = brotli.compress(data)
+    return encodings
+
+def build_static_assets(directory=STATIC_DIR):
+    """Hashed and precompressed static files, by plain and hashed name"""
+    names = []
+    for folder, dirs, files in os.walk(directory):
+        names.extend(os.path.relpath(os.path.join(folder, name), directory).replace(os.sep, '/')
+                     for name in files)
+    assets = {}
+    hashed_names = {}
+    # HTML last, so its references can point at the hashed names
+    for name in sorted(names, key=lambda name: (name.endswith('.html'), name)):
+        with open(os.path.join(directory, name), 'rb') as asset_file:
+            data = asset_file.read()
+        if name.endswith('.html'):
+            data = STATIC_REFERENCE_PATTERN.sub(
+                lambda match: f'{match.group(1)}/static/{hashed_names.get(match.group(2), match.group(2))}'
+                              f'{match.group(1)}', data.decode('utf-8')).encode('utf-8')
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        base, extension = posixpath.splitext(name)
+        hashed_names[name] = f'{base}.{digest}{extension}'
+        asset = {'mimetype': mimetype, 'etag': digest, 'encodings': compress_asset(data, mimetype)}
+        assets[name] = dict(asset, cache_control=STATIC_REVALIDATE)
+        assets[hashed_names[name]] = dict(asset, cache_control=STATIC_IMMUTABLE)
+    logger.info(f'Prepared {len(names)} static assets')
+    return assets
+
+static_assets = None
+
+def get_static_assets():
+    """Static assets, built on first use so conversions never wait for them"""
+    global static_assets
+    if static_assets is None:
+        static_assets = build_static_assets()
+    return static_assets
+
+def preferred_encoding(available):
+    """The best of the available content encodings the client accepts"""
+    return next((encoding for encoding in ('br', 'gzip')
+                 if encoding in available and request.accept_encodings[encoding]), 'identity')
+
+def send_asset(asset):
+    """Serve an asset in the best encoding the client accepts"""
+    encoding = preferred_encoding(asset['encodings'])
+    etag = asset['etag'] if encoding == 'identity' else f"{asset['etag']}-{encoding}"
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(asset['encodings'][encoding], mimetype=asset['mimetype'])
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = asset['cache_control']
+    response.vary.add('Accept-Encoding')
+    return response
+
+# Response compression settings
+MIN_COMPRESSED_SIZE = 1024
+COMPRESSIBLE_MIMETYPES = frozenset({'application/json', 'text/html', 'text/plain'})
+RESPONSE_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+@app.after_request
+def compress_response(response):
+    """Compress buffered responses in an encoding the client accepts.
+
+    Streamed responses and static assets, which are precompressed, are
+    left alone. Strong ETags become weak, as the compressed body is no
+    longer byte-identical to what they name.
+    """
+    if (response.is_streamed or response.direct_passthrough or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = preferred_encoding(RESPONSE_ENCODINGS)
+    data = response.get_data()
+    if encoding == 'identity' or len(data) < MIN_COMPRESSED_SIZE:
+        return response
+    if encoding == 'br':
+        response.set_data(brotli.compress(data, quality=5))
+    else:
+        response.set_data(gzip.compress(data, 6))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
 
 @app.route('/')
 def index():
-    logger.info('Serving index.html')
-    return send_from_directory(app.static_folder, 'index.html')
+    logger.debug('Serving index.html')
+    return send_asset(get_static_assets()['index.html'])
 
 @app.route('/static/<path:filename>')
 def serve_static(filename):
-    logger.info(f'Serving static file: {filename}')
-    return send_from_directory(app.static_folder, filename)
+    logger.debug(f'Serving static file: {filename}')
+    asset = get_static_assets().get(filename)
+    if asset is None:
+        # Added since startup
+        return send_from_directory(STATIC_DIR, filename)
+    return send_asset(asset)
+
+CAMEL_WORD_PATTERN = re.compile('(.)([A-Z][a-z]+)')
+CAMEL_BOUNDARY_PATTERN = re.compile('([a-z0-9])([A-Z])')
 
 def camel_to_kebab(name):
     # Convert camelCase to kebab-case
-    name = re.sub('(.)([A-Z][a-z]+)', r'\1-\2', name)
-    return re.sub('([a-z0-9])([A-Z])', r'\1-\2', name).lower()
+    name = CAMEL_WORD_PATTERN.sub(r'\1-\2', name)
+    return CAMEL_BOUNDARY_PATTERN.sub(r'\1-\2', name).lower()
 
-def generate_placeholder_content(expr):
-    """Enhanced contextual placeholder generation with more patterns and variations"""
-    expr = expr.lower()
-    
+# Placeholder rules in priority order: a pattern found anywhere in the
+# lowercased expression, and its sample text or texts to choose from
+PLACEHOLDER_RULES = (
     # User-related patterns
-    user_patterns = {
-        'full_?name|display_?name': ['John Doe', 'Jane Smith', 'Michael Johnson'],
-        'first_?name': ['John', 'Jane', 'Michael', 'Sarah'],
-        'last_?name': ['Doe', 'Smith', 'Johnson', 'Williams'],
-        'username|user_id': ['johndoe', 'jsmith', 'mjohnson'],
-        'email': ['john.doe@example.com', 'jane.smith@example.com'],
-        'phone|tel|contact': ['+1 (555) 123-4567', '(555) 987-6543'],
-        'address': ['123 Main St, New York, NY 10001'],
-        'avatar|profile_?pic': ['avatar1.jpg', 'profile2.png'],
-        'bio|description': ['Product manager with 5+ years experience'],
-        'role|position': ['Senior Developer', 'Product Manager', 'Designer']
-    }
-    
+    ('full_?name|display_?name', ('John Doe', 'Jane Smith', 'Michael Johnson')),
+    ('first_?name', ('John', 'Jane', 'Michael', 'Sarah')),
+    ('last_?name', ('Doe', 'Smith', 'Johnson', 'Williams')),
+    ('username|user_id', ('johndoe', 'jsmith', 'mjohnson')),
+    ('email', ('john.doe@example.com', 'jane.smith@example.com')),
+    ('phone|tel|contact', ('+1 (555) 123-4567', '(555) 987-6543')),
+    ('address', ('123 Main St, New York, NY 10001',)),
+    ('avatar|profile_?pic', ('avatar1.jpg', 'profile2.png')),
+    ('bio|description', ('Product manager with 5+ years experience',)),
+    ('role|position', ('Senior Developer', 'Product Manager', 'Designer')),
     # Date and time patterns
-    date_patterns = {
-        'created_?at|timestamp': 'January 31, 2025 at 6:00 PM',
-        'updated_?at|modified': '2 hours ago',
-        'due_?date': 'Next Monday at 5:00 PM',
-        'schedule|appointment': 'Thursday, Feb 2 at 10:00 AM',
-        'birthday|dob': 'March 15, 1990'
-    }
-    
+    ('created_?at|timestamp', 'January 31, 2025 at 6:00 PM'),
+    ('updated_?at|modified', '2 hours ago'),
+    ('due_?date', 'Next Monday at 5:00 PM'),
+    ('schedule|appointment', 'Thursday, Feb 2 at 10:00 AM'),
+    ('birthday|dob', 'March 15, 1990'),
     # Numeric patterns
-    numeric_patterns = {
-        'count|total': ['5', '12', '24', '48'],
-        'items?_count': ['5 items', '12 products', '24 files'],
-        'views?|visits': ['1.2K views', '4.5K visits'],
-        'likes?|reactions': ['2.3K likes', '500 reactions'],
-        'percentage|progress': ['85%', '92%', '78%'],
-        'rating|score': ['4.5', '4.8', '4.2']
-    }
-    
+    ('count|total', ('5', '12', '24', '48')),
+    ('items?_count', ('5 items', '12 products', '24 files')),
+    ('views?|visits', ('1.2K views', '4.5K visits')),
+    ('likes?|reactions', ('2.3K likes', '500 reactions')),
+    ('percentage|progress', ('85%', '92%', '78%')),
+    ('rating|score', ('4.5', '4.8', '4.2')),
     # Price patterns
-    price_patterns = {
-        'price|cost': ['$99.99', '$149.99', '$199.99'],
-        'discount': ['20% off', '30% off'],
-        'sale_price': ['$79.99', '$129.99'],
-        'original_price': ['$129.99', '$199.99'],
-        'subscription': ['$9.99/month', '$99/year']
-    }
-    
+    ('price|cost', ('$99.99', '$149.99', '$199.99')),
+    ('discount', ('20% off', '30% off')),
+    ('sale_price', ('$79.99', '$129.99')),
+    ('original_price', ('$129.99', '$199.99')),
+    ('subscription', ('$9.99/month', '$99/year')),
     # Status patterns
-    status_patterns = {
-        'status|state': ['Active', 'Pending', 'Completed'],
-        'progress': ['In Progress', 'Completed', 'On Hold'],
-        'availability': ['In Stock', 'Out of Stock', 'Pre-order'],
-        'priority': ['High', 'Medium', 'Low'],
-        'condition': ['New', 'Used', 'Refurbished']
-    }
-    
+    ('status|state', ('Active', 'Pending', 'Completed')),
+    ('progress', ('In Progress', 'Completed', 'On Hold')),
+    ('availability', ('In Stock', 'Out of Stock', 'Pre-order')),
+    ('priority', ('High', 'Medium', 'Low')),
+    ('condition', ('New', 'Used', 'Refurbished')),
     # Content patterns
-    content_patterns = {
-        'title|heading': ['Premium Product', 'Latest News', 'Featured Item'],
-        'subtitle|tagline': ['Best Seller', 'New Arrival', 'Limited Edition'],
-        'description|content': ['High-quality product with premium features.',
-                              'Exclusive offer for a limited time only.'],
-        'category|tag': ['Electronics', 'Clothing', 'Home & Garden'],
-        'feature|highlight': ['Premium Quality', '24/7 Support', 'Free Shipping']
-    }
-    
-    # Check all pattern groups
-    for patterns in [user_patterns, date_patterns, numeric_patterns,
-                    price_patterns, status_patterns, content_patterns]:
-        for pattern, values in patterns.items():
-            if re.search(pattern, expr, re.I):
-                if isinstance(values, list):
-                    # Use consistent values for the same expression
-                    import hashlib
-                    hash_val = int(hashlib.md5(expr.encode()).hexdigest(), 16)
-                    return values[hash_val % len(values)]
-                return values
+    ('title|heading', ('Premium Product', 'Latest News', 'Featured Item')),
+    ('subtitle|tagline', ('Best Seller', 'New Arrival', 'Limited Edition')),
+    ('description|content', ('High-quality product with premium features.',
+                             'Exclusive offer for a limited time only.')),
+    ('category|tag', ('Electronics', 'Clothing', 'Home & Garden')),
+    ('feature|highlight', ('Premium Quality', '24/7 Support', 'Free Shipping')),
+)
+
+PLACEHOLDER_WORD_PATTERN = re.compile(r'[a-z]+')
+
+def combine_rules(patterns, flags=re.IGNORECASE):
+    """Alternations of the first 1, 2, ... n patterns, in priority order.
+
+    Each branch is a group named r<index>, so a match's lastgroup names
+    the rule it matched.
+    """
+    branches = [f'(?P<r{index}>{pattern})' for index, pattern in enumerate(patterns)]
+    return [re.compile('|'.join(branches[:count]), flags) for count in range(1, len(branches) + 1)]
+
+def first_rule(patterns, text):
+    """Index of the highest priority rule of combine_rules patterns found anywhere in text.
+
+    No rule matches before the leftmost match, and at its start the
+    alternation already took the first rule that matches there, so any
+    better rule starts further on. Searching on from there with only the
+    better rules finds the rule that searching them one by one would.
+    """
+    best = None
+    match = patterns[-1].search(text)
+    while match:
+        best = int(match.lastgroup[1:])
+        if best == 0:
+            break
+        match = patterns[best - 1].search(text, match.start() + 1)
+    return best
+
+# Expressions are lowercased before matching
+PLACEHOLDER_PATTERNS = combine_rules((pattern for pattern, _ in PLACEHOLDER_RULES), 0)
+
+def generate_placeholder_content(expr):
+    """Enhanced contextual placeholder generation with more patterns and variations"""
+    return placeholder_for(expr.strip().lower())
+
+@functools.lru_cache(maxsize=4096)
+def placeholder_for(expr):
+    rule = first_rule(PLACEHOLDER_PATTERNS, expr)
+    if rule is not None:
+        values = PLACEHOLDER_RULES[rule][1]
+        if isinstance(values, tuple):
+            # Use consistent values for the same expression
+            return values[zlib.crc32(expr.encode()) % len(values)]
+        return values
     
     # Generate a meaningful fallback based on the expression
-    words = re.findall(r'[a-z]+', expr)
+    words = PLACEHOLDER_WORD_PATTERN.findall(expr)
     if words:
         return f"Sample {' '.join(word.title() for word in words)}"
     
     return 'Example Content'
 
+# Component templates
+
+COMPONENT_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'component_templates')
+
+# Context flags a template is specialized for
+IMAGE_CONTEXT_PATTERN = re.compile(r'image|img|photo', re.IGNORECASE)
+PRICING_CONTEXT_PATTERN = re.compile(r'price|cost|\$', re.IGNORECASE)
+TEMPLATE_IMAGE_PATTERN = re.compile(r'<img[^>]+>')
+TEMPLATE_PRICE_PATTERN = re.compile(r'<[^>]+price[^>]*>.*?</[^>]+>')
+
+# Pattern name -> {'pattern': compiled trigger, 'variants': {(has_images, has_pricing): html}}
+# in detection priority order
+component_templates = {}
+# combine_rules of every trigger, in the same order
+component_template_patterns = None
+
+# Bumped by every register_* call, so conversion keys and workers can
+# tell that the templates or rule tables changed
+conversion_rules_revision = 0
+
+def specialize_template(html, has_images, has_pricing):
+    """Drop image and price markup the component has no use for"""
+    if not has_images:
+        html = TEMPLATE_IMAGE_PATTERN.sub('', html)
+    if not has_pricing:
+        html = TEMPLATE_PRICE_PATTERN.sub('', html)
+    return html.strip()
+
+def register_component_template(name, pattern, html):
+    """Add a component template, detected when pattern matches the markup.
+
+    Patterns are tried in registration order; registering an existing
+    name replaces its template and keeps its priority. Patterns are joined
+    into one alternation, so they cannot use numbered backreferences.
+    """
+    global conversion_rules_revision, component_template_patterns
+    component_templates[name] = {
+        'pattern': re.compile(pattern, re.IGNORECASE),
+        'variants': {(has_images, has_pricing): specialize_template(html, has_images, has_pricing)
+                     for has_images in (False, True) for has_pricing in (False, True)}
+    }
+    component_template_patterns = combine_rules(entry['pattern'].pattern for entry in component_templates.values())
+    conversion_rules_revision += 1
+
+def load_component_templates(directory=COMPONENT_TEMPLATE_DIR):
+    """Register the templates listed in a directory's templates.json"""
+    with open(os.path.join(directory, 'templates.json')) as manifest:
+        entries = json.load(manifest)
+    for entry in entries:
+        with open(os.path.join(directory, entry['file']), encoding='utf-8') as template:
+            register_component_template(entry['name'], entry['pattern'], template.read())
+
+load_component_templates()
+
 def detect_component_pattern(code):
     """Enhanced component pattern detection with more patterns and states"""
-    patterns = {
-        'navbar': (r'nav|header|menu|toolbar', """
-            <nav class="navbar">
-                <!-- Desktop Navigation -->
-                <div class="nav-brand">
-                    <a href="#" class="brand-link">
-                        <img src="logo.svg" alt="Brand Logo" class="brand-logo">
-                        <span class="brand-name">Brand Name</span>
-                    </a>
-                </div>
-                <div class="nav-menu desktop-menu">
-                    <a href="#" class="nav-link active">Home</a>
-                    <a href="#" class="nav-link">Products</a>
-                    <a href="#" class="nav-link">Services</a>
-                    <a href="#" class="nav-link">About</a>
-                    <a href="#" class="nav-link">Contact</a>
-                </div>
-                <!-- Mobile Navigation -->
-                <div class="mobile-menu hidden">
-                    <div class="mobile-menu-header">
-                        <span class="brand-name">Brand Name</span>
-                        <button class="close-menu">×</button>
-                    </div>
-                    <div class="mobile-menu-links">
-                        <a href="#" class="nav-link active">Home</a>
-                        <a href="#" class="nav-link">Products</a>
-                        <a href="#" class="nav-link">Services</a>
-                        <a href="#" class="nav-link">About</a>
-                        <a href="#" class="nav-link">Contact</a>
-                    </div>
-                </div>
-            </nav>
-        """),
-        'product_card': (r'product|card|item', """
-
-            <!-- Product Card - Default State -->
-            <div class="product-card">
-                <div class="product-image-wrapper">
-                    <img src="product-image.jpg" alt="Product" class="product-image">
-                    <div class="product-badges">
-                        <span class="badge new">New</span>
-                        <span class="badge sale">Sale</span>
-                    </div>
-                    <div class="quick-view-overlay">
-                        <button class="quick-view-btn">Quick View</button>
-                    </div>
-                </div>
-                <div class="product-info">
-                    <div class="product-category">Category</div>
-                    <h3 class="product-title">Premium Product Name</h3>
-                    <div class="product-rating">
-                        <span class="stars">★★★★☆</span>
-                        <span class="review-count">(24 reviews)</span>
-                    </div>
-                    <div class="product-price-wrapper">
-                        <span class="original-price">$129.99</span>
-                        <span class="sale-price">$99.99</span>
-                    </div>
-                    <button class="add-to-cart-btn">Add to Cart</button>
-                </div>
-            </div>
-            <!-- Product Card - Hover State -->
-            <div class="product-card hover">
-                <!-- Same structure with hover effects -->
-            </div>
-        """),
-        'form': (r'form|input|submit', """
-
-            <!-- Form with Validation States -->
-            <form class="contact-form">
-                <div class="form-header">
-                    <h2>Contact Us</h2>
-                    <p>We'll get back to you within 24 hours</p>
-                </div>
-                <!-- Input Group - Default -->
-                <div class="form-group">
-                    <label for="name">Full Name</label>
-                    <input type="text" id="name" class="form-input" placeholder="John Doe">
-                    <span class="input-hint">Enter your full name</span>
-                </div>
-                <!-- Input Group - Success -->
-                <div class="form-group success">
-                    <label for="email">Email</label>
-                    <input type="email" id="email" class="form-input" value="john@example.com">
-                    <span class="validation-message">Valid email format</span>
-                </div>
-                <!-- Input Group - Error -->
-                <div class="form-group error">
-                    <label for="phone">Phone</label>
-                    <input type="tel" id="phone" class="form-input" value="123">
-                    <span class="validation-message">Please enter a valid phone number</span>
-                </div>
-                <div class="form-group">
-                    <label for="message">Message</label>
-                    <textarea id="message" class="form-textarea" placeholder="Your message here..."></textarea>
-                </div>
-                <div class="form-actions">
-                    <button type="submit" class="submit-btn">Send Message</button>
-                    <button type="reset" class="reset-btn">Reset</button>
-                </div>
-            </form>
-        """),
-        'modal': (r'modal|dialog|popup', """
-
-            <!-- Modal - Closed State -->
-            <div class="modal-wrapper hidden">
-                <div class="modal-overlay"></div>
-                <div class="modal">
-                    <div class="modal-header">
-                        <h2 class="modal-title">Important Notice</h2>
-                        <button class="modal-close">×</button>
-                    </div>
-                    <div class="modal-body">
-                        <div class="modal-content">
-                            <p>Modal content goes here with important information.</p>
-                        </div>
-                    </div>
-                    <div class="modal-footer">
-                        <button class="modal-btn primary">Accept</button>
-                        <button class="modal-btn secondary">Cancel</button>
-                    </div>
-                </div>
-            </div>
-            <!-- Modal - Open State -->
-            <div class="modal-wrapper visible">
-                <!-- Same structure but with visible class -->
-            </div>
-        """),
-        'dropdown': (r'dropdown|select|menu', """
-
-            <!-- Dropdown - Closed State -->
-            <div class="dropdown-wrapper">
-                <button class="dropdown-trigger">
-                    <span class="selected-option">Select Option</span>
-                    <span class="dropdown-arrow">▼</span>
-                </button>
-                <div class="dropdown-menu hidden">
-                    <div class="dropdown-search">
-                        <input type="text" placeholder="Search..." class="search-input">
-                    </div>
-                    <div class="dropdown-options">
-                        <div class="option-group">
-                            <div class="option-header">Group 1</div>
-                            <div class="option" data-value="1">Option 1</div>
-                            <div class="option" data-value="2">Option 2</div>
-                        </div>
-                        <div class="option-group">
-                            <div class="option-header">Group 2</div>
-                            <div class="option" data-value="3">Option 3</div>
-                            <div class="option" data-value="4">Option 4</div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-            <!-- Dropdown - Open State -->
-            <div class="dropdown-wrapper active">
-                <!-- Same structure but with active class -->
-            </div>
-        """)
-    }
-    
-    def analyze_component_context(code):
-        """Analyze the context to determine component variations"""
-        context = {
-            'has_images': bool(re.search(r'image|img|photo', code, re.I)),
-            'has_pricing': bool(re.search(r'price|cost|\$', code, re.I)),
-            'has_rating': bool(re.search(r'rating|stars|review', code, re.I)),
-            'is_interactive': bool(re.search(r'click|hover|active', code, re.I))
-        }
-        return context
-    
-    for pattern_name, (pattern, template) in patterns.items():
-        if re.search(pattern, code, re.IGNORECASE):
-            context = analyze_component_context(code)
-            # Customize template based on context
-            modified_template = template
-            if not context['has_images']:
-                modified_template = re.sub(r'<img[^>]+>', '', modified_template)
-            if not context['has_pricing']:
-                modified_template = re.sub(r'<[^>]+price[^>]*>.*?</[^>]+>', '', modified_template)
-            return pattern_name, modified_template.strip()
+    if component_template_patterns:
+        index = first_rule(component_template_patterns, code)
+        if index is not None:
+            pattern_name, entry = list(component_templates.items())[index]
+            context = (bool(IMAGE_CONTEXT_PATTERN.search(code)),
+                       bool(PRICING_CONTEXT_PATTERN.search(code)))
+            return pattern_name, entry['variants'][context]
     
     return None, None
 
+# Style property metadata, by CSS property name
+
+# Numbers stay bare for these; every other property not listed below is a
+# length and gets px
+UNITLESS_PROPERTIES = frozenset({
+    'opacity', 'z-index', 'flex', 'flex-grow', 'flex-shrink', 'order',
+    'line-height', 'font-weight', 'zoom', 'columns', 'column-count',
+    'animation-iteration-count', 'aspect-ratio', 'tab-size', 'orphans', 'widows',
+    'grid-row', 'grid-column', 'fill-opacity', 'stroke-opacity'
+})
+
+TIME_PROPERTIES = frozenset({
+    'transition-duration', 'animation-duration', 'transition-delay',
+    'animation-delay'
+})
+
+VENDOR_PREFIXES = {
+    'user-select': ('-webkit-', '-moz-', '-ms-'),
+    'appearance': ('-webkit-', '-moz-'),
+    'transform': ('-webkit-',),
+    'transition': ('-webkit-',),
+    'animation': ('-webkit-',),
+    'backdrop-filter': ('-webkit-',),
+    'background-clip': ('-webkit-',),
+    'mask-image': ('-webkit-',)
+}
+
+# React style keys for vendor properties, e.g. WebkitTransform, msTransform
+VENDOR_KEY_PATTERN = re.compile(r'(webkit|moz|ms|o)-')
+STYLE_NUMBER_PATTERN = re.compile(r'-?(?:\d+\.?\d*|\.\d+)')
+
+# Units for bare numbers inside transform and filter functions
+CSS_FUNCTION_PATTERN = re.compile(r'\b(rotate|skew|translate|blur)(\w*)\(([^)]*)\)')
+CSS_FUNCTION_UNITS = {'rotate': 'deg', 'skew': 'deg', 'translate': 'px', 'blur': 'px'}
+CSS_FUNCTION_NUMBER_PATTERN = re.compile(r'(?<![\w.])(-?\d*\.?\d+)(?![\w%.])')
+
+@functools.lru_cache(maxsize=1024)
+def css_property(key):
+    """(CSS name, unit for bare numbers, vendor prefixes) of a style object key"""
+    if key.startswith('--'):
+        # Custom properties keep their name and value as written
+        return key, '', ()
+    name = camel_to_kebab(key)
+    if VENDOR_KEY_PATTERN.match(name):
+        name = f'-{name}'
+    if name in UNITLESS_PROPERTIES or name.startswith('scale'):
+        unit = ''
+    elif name in TIME_PROPERTIES:
+        unit = 'ms'
+    elif name.startswith('rotate'):
+        unit = 'deg'
+    else:
+        unit = 'px'
+    return name, unit, VENDOR_PREFIXES.get(name, ())
+
+def css_value(value, unit):
+    """Add unit to a bare non-zero number"""
+    if unit and STYLE_NUMBER_PATTERN.fullmatch(value) and float(value):
+        return f'{value}{unit}'
+    return value
+
+def css_function_units(value):
+    """Add units to bare numbers in transform and filter functions"""
+    def add_units(match):
+        unit = CSS_FUNCTION_UNITS[match.group(1)]
+        args = CSS_FUNCTION_NUMBER_PATTERN.sub(lambda number: css_value(number.group(1), unit), match.group(3))
+        return f'{match.group(1)}{match.group(2)}({args})'
+    return CSS_FUNCTION_PATTERN.sub(add_units, value)
+
+def style_properties(group):
+    """Yield (key, items, start, end) for each `key: value` of a style object group"""
+    props = group['items']
+    for start, end in split_items(props, ',', 0, len(props)):
+        colon = find_op(props, ':', start, end)
+        if colon is not None:
+            key = expression_source(props, start, colon).strip().strip('"\'')
+            yield key, props, colon + 1, end
+
 def parse_style_object(style_str):
     """Enhanced style parsing with nested objects, variables, and smart unit handling"""
-    def parse_nested_styles(style_obj):
-        """Recursively parse nested style objects"""
-        if isinstance(style_obj, str):
-            # Base case: string value
-            return style_obj.strip('" ')
-        
-        result = {}
-        for key, value in style_obj.items():
-            if isinstance(value, dict):
-                # Nested object
-                result[key] = parse_nested_styles(value)
-            else:
-                # Convert the value and add units if needed
-                result[key] = add_units(key, str(value).strip('" '))
-        return result
-    
-    def add_units(prop, value):
-        """Smart unit addition based on property and value"""
-        # Skip if value already has units or is a special value
-        if not value.replace('.', '').isdigit() or value == '0':
-            return value
-        
-        # Length properties (px)
-        length_props = {
-            'width', 'height', 'min-width', 'max-width', 'min-height', 'max-height',
-            'margin', 'padding', 'top', 'right', 'bottom', 'left',
-            'border-width', 'border-radius', 'font-size', 'line-height',
-            'gap', 'column-gap', 'row-gap'
-        }
-        
-        # Time properties (ms)
-        time_props = {
-            'transition-duration', 'animation-duration', 'transition-delay',
-            'animation-delay'
-        }
-        
-        # Unitless properties
-        unitless_props = {
-            'opacity', 'z-index', 'flex', 'flex-grow', 'flex-shrink',
-            'order', 'line-height', 'font-weight'
-        }
-        
-        # Handle special cases
-        if prop in unitless_props:
-            return value
-        elif prop in time_props:
-            return f"{value}ms"
-        elif prop in length_props or prop.endswith(('width', 'height', 'top', 'right', 'bottom', 'left')):
-            return f"{value}px"
-        elif prop.startswith('rotate'):
-            return f"{value}deg"
-        elif prop.startswith('scale'):
-            return value
-        
-        # Default to pixels for unknown numeric properties
-        return f"{value}px"
-    
-    def parse_css_vars(styles):
-        """Handle CSS variable references"""
-        var_pattern = r'var\((--[^)]+)\)'
-        return {k: re.sub(var_pattern, r'var(\1)', v) if isinstance(v, str) else v
-                for k, v in styles.items()}
-    
-    def handle_vendor_prefixes(styles):
-        """Add vendor prefixes for necessary properties"""
-        prefix_props = {
-            'user-select': ['-webkit-', '-moz-', '-ms-'],
-            'appearance': ['-webkit-', '-moz-'],
-            'transform': ['-webkit-'],
-            'transition': ['-webkit-'],
-            'animation': ['-webkit-'],
-            'backdrop-filter': ['-webkit-'],
-            'background-clip': ['-webkit-'],
-            'mask-image': ['-webkit-']
-        }
-        
-        prefixed_styles = {}
-        for prop, value in styles.items():
-            prefixed_styles[prop] = value
-            if prop in prefix_props:
-                for prefix in prefix_props[prop]:
-                    prefixed_styles[f"{prefix}{prop}"] = value
-        return prefixed_styles
-    
-    def handle_complex_values(value):
-        """Handle complex CSS values like gradients, transforms, and filters"""
-        complex_patterns = {
-            'gradient': r'(linear|radial|conic)-gradient\([^)]+\)',
-            'transform': r'(transform|rotate|scale|translate|skew)\([^)]+\)',
-            'filter': r'(blur|brightness|contrast|grayscale|invert)\([^)]+\)',
-            'calc': r'calc\([^)]+\)',
-            'color': r'(rgb|rgba|hsl|hsla)\([^)]+\)'
-        }
-        
-        for pattern_type, pattern in complex_patterns.items():
-            if re.search(pattern, value):
-                if pattern_type == 'transform':
-                    # Add units to transform values
-                    return re.sub(r'\b(\d+)(?![a-z%\.])', lambda m: f"{m.group(1)}{'deg' if 'rotate' in value else 'px'}", value)
-                elif pattern_type == 'filter':
-                    # Add units to filter values
-                    return re.sub(r'\b(\d+)(?![a-z%\.])', r'\1px', value)
-                return value
-        return value
-    
-    try:
-        # Convert string to Python dict
-        style_dict = eval(f"dict({style_str})")
-        
-        # Parse nested styles
-        parsed_styles = parse_nested_styles(style_dict)
-        
-        # Handle CSS variables
-        parsed_styles = parse_css_vars(parsed_styles)
-        
-        # Add vendor prefixes
-        parsed_styles = handle_vendor_prefixes(parsed_styles)
-        
-        # Convert to CSS string
-        css_parts = []
-        for prop, value in parsed_styles.items():
-            if isinstance(value, dict):
-                # Handle nested objects (e.g., media queries, pseudo-classes)
-                nested_css = parse_style_object(str(value))
-                if prop.startswith('@media'):
-                    css_parts.append(f"{prop} {{ {nested_css} }}")
-                else:
-                    css_parts.append(f"&{prop} {{ {nested_css} }}")
-            else:
-                # Convert camelCase to kebab-case
-                prop = camel_to_kebab(prop)
-                value = handle_complex_values(str(value))
-                css_parts.append(f"{prop}: {value}")
-        
-        return '; '.join(css_parts)
-    
-    except (SyntaxError, ValueError) as e:
-        logger.error(f"Error parsing style object: {e}")
+    source = style_str.strip()
+    if not source.startswith('{'):
+        source = f'{{{source}}}'
+    # Parse as a JSX expression container holding the object literal
+    items = parse_jsx(f'{{{source}}}')[0]['items']
+    items = strip_blank_items(items, 0, len(items))
+    if len(items) != 1 or not is_group(items[0], '{'):
+        logger.error(f'Error parsing style object: {style_str}')
         return ''
+    return style_object_css(items[0])
+
+def style_object_css(group):
+    css_parts = []
+    for key, props, start, end in style_properties(group):
+        value = strip_blank_items(props, start, end)
+        if len(value) == 1 and is_group(value[0], '{'):
+            # Handle nested objects (e.g., media queries, pseudo-classes)
+            nested_css = style_object_css(value[0])
+            selector = key if key.startswith('@') else f'&{key}'
+            css_parts.append(f'{selector} {{ {nested_css} }}')
+            continue
+        name, unit, prefixes = css_property(key)
+        value = css_function_units(css_value(style_value(props, start, end), unit))
+        css_parts.append(f'{name}: {value}')
+        # Add vendor prefixes for necessary properties
+        css_parts.extend(f'{prefix}{name}: {value}' for prefix in prefixes)
+    return '; '.join(css_parts)
+
+# State variants generated for each component type, and the patterns that
+# detect the type, in priority order
+COMPONENT_STATES = {
+    'modal': {
+        'open': {'class': 'modal visible', 'style': 'display: block; opacity: 1'},
+        'closed': {'class': 'modal hidden', 'style': 'display: none; opacity: 0'}
+    },
+    'dropdown': {
+        'open': {'class': 'dropdown expanded', 'style': 'max-height: 500px; opacity: 1'},
+        'closed': {'class': 'dropdown collapsed', 'style': 'max-height: 0; opacity: 0'}
+    },
+    'accordion': {
+        'expanded': {'class': 'accordion-panel expanded', 'style': 'max-height: var(--panel-height)'},
+        'collapsed': {'class': 'accordion-panel collapsed', 'style': 'max-height: 0'}
+    },
+    'tab': {
+        'active': {'class': 'tab active', 'style': 'border-bottom-color: var(--active-color)'},
+        'inactive': {'class': 'tab', 'style': 'border-bottom-color: transparent'}
+    },
+    'menu': {
+        'open': {'class': 'menu-panel visible', 'style': 'transform: translateX(0)'},
+        'closed': {'class': 'menu-panel hidden', 'style': 'transform: translateX(-100%)'}
+    },
+    'tooltip': {
+        'visible': {'class': 'tooltip visible', 'style': 'opacity: 1; visibility: visible'},
+        'hidden': {'class': 'tooltip hidden', 'style': 'opacity: 0; visibility: hidden'}
+    },
+    'form': {
+        'valid': {'class': 'form-group valid', 'style': 'border-color: var(--success-color)'},
+        'invalid': {'class': 'form-group invalid', 'style': 'border-color: var(--error-color)'},
+        'disabled': {'class': 'form-group disabled', 'style': 'opacity: 0.5; pointer-events: none'}
+    },
+    'button': {
+        'default': {'class': 'button', 'style': 'background: var(--primary-color)'},
+        'hover': {'class': 'button hover', 'style': 'background: var(--primary-dark)'},
+        'active': {'class': 'button active', 'style': 'transform: scale(0.98)'},
+        'disabled': {'class': 'button disabled', 'style': 'opacity: 0.5; pointer-events: none'}
+    }
+}
+
+STATE_TYPE_PATTERNS = tuple((component_type, re.compile(pattern, re.IGNORECASE)) for component_type, pattern in (
+    ('modal', r'modal|dialog|popup'),
+    ('dropdown', r'dropdown|select|combobox'),
+    ('accordion', r'accordion|collapse|expand'),
+    ('tab', r'tab|panel|view'),
+    ('menu', r'menu|navbar|navigation'),
+    ('tooltip', r'tooltip|popover|hint'),
+    ('form', r'form|input|field'),
+    ('button', r'button|btn|submit'),
+))
+STATE_CLASS_PATTERN = re.compile(r'class=(["\'])([^"\']*)\1')
+STATE_STYLE_PATTERN = re.compile(r'style=(["\'])([^"\']*)\1')
+
+def detect_state_type(code):
+    """The component type whose states apply to the markup, or None"""
+    for component_type, pattern in STATE_TYPE_PATTERNS:
+        if pattern.search(code):
+            return component_type
+    return None
+
+def state_attributes(attrs, state_attrs):
+    """A copy of attrs with a state's class and style added to their own"""
+    attrs = [[name, value] for name, value in attrs]
+    for name, separator in (('class', ' '), ('style', '; ')):
+        added = state_attrs[name].strip()
+        for attr in attrs:
+            if attr[0] == name:
+                own = (attr[1] or '').strip().rstrip(';').rstrip()
+                attr[1] = f'{own}{separator}{added}' if own and added else own or added
+                break
+        else:
+            attrs.append([name, added])
+    return attrs
+
+def state_variation_nodes(nodes, component_type):
+    """Nodes with their root element repeated once per state.
+
+    Only the root, the first top-level element, gets each state's class
+    and style. Its children and any siblings after it are shared by all
+    the variants, not copied; nodes before it are kept once.
+    """
+    root = next((i for i, node in enumerate(nodes) if node['type'] == 'element'), None)
+    if root is None:
+        return nodes
+    base = nodes[root]
+    output = list(nodes[:root])
+    for state_name, state_attrs in COMPONENT_STATES[component_type].items():
+        output.append({'type': 'text', 'value': '\n'})
+        output.append({'type': 'comment', 'value': f' {component_type.title()} - {state_name.title()} State '})
+        output.append({'type': 'text', 'value': '\n'})
+        output.append(dict(base, attrs=state_attributes(base['attrs'], state_attrs)))
+        output.extend(nodes[root + 1:])
+    return output
 
 def handle_component_states(code):
     """Handle component states and generate all necessary variations"""
-    # Common state patterns
-    states = {
-        'modal': {
-            'open': {'class': 'modal visible', 'style': 'display: block; opacity: 1'},
-            'closed': {'class': 'modal hidden', 'style': 'display: none; opacity: 0'}
-        },
-        'dropdown': {
-            'open': {'class': 'dropdown expanded', 'style': 'max-height: 500px; opacity: 1'},
-            'closed': {'class': 'dropdown collapsed', 'style': 'max-height: 0; opacity: 0'}
-        },
-        'accordion': {
-            'expanded': {'class': 'accordion-panel expanded', 'style': 'max-height: var(--panel-height)'},
-            'collapsed': {'class': 'accordion-panel collapsed', 'style': 'max-height: 0'}
-        },
-        'tab': {
-            'active': {'class': 'tab active', 'style': 'border-bottom-color: var(--active-color)'},
-            'inactive': {'class': 'tab', 'style': 'border-bottom-color: transparent'}
-        },
-        'menu': {
-            'open': {'class': 'menu-panel visible', 'style': 'transform: translateX(0)'},
-            'closed': {'class': 'menu-panel hidden', 'style': 'transform: translateX(-100%)'}
-        },
-        'tooltip': {
-            'visible': {'class': 'tooltip visible', 'style': 'opacity: 1; visibility: visible'},
-            'hidden': {'class': 'tooltip hidden', 'style': 'opacity: 0; visibility: hidden'}
-        },
-        'form': {
-            'valid': {'class': 'form-group valid', 'style': 'border-color: var(--success-color)'},
-            'invalid': {'class': 'form-group invalid', 'style': 'border-color: var(--error-color)'},
-            'disabled': {'class': 'form-group disabled', 'style': 'opacity: 0.5; pointer-events: none'}
-        },
-        'button': {
-            'default': {'class': 'button', 'style': 'background: var(--primary-color)'},
-            'hover': {'class': 'button hover', 'style': 'background: var(--primary-dark)'},
-            'active': {'class': 'button active', 'style': 'transform: scale(0.98)'},
-            'disabled': {'class': 'button disabled', 'style': 'opacity: 0.5; pointer-events: none'}
-        }
-    }
-    
-    def detect_state_type(code):
-        """Detect the type of component based on code patterns"""
-        patterns = {
-            'modal': r'modal|dialog|popup',
-            'dropdown': r'dropdown|select|combobox',
-            'accordion': r'accordion|collapse|expand',
-            'tab': r'tab|panel|view',
-            'menu': r'menu|navbar|navigation',
-            'tooltip': r'tooltip|popover|hint',
-            'form': r'form|input|field',
-            'button': r'button|btn|submit'
-        }
-        
-        for component_type, pattern in patterns.items():
-            if re.search(pattern, code, re.I):
-                return component_type
-        return None
-    
-    def generate_state_variations(component_type, base_code):
-        """Generate HTML for all states of a component"""
-        if component_type not in states:
-            return base_code
-        
-        variations = []
-        component_states = states[component_type]
-        
-        # Extract the base class and style
-        base_class = re.search(r'class=(["\'])([^"\']*)\1', base_code)
-        base_style = re.search(r'style=(["\'])([^"\']*)\1', base_code)
-        
-        for state_name, state_attrs in component_states.items():
-            state_code = base_code
-            
-            # Update class
-            if base_class:
-                new_class = f"{base_class.group(2)} {state_attrs['class']}".strip()
-                state_code = re.sub(r'class=(["\'])[^"\']*(\1)',
-                                  f'class="{new_class}"', state_code)
-            else:
-                state_code = state_code.replace('>', f' class="{state_attrs["class"]}">')
-            
-            # Update style
-            if base_style:
-                base_styles = base_style.group(2).strip()
-                state_styles = state_attrs['style'].strip()
-                new_style = f"{base_styles}; {state_styles}" if base_styles and state_styles else base_styles or state_styles
-                state_code = re.sub(r'style=(["\'])[^"\']*(\1)',
-                                  f'style="{new_style}"', state_code)
-            else:
-                state_code = state_code.replace('>', f' style="{state_attrs["style"]}">')
-            
-            # Add comment to indicate state
-            state_code = f"\n<!-- {component_type.title()} - {state_name.title()} State -->\n{state_code}"
-            variations.append(state_code)
-        
-        return '\n'.join(variations)
-    
-    # Process the code
     component_type = detect_state_type(code)
     if component_type:
-        return generate_state_variations(component_type, code)
+        return render_html(state_variation_nodes(parse_jsx(code), component_type))
     return code
 
-def convert_react_to_webflow(react_code):
-    try:
-        logger.info('Starting conversion of React code')
-        logger.debug(f'Input code:\n{react_code}')
-        
-        # Add HTML comment to indicate source
-        converted_code = "<!-- Generated by React to Webflow Converter -->\n"
-        
-        # Remove import statements and exports
-        react_code = re.sub(r'import\s+[^;]+;?\n?', '', react_code)
-        react_code = re.sub(r'export\s+default\s+\w+;?\s*', '', react_code)
-        
-        # Remove function declaration and return statement
-        react_code = re.sub(r'function\s+\w+\s*\([^)]*\)\s*{\s*return\s+', '', react_code)
-        react_code = re.sub(r'\s*}\s*;?\s*$', '', react_code)
-        react_code = re.sub(r'^\s*\(\s*|\s*\)\s*;?\s*$', '', react_code)
-        
-        # Handle .map() functions with contextual examples
-        def replace_map(match):
-            array_expr = match.group(1)
-            content = match.group(2)
-            
-            # Handle specific array patterns
-            if '[5,4,3,2,1]' in array_expr:
-                # Generate star rating buttons
-                buttons = []
-                for stars in [5,4,3,2,1]:
-                    button = f'<button class="star-filter" data-w-click="true" style="padding: 8px 12px; border: 1px solid #dee2e6; border-radius: 4px; background-color: white; color: #212529">{stars}★ & up</button>'
-                    buttons.append(button)
-                return '\n'.join(buttons)
-            elif 'categories' in array_expr:
-                # Generate sample category options
-                options = [
-                    '<option value="electronics">Electronics (24)</option>',
-                    '<option value="clothing">Clothing (36)</option>',
-                    '<option value="home">Home & Garden (18)</option>'
-                ]
-                return '\n'.join(options)
-            elif 'activeFilters' in array_expr:
-                # Generate sample filter tags
-                tags = [
-                    '<span class="filter-tag" style="padding: 4px 12px; background-color: #e9ecef; border-radius: 16px; font-size: 14px; display: flex; align-items: center; gap: 8px">Category: Electronics<button data-w-click="true" style="border: none; background: none; padding: 0; color: #6c757d; cursor: pointer">✕</button></span>',
-                    '<span class="filter-tag" style="padding: 4px 12px; background-color: #e9ecef; border-radius: 16px; font-size: 14px; display: flex; align-items: center; gap: 8px">Price: $100-$500<button data-w-click="true" style="border: none; background: none; padding: 0; color: #6c757d; cursor: pointer">✕</button></span>',
-                    '<span class="filter-tag" style="padding: 4px 12px; background-color: #e9ecef; border-radius: 16px; font-size: 14px; display: flex; align-items: center; gap: 8px">Rating: 4★ & up<button data-w-click="true" style="border: none; background: none; padding: 0; color: #6c757d; cursor: pointer">✕</button></span>'
-                ]
-                return '\n'.join(tags)
-            return ''
-        converted_code = re.sub(r'\{([^}]+)\.map\([^=]+=>[^}]+(\{[^}]+\}|[^}]+)\)\}', replace_map, converted_code)
-        
-        # Convert event handlers to Webflow attributes
-        def convert_event_handler(match):
-            event_type = match.group(1)
-            handler = match.group(2)
-            # Enhanced event mapping
-            event_map = {
-                'Click': {'attr': 'click', 'interaction': 'click'},
-                'MouseEnter': {'attr': 'mouseenter', 'interaction': 'hover-in'},
-                'MouseLeave': {'attr': 'mouseleave', 'interaction': 'hover-out'},
-                'Focus': {'attr': 'focus', 'interaction': 'focus'},
-                'Blur': {'attr': 'blur', 'interaction': 'blur'},
-                'Change': {'attr': 'change', 'interaction': 'change'},
-                'Submit': {'attr': 'submit', 'interaction': 'submit'},
-                'KeyPress': {'attr': 'keypress', 'interaction': 'key-press'},
-                'Scroll': {'attr': 'scroll', 'interaction': 'scroll'}
-            }
-            
-            for react_event, mapping in event_map.items():
-                if react_event.lower() in event_type.lower():
-                    return f'data-w-{mapping["attr"]}="true"'
-            return ''
-        converted_code = re.sub(r'on([A-Z][a-zA-Z]*)={([^}]+)}', convert_event_handler, converted_code)
-        
+# Convert event handlers to Webflow attributes
+#
+# React event name, lowercased: suffix of the data-w-* attribute marking
+# the element for a Webflow interaction. Events without a mapping of
+# their own use the first one, in this order, whose name they contain,
+# so onDoubleClick is marked like onClick.
+EVENT_MAPPINGS = {
+    'click': 'click',
+    'mouseenter': 'mouseenter',
+    'mouseleave': 'mouseleave',
+    'focus': 'focus',
+    'blur': 'blur',
+    'change': 'change',
+    'submit': 'submit',
+    'keypress': 'keypress',
+    'scroll': 'scroll',
+}
+
+@functools.lru_cache(maxsize=None)
+def convert_event_handler(event_type):
+    event = event_type.lower()
+    attr = EVENT_MAPPINGS.get(event)
+    if attr is None:
+        attr = next((attr for name, attr in EVENT_MAPPINGS.items() if name in event), None)
+    return f'data-w-{attr}' if attr else ''
+
+def register_event_mapping(react_event, attr):
+    """Mark elements handling react_event (e.g. 'DoubleClick') with data-w-<attr>.
+
+    Registering an existing event replaces its mapping and keeps its
+    priority.
+    """
+    global conversion_rules_revision
+    EVENT_MAPPINGS[react_event.lower()] = attr
+    convert_event_handler.cache_clear()
+    conversion_rules_revision += 1
+
+# Handle inline styles
+def convert_style(items):
+    """Convert the items of a style={{...}} expression to a CSS string"""
+    items = strip_blank_items(items, 0, len(items))
+    if len(items) != 1 or not is_group(items[0], '{'):
+        return ''
+    styles = []
+    for key, props, start, end in style_properties(items[0]):
+        name, unit, _ = css_property(key)
+        styles.append(f'{name}: {css_value(style_value(props, start, end), unit)}')
+    return '; '.join(styles)
+
+def style_value(items, start, end):
+    """Static value of a style property expression"""
+    question = find_op(items, '?', start, end)
+    if question is not None:
+        condition = expression_source(items, start, question)
+        colon = items[question]['colon']
+        # Rating buttons are shown unselected
+        if 'selectedRating === stars' in condition and colon is not None:
+            return style_value(items, colon + 1, end)
+        return style_value(items, question + 1, colon if colon is not None else end)
+    items = strip_blank_items(items, start, end)
+    if len(items) == 1 and isinstance(items[0], dict):
+        if items[0]['type'] == 'string':
+            return items[0]['value']
+        if items[0]['type'] == 'template':
+            return replace_template_literal(items[0]['value'][1:-1])
+    # Clean up value
+    return expression_source(items).strip().strip('"\'')
+
+# Placeholder rules
+#
+# Sample text for the JS expressions that markup depends on, in families
+# by where the expression appears.
+
+class PlaceholderRules:
+    """Sample text for an expression: the value of an exact rule for it,
+    else of the first contains rule, in priority order, whose text
+    occurs in it.
+
+    All contains texts are compiled into one pattern, so an expression
+    no rule applies to, the usual case, is rejected in a single search
+    however many rules there are.
+    """
+
+    def __init__(self, exact=None, contains=()):
+        self.exact = dict(exact or {})
+        self.table = self.compile(tuple(contains))
+        # The same expressions recur across conversions of a codebase
+        self.lookup = functools.lru_cache(maxsize=4096)(self.find)
+
+    @staticmethod
+    def compile(contains):
+        pattern = re.compile('|'.join(re.escape(text) for text, _ in contains)) if contains else None
+        return contains, pattern
+
+    def add(self, text, value, exact=False):
+        """Add a rule, tried before the existing contains rules"""
+        if exact:
+            self.exact[text] = value
+        else:
+            self.table = self.compile(((text, value), *self.table[0]))
+        self.lookup.cache_clear()
+
+    def find(self, expr, default=None):
+        if expr in self.exact:
+            return self.exact[expr]
+        contains, pattern = self.table
+        if pattern is not None and pattern.search(expr):
+            # The leftmost text found need not be the first rule's
+            for text, value in contains:
+                if text in expr:
+                    return value
+        return default
+
+# {expression} children and attribute values
+EXPRESSION_PLACEHOLDERS = PlaceholderRules(
+    exact={'filteredResults.length': '24', 'text': 'Click Here'},
+    contains=(
+        ('selectedCategory', 'Electronics'),
+        ('selectedRating', '4★ & up'),
+        ('minPrice', '$100'),
+        ('maxPrice', '$500'),
+    ))
+
+# Whole template literals
+TEMPLATE_PLACEHOLDERS = PlaceholderRules(contains=(
+    ('getCategoryName', 'Electronics'),
+    ('selectedRating', '4★ & up'),
+    ('minPrice', '$100'),
+    ('maxPrice', '$500'),
+    ('filteredResults.length', '24'),
+))
+
+# ${...} substitutions of other template literals
+TEMPLATE_FIELD_PLACEHOLDERS = PlaceholderRules(exact={
+    'category.name': 'Electronics',
+    'category.count': '24',
+    'minPrice': '$100',
+    'maxPrice': '$500',
+    'selectedRating': '4★',
+    'filteredResults.length': '24',
+})
+
+# Conditions of ternaries and && expressions, which render as the sample
+# text instead of a branch. A value of None renders the branch.
+CONDITION_PLACEHOLDERS = PlaceholderRules(contains=(
+    ('selectedRating === stars', None),
+    ('selectedCategory', 'Electronics'),
+    ('selectedRating', '4★ & up'),
+    ('minPrice || maxPrice', '$100 - $500'),
+))
+
+TEMPLATE_FIELD_PATTERN = re.compile(r'\${([^}]+)}')
+
+def register_placeholder_rule(text, value, exact=False):
+    """Render expressions containing text, or with exact equal to it, as value.
+
+    Applies to {expression} children and attributes and to ${...} in
+    template literals, before the built-in rules.
+    """
+    global conversion_rules_revision
+    EXPRESSION_PLACEHOLDERS.add(text, value, exact)
+    TEMPLATE_FIELD_PLACEHOLDERS.add(text, value, exact)
+    conversion_rules_revision += 1
+
+# Handle template literals with smart content
+def replace_template_literal(content):
+    value = TEMPLATE_PLACEHOLDERS.lookup(content)
+    if value is not None:
+        return value
+    # Replace ${...} expressions with contextual content
+    return TEMPLATE_FIELD_PATTERN.sub(lambda m: TEMPLATE_FIELD_PLACEHOLDERS.lookup(m.group(1), ''), content)
+
+# Handle ternary operators and conditional rendering
+def replace_conditional(condition):
+    """Sample text for a condition, or None to render its branch"""
+    return CONDITION_PLACEHOLDERS.lookup(condition)
+
+# Handle JSX expressions
+def convert_jsx_expr(expr):
+    expr = expr.strip()
+    
+    # Skip event handlers and style objects
+    if '=>' in expr or '{' in expr:
+        return ''
+    return EXPRESSION_PLACEHOLDERS.lookup(expr, '')
+
+# Imports and re-exports around a component
+COMPONENT_IMPORT_PATTERN = re.compile(
+    r'import\s+[^;]+;?\n?'
+    r'|export\s+default\s+(?!function\b|async\b|class\b)[\w$]+;?\s*'
+)
+
+# The declaration of a function or arrow function component, up to its
+# body: past the '{' of a function, or the '=>' of an arrow function
+COMPONENT_DECLARATION_PATTERN = re.compile(
+    r'(?:export\s+(?:default\s+)?)?(?:async\s+)?function\b\s*\*?\s*[\w$]*\s*\([^)]*\)[^{]*{'
+    r'|(?:export\s+)?(?:const|let|var)\s+[\w$]+\s*(?::[^=]+)?=\s*(?:async\s+)?'
+    r'(?:\([^)]*\)|[\w$]+)\s*(?::[^=]+?)?=>\s*'
+)
+RETURN_START_PATTERN = re.compile(r'return\b\s*')
+
+def strip_closing(code, closer):
+    """Remove a trailing closer (and optional semicolon) left by the wrapper"""
+    tail = code.rstrip()
+    if tail.endswith(';'):
+        tail = tail[:-1].rstrip()
+    if tail.endswith(closer):
+        return tail[:-1].rstrip()
+    return code
+
+def strip_component_wrapper(react_code):
+    """Remove imports, exports and the function wrapper around the JSX.
+
+    A function body with statements before its return, such as hooks,
+    is kept whole in braces, for parse_component to take the returned
+    JSX from.
+    """
+    react_code = COMPONENT_IMPORT_PATTERN.sub('', react_code)
+    declaration = COMPONENT_DECLARATION_PATTERN.search(react_code)
+    first_tag = react_code.find('<')
+    if declaration and (first_tag < 0 or declaration.start() < first_tag):
+        body = react_code[declaration.end():]
+        block = declaration.group().endswith('{')
+        if not block and body.startswith('{'):
+            body, block = body[1:], True
+        if block:
+            body = strip_closing(body, '}').strip()
+            returned = RETURN_START_PATTERN.match(body)
+            if not returned:
+                return f'{{{body}}}'
+            body = body[returned.end():]
+        react_code = body
+    react_code = react_code.strip()
+    if react_code.endswith(';'):
+        react_code = react_code[:-1].rstrip()
+    if react_code.startswith('('):
+        react_code = strip_closing(react_code[1:].lstrip(), ')')
+    return react_code
+
+# JSX parsing
+#
+# parse_jsx turns a component body into a tree of plain dicts:
+#   {'type': 'element', 'tag': 'div', 'attrs': [[name, value]], 'children': [...]}
+#   {'type': 'text', 'value': '...'}
+#   {'type': 'comment', 'value': '...'}
+#   {'type': 'expression', 'items': [...]}
+# Elements record the 'start' and, once closed, 'end' offsets of their source.
+# Attribute values are strings, None for bare attributes, or expression
+# nodes; spread attributes have a name of None. Expression items are JS
+# source strings and dicts for operators ('op'), bracket groups ('group'),
+# string and template literals, comments and nested JSX elements. Each
+# '?' operator records the index of its matching ':' in 'colon'.
+
+VOID_ELEMENTS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+})
+
+JSX_NAME_PATTERN = re.compile(r'[A-Za-z_$][\w.:$-]*')
+JSX_CLOSING_TAG_PATTERN = re.compile(r'</\s*([A-Za-z_$][\w.:$-]*)?\s*>?')
+JSX_TEXT_PATTERN = re.compile(r'[^<{]+')
+JSX_ATTRIBUTE_VALUE_PATTERN = re.compile(r'"[^"]*"?|\'[^\']*\'?|[^\s/>]+')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+JS_PLAIN_PATTERN = re.compile(r'[^\'"`/(){}\[\]<?:&|,=]+')
+JS_STRING_PATTERNS = {
+    '"': re.compile(r'"(?:[^"\\\n]|\\[\s\S])*"?'),
+    "'": re.compile(r"'(?:[^'\\\n]|\\[\s\S])*'?"),
+}
+JS_TEMPLATE_CHUNK_PATTERN = re.compile(r'(?:[^`\\$]|\\[\s\S]|\$(?!\{))*')
+JS_OPERATORS = ('&&', '||', '=>', '?', ':', ',')
+
+# A '<' starts a JSX element when it follows one of these, not an operand
+JSX_EXPRESSION_PREFIX = frozenset('([{,;?:=&|!~+-*%^>')
+
+def scan_template_literal(code, pos):
+    """Return the index just past the template literal starting at pos"""
+    # Brace depth of the ${...} substitution being scanned, 0 in literal
+    # text, and of the substitutions enclosing nested literals
+    depth = 0
+    depths = []
+    pos += 1
+    while pos < len(code):
+        if not depth:
+            pos = JS_TEMPLATE_CHUNK_PATTERN.match(code, pos).end()
+            if pos >= len(code):
+                break
+            if code[pos] == '`':
+                pos += 1
+                if not depths:
+                    return pos
+                depth = depths.pop()
+            else:
+                # ${...} substitution: skip to its closing brace
+                pos += 2
+                depth = 1
+            continue
+        char = code[pos]
+        if char in '\'"':
+            pos = JS_STRING_PATTERNS[char].match(code, pos).end()
+            continue
+        if char == '`':
+            depths.append(depth)
+            depth = 0
+        else:
+            depth += {'{': 1, '}': -1}.get(char, 0)
+        pos += 1
+    return min(pos, len(code))
+
+# Elements, expression containers and brackets nested deeper than this
+# are refused. The parser keeps no call stack, but the stages after it
+# recurse once or more per level.
+MAX_JSX_DEPTH = 200
+
+class JSXParser:
+    """Single pass JSX parser, linear in the size of its input.
+
+    Nesting is tracked on an explicit stack of frames rather than by
+    recursion, and limited to MAX_JSX_DEPTH levels so that the
+    recursive stages after parsing cannot exhaust the call stack.
+    """
+
+    def __init__(self, code):
+        self.code = code
+        self.pos = 0
+        self.depth = 0
+        self.nodes = []
+        self.stack = [{'kind': 'children', 'tag': None, 'children': self.nodes, 'scope': {}}]
+
+    def parse(self):
+        steps = {'children': self.step_children, 'tag': self.step_tag,
+                 'expression': self.step_expression}
+        while self.pos < len(self.code):
+            frame = self.stack[-1]
+            steps[frame['kind']](frame)
+        # Expressions the input left open
+        for frame in self.stack:
+            if frame['kind'] == 'expression':
+                self.join_texts(frame)
+        return self.nodes
+
+    def nest(self):
+        self.depth += 1
+        if self.depth > MAX_JSX_DEPTH:
+            raise ValueError(f'JSX nests more than {MAX_JSX_DEPTH} levels deep')
+
+    def starts_element(self, pos):
+        return pos < len(self.code) and (self.code[pos] == '>' or JSX_NAME_PATTERN.match(self.code, pos) is not None)
+
+    def open_element(self, target, scope):
+        name = JSX_NAME_PATTERN.match(self.code, self.pos + 1)
+        node = {'type': 'element', 'tag': name.group() if name else '', 'attrs': [], 'children': [],
+                 'start': self.pos}
+        target.append(node)
+        self.pos = name.end() if name else self.pos + 1
+        self.nest()
+        self.stack.append({'kind': 'tag', 'node': node, 'scope': scope})
+
+    def open_expression(self):
+        node = {'type': 'expression', 'items': []}
+        self.pos += 1
+        self.nest()
+        self.stack.append({'kind': 'expression', 'items': node['items'], 'levels': [], 'texts': [],
+                           'questions': [], 'last': None, 'scope': {}})
+        return node
+
+    def step_children(self, frame):
+        code, pos = self.code, self.pos
+        children = frame['children']
+        if code[pos] == '{':
+            children.append(self.open_expression())
+        elif code.startswith('<!--', pos):
+            end = code.find('-->', pos + 4)
+            end = len(code) if end < 0 else end
+            children.append({'type': 'comment', 'value': code[pos + 4:end]})
+            self.pos = end + 3
+        elif code.startswith('</', pos):
+            self.close_element(frame)
+        elif code[pos] == '<' and self.starts_element(pos + 1):
+            self.open_element(children, frame['scope'])
+        else:
+            match = JSX_TEXT_PATTERN.match(code, pos)
+            text = match.group() if match else code[pos]
+            if children and children[-1]['type'] == 'text':
+                children[-1]['value'] += text
+            else:
+                children.append({'type': 'text', 'value': text})
+            self.pos = pos + len(text)
+
+    def close_element(self, frame):
+        match = JSX_CLOSING_TAG_PATTERN.match(self.code, self.pos)
+        self.pos = match.end()
+        name = match.group(1) or ''
+        scope = frame['scope']
+        # Stray closing tags are dropped; counting the open tags in scope
+        # keeps that check O(1) instead of a walk down the stack
+        if not scope.get(name):
+            return
+        while True:
+            closed = self.stack.pop()
+            self.depth -= 1
+            scope[closed['tag']] -= 1
+            closed['node']['end'] = self.pos
+            if closed['tag'] == name:
+                return
+
+    def step_tag(self, frame):
+        code = self.code
+        whitespace = WHITESPACE_PATTERN.match(code, self.pos)
+        if whitespace:
+            self.pos = whitespace.end()
+            return
+        node, pos = frame['node'], self.pos
+        if code.startswith('/>', pos):
+            self.pos += 2
+            self.stack.pop()
+            self.depth -= 1
+            node['end'] = self.pos
+        elif code[pos] == '>':
+            self.pos += 1
+            self.stack.pop()
+            tag = node['tag']
+            if tag.lower() in VOID_ELEMENTS:
+                self.depth -= 1
+                node['end'] = self.pos
+            else:
+                frame['scope'][tag] = frame['scope'].get(tag, 0) + 1
+                self.stack.append({'kind': 'children', 'tag': tag, 'node': node,
+                                   'children': node['children'], 'scope': frame['scope']})
+        elif code[pos] == '{':
+            # Spread attribute
+            node['attrs'].append([None, self.open_expression()])
+        else:
+            name = JSX_NAME_PATTERN.match(code, pos)
+            if not name:
+                self.pos += 1
+                return
+            attribute = [name.group(), None]
+            node['attrs'].append(attribute)
+            pos = name.end()
+            whitespace = WHITESPACE_PATTERN.match(code, pos)
+            equals = whitespace.end() if whitespace else pos
+            if not code.startswith('=', equals):
+                self.pos = pos
+                return
+            pos = equals + 1
+            whitespace = WHITESPACE_PATTERN.match(code, pos)
+            self.pos = whitespace.end() if whitespace else pos
+            if code.startswith('{', self.pos):
+                attribute[1] = self.open_expression()
+                return
+            value = JSX_ATTRIBUTE_VALUE_PATTERN.match(code, self.pos)
+            if value:
+                raw = value.group()
+                self.pos = value.end()
+                if raw[0] in '"\'':
+                    raw = raw[1:-1] if len(raw) > 1 and raw[-1] == raw[0] else raw[1:]
+                attribute[1] = raw
+
+    def step_expression(self, frame):
+        code, pos = self.code, self.pos
+        char = code[pos]
+        items = frame['items']
+
+        if char in '\'"':
+            raw = JS_STRING_PATTERNS[char].match(code, pos).group()
+            closed = len(raw) > 1 and raw[-1] == char
+            items.append({'type': 'string', 'quote': char, 'value': raw[1:-1] if closed else raw[1:]})
+            self.pos += len(raw)
+            frame['last'] = 'a'
+        elif char == '`':
+            self.pos = scan_template_literal(code, pos)
+            items.append({'type': 'template', 'value': code[pos:self.pos]})
+            frame['last'] = 'a'
+        elif code.startswith('//', pos) or code.startswith('/*', pos):
+            if code[pos + 1] == '/':
+                end = code.find('\n', pos)
+            else:
+                end = code.find('*/', pos + 2)
+                end = end + 2 if end >= 0 else end
+            self.pos = len(code) if end < 0 else end
+            items.append({'type': 'comment', 'value': code[pos:self.pos]})
+        elif char in '([{':
+            group = {'type': 'group', 'open': char, 'close': '', 'items': []}
+            items.append(group)
+            self.nest()
+            frame['levels'].append((items, frame['questions']))
+            frame['items'], frame['questions'] = group['items'], []
+            frame['last'] = char
+            self.pos += 1
+        elif char in ')]}' and frame['levels']:
+            items, frame['questions'] = frame['levels'].pop()
+            self.depth -= 1
+            items[-1]['close'] = char
+            frame['items'] = items
+            frame['last'] = ')'
+            self.pos += 1
+        elif char == '}':
+            # End of the expression container
+            self.pos += 1
+            self.stack.pop()
+            self.depth -= 1
+            self.join_texts(frame)
+        elif char == '<' and (frame['last'] is None or frame['last'] in JSX_EXPRESSION_PREFIX) \
+                and self.starts_element(pos + 1):
+            frame['last'] = 'a'
+            self.open_element(items, frame['scope'])
+        elif code.startswith(('??', '?.'), pos) and not code[pos + 2:pos + 3].isdigit():
+            self.append_code(frame, code[pos:pos + 2])
+        elif code.startswith(JS_OPERATORS, pos):
+            op = next(op for op in JS_OPERATORS if code.startswith(op, pos))
+            node = {'type': 'op', 'value': op}
+            if op == '?':
+                node['colon'] = None
+                frame['questions'].append(node)
+            elif op == ':' and frame['questions']:
+                frame['questions'].pop()['colon'] = len(items)
+            items.append(node)
+            frame['last'] = op[-1]
+            self.pos += len(op)
+        else:
+            match = JS_PLAIN_PATTERN.match(code, pos)
+            self.append_code(frame, match.group() if match else char)
+
+    def append_code(self, frame, text):
+        # Runs of code are collected as lists and joined once the
+        # expression closes, as growing a string piece by piece is
+        # quadratic in expressions dense with operators
+        items = frame['items']
+        if items and isinstance(items[-1], list):
+            items[-1].append(text)
+        else:
+            items.append([text])
+            frame['texts'].append((items, len(items) - 1))
+        self.pos += len(text)
+        stripped = text.rstrip()
+        if stripped:
+            frame['last'] = stripped[-1]
+            # JSX may follow a return keyword
+            if stripped.endswith('return') and not stripped[:-6][-1:].isidentifier():
+                frame['last'] = '('
+
+    @staticmethod
+    def join_texts(frame):
+        for items, index in frame['texts']:
+            items[index] = ''.join(items[index])
+
+def parse_jsx(code):
+    """Parse JSX (or plain HTML) into a list of nodes"""
+    return JSXParser(code).parse()
+
+def is_group(item, open_char):
+    return isinstance(item, dict) and item['type'] == 'group' and item['open'] == open_char
+
+def is_blank_item(item):
+    if isinstance(item, str):
+        return not item.strip()
+    return item['type'] == 'comment'
+
+def strip_blank_items(items, start, end):
+    """items[start:end] without surrounding whitespace and comments"""
+    while start < end and is_blank_item(items[start]):
+        start += 1
+    while end > start and is_blank_item(items[end - 1]):
+        end -= 1
+    return items[start:end]
+
+def find_op(items, op, start, end, last=False):
+    """Index of the first (or last) top-level operator op in items[start:end]"""
+    indexes = range(end - 1, start - 1, -1) if last else range(start, end)
+    for index in indexes:
+        item = items[index]
+        if isinstance(item, dict) and item['type'] == 'op' and item['value'] == op:
+            return index
+    return None
+
+def split_items(items, op, start, end):
+    """Yield the (start, end) ranges of items separated by top-level op"""
+    for index in range(start, end):
+        item = items[index]
+        if isinstance(item, dict) and item['type'] == 'op' and item['value'] == op:
+            yield start, index
+            start = index + 1
+    yield start, end
+
+def expression_source(items, start=0, end=None):
+    """Approximate JS source of expression items"""
+    parts = []
+    # Groups are walked with an explicit stack so deep nesting is safe
+    stack = [iter(items[start:end])]
+    while stack:
+        item = next(stack[-1], None)
+        if item is None:
+            stack.pop()
+        elif isinstance(item, str):
+            parts.append(item)
+        elif item['type'] == 'group':
+            parts.append(item['open'])
+            stack.append(iter([*item['items'], item['close']]))
+        elif item['type'] == 'string':
+            parts.append(item['quote'] + item['value'] + item['quote'])
+        elif item['type'] == 'element':
+            parts.append(f"<{item['tag']}/>")
+        else:
+            parts.append(item['value'])
+    return ''.join(parts)
+
+# JSX to Webflow tree transforms
+
+EVENT_ATTRIBUTE_PATTERN = re.compile(r'on([A-Z][a-zA-Z]*)$')
+
+# React-only attributes with no meaning in static markup
+REACT_ONLY_ATTRIBUTES = frozenset({'key', 'ref'})
+
+@functools.lru_cache(maxsize=None)
+def parse_html_fragment(html):
+    """Parse a static HTML snippet once; callers must not mutate the nodes"""
+    return tuple(parse_jsx(html))
+
+def transform_jsx(nodes):
+    """Convert parsed JSX nodes to Webflow-compatible element/text nodes"""
+    output = []
+    for node in nodes:
+        transform_node(node, output)
+    return output
+
+def transform_node(node, output):
+    kind = node['type']
+    if kind == 'expression':
+        render_expression(node['items'], 0, len(node['items']), output)
+    elif kind == 'element':
+        children = transform_jsx(node['children'])
+        if not node['tag']:
+            # Fragments contribute only their children
+            output.extend(children)
+        else:
+            output.append({'type': 'element', 'tag': node['tag'],
+                           'attrs': transform_attributes(node['attrs']), 'children': children})
+    else:
+        output.append(node)
+
+def transform_attributes(attrs):
+    converted = []
+    for name, value in attrs:
+        if name is None or name in REACT_ONLY_ATTRIBUTES:
+            continue
         # Convert className to class
-        converted_code = re.sub(r'className=(["\'])([^"\']*)\1', r'class=\1\2\1', converted_code)
-        
-        # Handle inline styles
-        def convert_style(match):
-            style_content = match.group(1)
-            try:
-                # Extract style properties
-                styles = []
-                for prop in re.finditer(r'([a-zA-Z]+):\s*([^,}]+?)(?:,|$|\s*})', style_content):
-                    key, value = prop.groups()
-                    # Convert camelCase to kebab-case
-                    key = re.sub(r'([a-z0-9])([A-Z])', r'\1-\2', key).lower()
-                    # Clean up value
-                    value = value.strip().strip('"\'')
-                    # Add px to numeric values for certain properties
-                    if re.match(r'^\d+$', value) and key in ['padding', 'margin', 'border-radius', 'width', 'height']:
-                        value = f'{value}px'
-                    styles.append(f'{key}: {value}')
-                if styles:
-                    return f'style="{'; '.join(styles)}"'
-                return ''
-            except Exception as e:
-                logger.error(f'Style conversion error: {e}')
-                return ''
-        converted_code = re.sub(r'style={{([^}]+)}}', convert_style, converted_code)
-        
-        # Handle template literals with smart content
-        def replace_template_literal(match):
-            content = match.group(1)
-            # Handle specific template patterns
-            if 'getCategoryName' in content:
-                return 'Electronics'
-            elif 'selectedRating' in content:
-                return '4★ & up'
-            elif 'minPrice' in content:
-                return '$100'
-            elif 'maxPrice' in content:
-                return '$500'
-            elif 'filteredResults.length' in content:
-                return '24'
-            # Replace ${...} expressions with contextual content
-            return re.sub(r'\${([^}]+)}', lambda m: {
-                'category.name': 'Electronics',
-                'category.count': '24',
-                'minPrice': '$100',
-                'maxPrice': '$500',
-                'selectedRating': '4★',
-                'filteredResults.length': '24'
-            }.get(m.group(1), ''), content)
-        converted_code = re.sub(r'`([^`]+)`', replace_template_literal, converted_code)
-        converted_code = re.sub(r'\$\{([^}]+)\}', replace_template_literal, converted_code)
-        
-        # Handle ternary operators and conditional rendering
-        def replace_conditional(match):
-            condition = match.group(1)
-            content = match.group(2) if len(match.groups()) > 1 else match.group(1)
-            
-            # Handle specific conditions
-            if 'selectedRating === stars' in condition:
-                return content.replace('selectedRating === stars ? \'#007bff\' : \'white\'', 'white')\
-                             .replace('selectedRating === stars ? \'white\' : \'#212529\'', '#212529')
-            elif 'selectedCategory' in condition:
-                return 'Electronics'
-            elif 'selectedRating' in condition:
-                return '4★ & up'
-            elif 'minPrice || maxPrice' in condition:
-                return '$100 - $500'
-            
-            # Return the content without conditional wrapper
-            return content.strip()
-            
-        # Handle ternary operators
-        converted_code = re.sub(r'\{([^?]+)\?\s*([^:]+)\s*:\s*([^}]+)\}', replace_conditional, converted_code)
-        # Handle && conditions
-        converted_code = re.sub(r'\{([^}]+)\s*&&\s*([^}]+)\}', replace_conditional, converted_code)
-        
-        # Pre-process map functions before handling other expressions
-        def handle_map_function(match):
-            array_expr = match.group(1)
-            content = match.group(2)
-            
-            if '[5,4,3,2,1]' in array_expr:
-                buttons = []
-                for stars in [5,4,3,2,1]:
-                    buttons.append(f'<button class="star-filter" data-w-click="true" style="padding: 8px 12px; border: 1px solid #dee2e6; border-radius: 4px; background-color: white; color: #212529">{stars}★ & up</button>')
-                return '\n'.join(buttons)
-            elif 'categories' in array_expr:
-                return '''<option value="">All Categories</option>
-                    <option value="electronics">Electronics (24)</option>
-                    <option value="clothing">Clothing (36)</option>
-                    <option value="home">Home & Garden (18)</option>'''
-            elif 'activeFilters' in array_expr:
-                return '''<span class="filter-tag" style="padding: 4px 12px; background-color: #e9ecef; border-radius: 16px; font-size: 14px; display: flex; align-items: center; gap: 8px">Category: Electronics
-                    <button data-w-click="true" style="border: none; background: none; padding: 0; color: #6c757d; cursor: pointer">✕</button></span>'''
-            return ''
-
-        # Handle JSX expressions
-        def convert_jsx_expr(match):
-            expr = match.group(1).strip()
-            
-            # Skip event handlers and style objects
-            if '=>' in expr or '{' in expr:
-                return ''
-            
-            # Handle specific expressions
-            if expr == 'filteredResults.length':
-                return '24'
-            elif 'selectedCategory' in expr:
-                return 'Electronics'
-            elif 'selectedRating' in expr:
-                return '4★ & up'
-            elif 'minPrice' in expr:
-                return '$100'
-            elif 'maxPrice' in expr:
-                return '$500'
-            elif expr == 'text':
-                return 'Click Here'
-            
-            return ''
-        
-        # Process map functions first
-        converted_code = re.sub(r'\{([^}]+)\.map\([^=]+=>[^}]+(\{[^}]+\}|[^}]+)\)\}', handle_map_function, converted_code)
-        
-        # Remove comments
-        converted_code = re.sub(r'\{/\*[^*]*\*/\}', '', converted_code)
-        
-        # Convert remaining JSX expressions
-        converted_code = re.sub(r'\{([^{}]+)\}', convert_jsx_expr, converted_code)
-        
-        # Clean up any remaining React artifacts
-        converted_code = re.sub(r'\$\{[^}]+\}', '', converted_code)
-        converted_code = re.sub(r'`[^`]+`', '', converted_code)
-        
-        # Convert self-closing tags
-        converted_code = re.sub(r'<([\w-]+)([^>]*?)\s*/>', r'<\1\2></\1>', converted_code)
-        
-        # Only apply component patterns and states if the component has state management
-        has_state = 'useState' in react_code or 'state' in react_code
-        if has_state:
-            pattern_name, template = detect_component_pattern(converted_code)
-            if pattern_name:
-                logger.info(f'Detected {pattern_name} component pattern')
-                converted_code = template.strip()
-            converted_code = handle_component_states(converted_code)
-        
-        # Clean up whitespace and formatting
-        converted_code += react_code
-        
-        # Format the HTML
-        try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(converted_code, 'html.parser')
-            converted_code = soup.prettify()
-        except ImportError:
-            # Basic formatting if BeautifulSoup is not available
-            # Basic formatting if BeautifulSoup is not available
-            converted_code = re.sub(r'\s+', ' ', converted_code)
-            converted_code = re.sub(r'>\s+<', '>\n<', converted_code)
-            converted_code = re.sub(r'<!--|-->', lambda m: f'\n{m.group(0)}\n', converted_code)
-        
-        # Clean up HTML encoding
-        converted_code = converted_code.replace('&amp;', '&')
-        converted_code = converted_code.replace('&lt;', '<')
-        converted_code = converted_code.replace('&gt;', '>')
-        
-        logger.info('Conversion completed successfully')
-        return converted_code.strip()
-            
-    except Exception as e:
-        logger.error(f'Conversion error: {e}')
-        raise Exception(f'Failed to convert React code: {str(e)}')
+        if name == 'className':
+            name = 'class'
+        if isinstance(value, dict):
+            items = value['items']
+            event = EVENT_ATTRIBUTE_PATTERN.match(name)
+            if event:
+                name = convert_event_handler(event.group(1))
+                if name:
+                    converted.append([name, 'true'])
+                continue
+            if name == 'style':
+                value = convert_style(items)
+                if value:
+                    converted.append([name, value])
+                continue
+            value = attribute_text(items, 0, len(items))
+        converted.append([name, value])
+    return converted
 
-@app.route('/')
-def home():
-    return app.send_static_file('index.html')
+def attribute_text(items, start, end):
+    """Static value of an attribute expression.
 
-@app.route('/convert', methods=['POST'])
-def convert():
-    logger.info('=== Received conversion request ===')
-    logger.info(f'Request headers: {dict(request.headers)}')
-    logger.info(f'Request method: {request.method}')
-    try:
-        data = request.get_json()
-        if not data:
-            logger.error('No JSON data received')
-            return jsonify({'error': 'No data received'}), 400
+    Attributes take the consequent of a ternary and the last operand of
+    && as text does, but never the sample text of the condition, which
+    would make no sense as e.g. a class name.
+    """
+    while True:
+        question = find_op(items, '?', start, end)
+        if question is not None:
+            colon = items[question]['colon']
+            start, end = question + 1, colon if colon is not None else end
+            continue
+        conjunction = find_op(items, '&&', start, end, last=True)
+        if conjunction is not None:
+            start = conjunction + 1
+            continue
+        stripped = strip_blank_items(items, start, end)
+        if len(stripped) == 1 and is_group(stripped[0], '('):
+            items = stripped[0]['items']
+            start, end = 0, len(items)
+            continue
+        return expression_text(items, start, end)
 
-        react_code = data.get('react_code')
-        if not react_code:
-            logger.error('No code provided in request')
-            return jsonify({'error': 'No code provided'}), 400
+def expression_text(items, start, end):
+    """Static text for a JS expression used as a value"""
+    items = strip_blank_items(items, start, end)
+    if len(items) == 1 and isinstance(items[0], dict):
+        if items[0]['type'] == 'string':
+            return items[0]['value']
+        if items[0]['type'] == 'template':
+            return replace_template_literal(items[0]['value'][1:-1])
+    return convert_jsx_expr(expression_source(items))
 
-        logger.debug(f'Received code: {react_code}')
-        converted_code = convert_react_to_webflow(react_code)
-        logger.debug(f'Converted code: {converted_code}')
+# .map() calls render what their callback returns once, as a repeat node
+# that is only expanded when serialized:
+#   {'type': 'repeat', 'count': n, 'children': [...]}
+# The count of an array literal is its length. Other arrays have a count
+# of None, which serializes as the repeat option's count.
+REPEAT_COUNT = 3
+MAX_REPEAT_COUNT = int(os.environ.get('MAX_REPEAT_COUNT', 1000))
+# Nested repeats multiply, this caps the rows they expand to in total
+MAX_REPEAT_ROWS = int(os.environ.get('MAX_REPEAT_ROWS', 10000))
 
-        return jsonify({'converted_code': converted_code})
-    except Exception as e:
+RETURN_PATTERN = re.compile(r'\breturn\b')
+
+def map_call(items, start, end):
+    """Array items and callback group of an `<array>.map(...)` expression, or None"""
+    items = strip_blank_items(items, start, end)
+    if len(items) < 2 or not is_group(items[-1], '(') or not isinstance(items[-2], str):
+        return None
+    callee = items[-2].rstrip()
+    if not callee.endswith('.map'):
+        return None
+    array = items[:-2]
+    if callee[:-4]:
+        array = [*array, callee[:-4]]
+    return array, items[-1]
+
+def array_length(items):
+    """Number of elements of an array literal, or None for other arrays"""
+    items = strip_blank_items(items, 0, len(items))
+    if len(items) != 1 or not is_group(items[0], '['):
+        return None
+    elements = items[0]['items']
+    return sum(1 for start, end in split_items(elements, ',', 0, len(elements))
+               if strip_blank_items(elements, start, end))
+
+def callback_body(items):
+    """Items of the expression a callback returns, or None"""
+    arrow = find_op(items, '=>', 0, len(items))
+    if arrow is not None:
+        body = strip_blank_items(items, arrow + 1, len(items))
+    else:
+        # function (item) { ... }
+        body = strip_blank_items(items, 0, len(items))[-1:]
+    if len(body) != 1 or not is_group(body[0], '{'):
+        return body
+    return returned_items(body[0]['items'])
+
+def returned_items(block):
+    """Items of the expression a function body's last top-level return returns, or None"""
+    for index in range(len(block) - 1, -1, -1):
+        item = block[index]
+        if isinstance(item, str) and RETURN_PATTERN.search(item):
+            returned = item[[*RETURN_PATTERN.finditer(item)][-1].end():]
+            body = strip_blank_items([returned, *block[index + 1:]], 0, len(block) - index)
+            break
+    else:
+        return None
+    if body and isinstance(body[-1], str) and body[-1].rstrip().endswith(';'):
+        body = [*body[:-1], body[-1].rstrip()[:-1]]
+    return body
+
+def expression_nodes(items):
+    """Parsed JSX nodes for expression items: the element they are, else an expression"""
+    items = strip_blank_items(items, 0, len(items))
+    while len(items) == 1 and is_group(items[0], '('):
+        items = strip_blank_items(items[0]['items'], 0, len(items[0]['items']))
+    if len(items) == 1 and isinstance(items[0], dict) and items[0]['type'] == 'element':
+        return [items[0]]
+    return [{'type': 'expression', 'items': items}]
+
+def parse_component(code):
+    """Parse the JSX a component returns, from its strip_component_wrapper source"""
+    nodes = parse_jsx(code)
+    if code.startswith('{'):
+        # A function body: render what its return statement returns
+        body = [node for node in nodes if node['type'] != 'text' or node['value'].strip()]
+        if len(body) == 1 and body[0]['type'] == 'expression':
+            returned = returned_items(body[0]['items'])
+            if returned is not None:
+                nodes = expression_nodes(returned)
+    return nodes
+
+def repeat_count(node):
+    return REPEAT_COUNT if node['count'] is None else node['count']
+
+def set_repeat_counts(nodes, count):
+    """Copies of nodes with repeats of unknown length given count"""
+    output = []
+    for node in nodes:
+        if node['type'] == 'repeat':
+            node = dict(node, count=count if node['count'] is None else node['count'],
+                        children=set_repeat_counts(node['children'], count))
+        elif node['type'] == 'element':
+            node = dict(node, children=set_repeat_counts(node['children'], count))
+        output.append(node)
+    return output
+
+def repeat_rows(nodes):
+    """Rows the repeats in nodes expand to, nested repeats multiplying"""
+    total = 0
+    stack = [(nodes, 1)]
+    while stack:
+        nodes, rows = stack.pop()
+        for node in nodes:
+            if node['type'] == 'repeat':
+                count = rows * repeat_count(node)
+                total += count
+                stack.append((node['children'], count))
+            elif node['type'] == 'element':
+                stack.append((node['children'], rows))
+    return total
+
+def nesting_depth(nodes):
+    """Deepest nesting of elements and repeats in nodes"""
+    deepest = 0
+    stack = [(nodes, 0)]
+    while stack:
+        nodes, depth = stack.pop()
+        deepest = max(deepest, depth)
+        for node in nodes:
+            if node['type'] in ('element', 'repeat'):
+                stack.append((node['children'], depth + 1))
+    return deepest
+
+def check_repeat_rows(rows):
+    if rows > MAX_REPEAT_ROWS:
+        raise ValueError(f'Repeats expand to {rows} rows, over the limit of {MAX_REPEAT_ROWS}; lower the repeat count')
+
+def render_expression(items, start, end, output):
+    """Append the nodes an expression container renders to output"""
+    # Ternaries: render the consequent unless the condition has sample text
+    question = find_op(items, '?', start, end)
+    if question is not None:
+        placeholder = replace_conditional(expression_source(items, start, question))
+        if placeholder is not None:
+            output.append({'type': 'text', 'value': placeholder})
+            return
+        colon = items[question]['colon']
+        render_expression(items, question + 1, colon if colon is not None else end, output)
+        return
+
+    # && conditions render their last operand
+    conjunction = find_op(items, '&&', start, end, last=True)
+    if conjunction is not None:
+        placeholder = replace_conditional(expression_source(items, start, conjunction))
+        if placeholder is not None:
+            output.append({'type': 'text', 'value': placeholder})
+            return
+        render_expression(items, conjunction + 1, end, output)
+        return
+
+    call = map_call(items, start, end)
+    if call is not None:
+        array, callback = call
+        body = callback_body(callback['items'])
+        rows = []
+        if body:
+            render_expression(body, 0, len(body), rows)
+        if rows:
+            output.append({'type': 'repeat', 'count': array_length(array), 'children': rows})
+        return
+
+    stripped = strip_blank_items(items, start, end)
+    if not stripped:
+        # Empty or comment-only container
+        return
+    if len(stripped) == 1 and isinstance(stripped[0], dict):
+        item = stripped[0]
+        if item['type'] == 'element':
+            transform_node(item, output)
+            return
+        if item['type'] == 'group' and item['open'] == '(':
+            render_expression(item['items'], 0, len(item['items']), output)
+            return
+    text = expression_text(stripped, 0, len(stripped))
+    if text:
+        output.append({'type': 'text', 'value': text})
+
+def render_attribute(name, value):
+    if value is None:
+        return f' {name}'
+    quote = "'" if '"' in value else '"'
+    return f' {name}={quote}{value}{quote}'
+
+def render_html(nodes):
+    """Serialize transformed nodes to HTML"""
+    parts = []
+    render_html_nodes(nodes, parts)
+    return ''.join(parts)
+
+def render_html_nodes(nodes, parts):
+    for node in nodes:
+        if node['type'] == 'text':
+            parts.append(node['value'])
+        elif node['type'] == 'comment':
+            parts.append(f"<!--{node['value']}-->")
+        elif node['type'] == 'repeat':
+            parts.extend([render_html(node['children'])] * repeat_count(node))
+        else:
+            tag = node['tag']
+            parts.append(f'<{tag}')
+            parts.extend(render_attribute(name, value) for name, value in node['attrs'])
+            parts.append('>')
+            if tag.lower() in VOID_ELEMENTS and not node['children']:
+                continue
+            render_html_nodes(node['children'], parts)
+            parts.append(f'</{tag}>')
+
+# HTML formatting
+
+HTML_FORMATS = ('pretty', 'minified', 'none')
+
+# 'webflow' is Webflow's clipboard JSON, pasted straight into the Designer
+OUTPUT_FORMATS = HTML_FORMATS + ('webflow',)
+
+# Elements whose contents are whitespace sensitive and kept verbatim
+RAW_TEXT_ELEMENTS = frozenset({'pre', 'textarea', 'script', 'style'})
+
+# Whitespace at the edges of a text run that spans lines, dropped when minifying
+LINE_EDGE_PATTERN = re.compile(r'^\s*\n\s*|\s*\n\s*$')
+
+def format_html(nodes, output_format='pretty', indent=''):
+    """Serialize nodes as indented, minified or unformatted HTML, or as
+    Webflow clipboard JSON.
+
+    Text is written as is, never escaped, so the output needs no
+    unescaping afterwards. Formatted output lowercases tag and attribute
+    names; minified output also drops comments and collapses whitespace.
+    Pretty output starts at the given indent.
+    """
+    if output_format == 'none':
+        return render_html(nodes)
+    if output_format == 'webflow':
+        return webflow_clipboard(nodes)
+    parts = []
+    if output_format == 'minified':
+        minify_html_nodes(nodes, parts)
+    else:
+        indent_html_nodes(nodes, indent, parts)
+    return ''.join(parts)
+
+def start_tag(node, bare_attributes):
+    parts = [f"<{node['tag'].lower()}"]
+    for name, value in node['attrs']:
+        if value is None and not bare_attributes:
+            value = ''
+        parts.append(render_attribute(name.lower(), value))
+    return ''.join(parts)
+
+def indent_html_nodes(nodes, indent, parts):
+    """One tag or text run per line, one space of indent per level"""
+    text = []
+    for node in nodes:
+        kind = node['type']
+        if kind == 'text':
+            # Adjacent text nodes (e.g. around a rendered expression) share a line
+            text.append(node['value'])
+            continue
+        if text:
+            indent_text(text, indent, parts)
+            text = []
+        if kind == 'comment':
+            parts.append(f"{indent}<!--{node['value']}-->\n")
+        elif kind == 'repeat':
+            # Every row serializes the same, so it is formatted once
+            row = []
+            indent_html_nodes(node['children'], indent, row)
+            parts.extend([''.join(row)] * repeat_count(node))
+        elif kind == 'expression':
+            parts.append(f"{indent}{{{expression_source(node['items'])}}}\n")
+        else:
+            tag = node['tag'].lower()
+            children = node['children']
+            if tag in VOID_ELEMENTS and not children:
+                parts.append(f'{indent}{start_tag(node, False)}/>\n')
+            elif tag in RAW_TEXT_ELEMENTS:
+                parts.append(f'{indent}{start_tag(node, False)}>{render_html(children)}</{tag}>\n')
+            else:
+                parts.append(f'{indent}{start_tag(node, False)}>\n')
+                indent_html_nodes(children, indent + ' ', parts)
+                parts.append(f'{indent}</{tag}>\n')
+    if text:
+        indent_text(text, indent, parts)
+
+def indent_text(text, indent, parts):
+    text = ''.join(text).strip()
+    if text:
+        parts.append(f'{indent}{text}\n')
+
+def minify_html_nodes(nodes, parts):
+    for node in nodes:
+        kind = node['type']
+        if kind == 'text':
+            # Like JSX, whitespace that spans lines only separates tags
+            text = LINE_EDGE_PATTERN.sub('', node['value'])
+            if text:
+                parts.append(WHITESPACE_PATTERN.sub(' ', text))
+        elif kind == 'expression':
+            parts.append(f"{{{expression_source(node['items'])}}}")
+        elif kind == 'repeat':
+            row = []
+            minify_html_nodes(node['children'], row)
+            parts.extend([''.join(row)] * repeat_count(node))
+        elif kind == 'element':
+            tag = node['tag'].lower()
+            children = node['children']
+            parts.append(start_tag(node, True))
+            parts.append('>')
+            if tag in VOID_ELEMENTS and not children:
+                continue
+            if tag in RAW_TEXT_ELEMENTS:
+                parts.append(render_html(children))
+            else:
+                minify_html_nodes(children, parts)
+            parts.append(f'</{tag}>')
+
+# Styles used more than once can be hoisted into generated classes
+HOISTED_STYLE_PREFIX = 'wf-s-'
+
+def style_declarations(style):
+    """A style attribute's declarations with whitespace normalized"""
+    return WHITESPACE_PATTERN.sub(' ', style).strip().rstrip(';').rstrip()
+
+def count_styles(nodes, uses):
+    for node in nodes:
+        if node['type'] == 'repeat':
+            row = {}
+            count_styles(node['children'], row)
+            for style, count in row.items():
+                uses[style] = uses.get(style, 0) + count * repeat_count(node)
+        elif node['type'] == 'element':
+            for name, value in node['attrs']:
+                if name == 'style' and value:
+                    style = style_declarations(value)
+                    uses[style] = uses.get(style, 0) + 1
+            count_styles(node['children'], uses)
+
+def apply_style_classes(nodes, classes):
+    """Copies of nodes with hoisted style attributes replaced by classes"""
+    output = []
+    for node in nodes:
+        if node['type'] == 'element':
+            attrs = []
+            hoisted = None
+            for name, value in node['attrs']:
+                if name == 'style' and value and style_declarations(value) in classes:
+                    hoisted = classes[style_declarations(value)]
+                else:
+                    attrs.append([name, value])
+            if hoisted:
+                for attr in attrs:
+                    if attr[0] == 'class' and attr[1]:
+                        attr[1] = f'{attr[1]} {hoisted}'
+                        break
+                else:
+                    attrs.append(['class', hoisted])
+            node = dict(node, attrs=attrs, children=apply_style_classes(node['children'], classes))
+        elif node['type'] == 'repeat':
+            node = dict(node, children=apply_style_classes(node['children'], classes))
+        output.append(node)
+    return output
+
+def hoist_styles(nodes, output_format='pretty'):
+    """Move styles used more than once into classes and one stylesheet.
+
+    Identical declarations share a class named after their hash, so
+    names are stable across conversions. The rules go in a <style>
+    element after the generated comment; styles used once stay inline.
+    Webflow clipboard output has a style table of its own and is left
+    as is.
+    """
+    if output_format == 'webflow':
+        return nodes
+    uses = {}
+    count_styles(nodes, uses)
+    classes = {style: HOISTED_STYLE_PREFIX + hashlib.sha1(style.encode()).hexdigest()[:8]
+               for style, count in uses.items() if count > 1}
+    if not classes:
+        return nodes
+    if output_format == 'minified':
+        css = ''.join(f'.{name}{{{style}}}' for style, name in classes.items())
+    else:
+        css = ''.join(f'\n.{name} {{ {style} }}' for style, name in classes.items()) + '\n'
+    sheet = {'type': 'element', 'tag': 'style', 'attrs': [], 'children': [{'type': 'text', 'value': css}]}
+    nodes = apply_style_classes(nodes, classes)
+    start = 2 if nodes[:1] == [{'type': 'comment', 'value': GENERATED_COMMENT}] else 0
+    return nodes[:start] + [sheet, {'type': 'text', 'value': '\n'}] + nodes[start:]
+
+# Webflow clipboard output
+#
+# Webflow's Designer pastes "@webflow/XscpData" JSON: a flat list of
+# nodes referring to their children by id, and a table of class styles
+# the nodes refer to by id. Classes and inline styles go in the style
+# table once each, however many elements use them. Inline styles become
+# classes named like hoisted styles; the second and later classes of an
+# element are combo classes, as Webflow requires.
+
+# Tag: Webflow element type; other tags are Blocks with their tag kept
+WEBFLOW_ELEMENT_TYPES = {
+    'h1': 'Heading', 'h2': 'Heading', 'h3': 'Heading', 'h4': 'Heading', 'h5': 'Heading', 'h6': 'Heading',
+    'p': 'Paragraph',
+    'a': 'Link',
+    'img': 'Image',
+    'ul': 'List', 'ol': 'List',
+    'li': 'ListItem',
+    'span': 'Span',
+    'strong': 'Strong', 'b': 'Strong',
+    'em': 'Emphasized', 'i': 'Emphasized',
+    'blockquote': 'Blockquote',
+    'br': 'LineBreak',
+}
+
+# Attributes Webflow keeps in an element's own data rather than as
+# custom attributes
+WEBFLOW_DATA_ATTRIBUTES = {
+    'Link': ('href', 'target'),
+    'Image': ('src', 'alt', 'width', 'height', 'loading'),
+}
+
+WEBFLOW_ID_NAMESPACE = uuid.UUID('8f6c2a1e-5b7d-4c3e-9a0f-2d4b6e8a1c3f')
+
+def webflow_id(*parts):
+    """A stable id, so identical conversions produce identical JSON"""
+    return str(uuid.uuid5(WEBFLOW_ID_NAMESPACE, '/'.join(parts)))
+
+def webflow_style(styles, name, combo, style_less=''):
+    """A class style, added to the style table on first use"""
+    key = (name, combo)
+    style = styles.get(key)
+    if style is None:
+        style = styles[key] = {
+            '_id': webflow_id('style', name, '&' if combo else ''), 'fake': False, 'type': 'class',
+            'name': name, 'namespace': '', 'comb': '&' if combo else '', 'styleLess': style_less,
+            'variants': {}, 'children': [], 'selector': None,
+        }
+    return style
+
+def webflow_element(node, output, styles, raw=False):
+    """Append the Webflow node of an element and its descendants, and return it"""
+    tag = node['tag'].lower()
+    kind = WEBFLOW_ELEMENT_TYPES.get(tag, 'Block')
+    data_attributes = WEBFLOW_DATA_ATTRIBUTES.get(kind, ())
+    names = []
+    inline_style = None
+    data = {'tag': tag}
+    xattr = []
+    for name, value in node['attrs']:
+        value = '' if value is None else html.unescape(value)
+        if name == 'class':
+            names.extend(value.split())
+        elif name == 'style':
+            inline_style = style_declarations(value)
+        elif name in data_attributes:
+            data.setdefault('attr', {})[name] = value
+        else:
+            xattr.append({'name': name, 'value': value})
+    if kind == 'Link':
+        attr = data.pop('attr', {})
+        data['link'] = {'mode': 'external', 'url': attr.get('href', '#')}
+        if 'target' in attr:
+            data['link']['target'] = attr['target']
+    elif kind == 'Image':
+        data['img'] = {'id': ''}
+    elif kind == 'List':
+        data['list'] = {'type': 'list', 'unstyled': False}
+    if xattr:
+        data['xattr'] = xattr
+
+    classes = [webflow_style(styles, name, index > 0) for index, name in enumerate(dict.fromkeys(names))]
+    if inline_style:
+        name = HOISTED_STYLE_PREFIX + hashlib.sha1(inline_style.encode()).hexdigest()[:8]
+        classes.append(webflow_style(styles, name, bool(classes), inline_style + ';'))
+    for combo in classes[1:]:
+        if combo['_id'] not in classes[0]['children']:
+            classes[0]['children'].append(combo['_id'])
+
+    element = {'_id': webflow_id('node', str(len(output))), 'type': kind, 'tag': tag,
+               'classes': [style['_id'] for style in classes], 'children': [], 'data': data}
+    output.append(element)
+    children = webflow_nodes(node['children'], output, styles, raw or tag in RAW_TEXT_ELEMENTS)
+    element['children'] = [child['_id'] for child in children]
+    data['text'] = bool(children) and all(child.get('text') for child in children)
+    return element
+
+def webflow_text(value, output):
+    output.append({'_id': webflow_id('node', str(len(output))), 'text': True, 'v': html.unescape(value)})
+    return output[-1]
+
+def webflow_nodes(nodes, output, styles, raw=False):
+    """Append the Webflow nodes of a sibling list, and return them"""
+    siblings = []
+    for node in nodes:
+        kind = node['type']
+        if kind == 'text':
+            # Like JSX, whitespace that spans lines only separates tags
+            text = node['value'] if raw else WHITESPACE_PATTERN.sub(' ', LINE_EDGE_PATTERN.sub('', node['value']))
+            if text:
+                siblings.append(webflow_text(text, output))
+        elif kind == 'expression':
+            siblings.append(webflow_text(f"{{{expression_source(node['items'])}}}", output))
+        elif kind == 'repeat':
+            # Webflow needs distinct nodes, with ids of their own, per row
+            for _ in range(repeat_count(node)):
+                siblings.extend(webflow_nodes(node['children'], output, styles, raw))
+        elif kind == 'element' and not node['tag']:
+            # Fragments add their children to their parent
+            siblings.extend(webflow_nodes(node['children'], output, styles, raw))
+        elif kind == 'element':
+            siblings.append(webflow_element(node, output, styles, raw))
+    return siblings
+
+def webflow_clipboard(nodes):
+    """Webflow clipboard JSON for the nodes, in one pass over them.
+
+    Comments are dropped. Text is unescaped, since Webflow stores it as
+    plain text.
+    """
+    output = []
+    styles = {}
+    webflow_nodes(nodes, output, styles)
+    return json.dumps({
+        'type': '@webflow/XscpData',
+        'payload': {
+            'nodes': output,
+            'styles': list(styles.values()),
+            'assets': [],
+            'ix1': [],
+            'ix2': {'interactions': [], 'events': [], 'actionLists': []},
+        },
+        'meta': {'unlinkedSymbolCount': 0, 'droppedLinks': 0, 'dynBindRemovedCount': 0,
+                 'dynListBindRemovedCount': 0, 'paginationRemovedCount': 0},
+    }, ensure_ascii=False, separators=(',', ':'))
+
+def apply_conversion_options(nodes, output_format, options):
+    """nodes with the non-default CONVERSION_OPTIONS applied"""
+    if not options:
+        return nodes
+    if 'repeat' in options:
+        nodes = set_repeat_counts(nodes, options['repeat'])
+        check_repeat_rows(repeat_rows(nodes))
+    if options.get('styles') == 'classes':
+        nodes = hoist_styles(nodes, output_format)
+    return nodes
+
+def lap(timings, stage, started):
+    """Add the time since started to a stage and return the current time"""
+    now = time.perf_counter()
+    timings[stage] = timings.get(stage, 0.0) + now - started
+    return now
+
+GENERATED_COMMENT = ' Generated by React to Webflow Converter '
+
+def uses_state(react_code):
+    """Whether component patterns and states apply to the code"""
+    return 'useState' in react_code or 'state' in react_code
+
+def inline_components(nodes, components):
+    """Replace elements of child components with their markup nodes"""
+    output = []
+    for node in nodes:
+        if node['type'] == 'repeat':
+            output.append(dict(node, children=inline_components(node['children'], components)))
+        elif node['type'] != 'element':
+            output.append(node)
+        elif node['tag'] in components:
+            output.extend(components[node['tag']])
+        else:
+            output.append(dict(node, children=inline_components(node['children'], components)))
+    return output
+
+def convert_react_to_nodes(react_code, timings, components=None):
+    """Convert a React component to the nodes of its Webflow HTML.
+
+    components maps tags of child components to markup that replaces
+    their elements; the props and children they are given are dropped.
+    """
+    mark = time.perf_counter()
+    
+    # Add HTML comment to indicate source
+    nodes = [{'type': 'comment', 'value': GENERATED_COMMENT}, {'type': 'text', 'value': '\n'}]
+    
+    # Remove import statements, exports, function declaration and return statement
+    react_code = strip_component_wrapper(react_code)
+    mark = lap(timings, 'strip', mark)
+    
+    # Parse the JSX and convert maps, event handlers, classes, styles,
+    # template literals and conditionals on the tree
+    parsed = parse_component(react_code)
+    mark = lap(timings, 'parse', mark)
+    nodes.extend(transform_jsx(parsed))
+    if components:
+        nodes = inline_components(nodes, {tag: parse_jsx(markup) for tag, markup in components.items()})
+        # Inlined children nest their markup inside the parent's
+        if nesting_depth(nodes) > MAX_JSX_DEPTH:
+            raise ValueError(f'Markup with its child components inlined nests more than {MAX_JSX_DEPTH} levels deep')
+    check_repeat_rows(repeat_rows(nodes))
+    mark = lap(timings, 'transform', mark)
+    
+    # Only apply component patterns and states if the component has state management
+    if uses_state(react_code):
+        converted_code = render_html(nodes)
+        pattern_name, template = detect_component_pattern(converted_code)
+        if pattern_name:
+            logger.info(f'Detected {pattern_name} component pattern')
+            converted_code = template.strip()
+            nodes = list(parse_html_fragment(converted_code))
+        mark = lap(timings, 'patterns', mark)
+        component_type = detect_state_type(converted_code)
+        if component_type:
+            nodes = state_variation_nodes(nodes, component_type)
+        lap(timings, 'states', mark)
+    return nodes
+
+def convert_react_to_webflow(react_code, output_format='pretty', timings=None, components=None, options=None):
+    """Convert a React component to Webflow HTML.
+
+    When given, timings receives the seconds spent in each stage,
+    components maps child component tags to markup to inline, and
+    options holds the non-default CONVERSION_OPTIONS.
+    """
+    if timings is None:
+        timings = {}
+    try:
+        logger.info('Starting conversion of React code')
+        logger.debug(f'Input code:\n{react_code}')
+        nodes = convert_react_to_nodes(react_code, timings, components)
+        
+        # Format the HTML
+        mark = time.perf_counter()
+        nodes = apply_conversion_options(nodes, output_format, options)
+        converted_code = format_html(nodes, output_format)
+        lap(timings, 'format', mark)
+        
+        logger.info('Conversion completed successfully')
+        return converted_code.strip()
+            
+    except MemoryError:
+        # Let callers tell an exhausted memory limit from bad input
+        raise
+    except Exception as e:
+        logger.error(f'Conversion error: {e}')
+        raise Exception(f'Failed to convert React code: {str(e)}')
+
+# Isolated conversion settings
+CONVERT_WORKERS = int(os.environ.get('CONVERT_WORKERS', 0 if SERVERLESS else os.cpu_count() or 1))
+CONVERT_TIMEOUT = float(os.environ.get('CONVERT_TIMEOUT', 10))
+CONVERT_MEMORY_LIMIT = int(os.environ.get('CONVERT_MEMORY_LIMIT', 512)) * 1024 * 1024
+
+def limit_memory(memory_limit):
+    """Cap the address space of this worker process"""
+    if memory_limit and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+def conversion_worker(connection, memory_limit):
+    """Run calls from a pipe until it closes; runs in a worker process"""
+    limit_memory(memory_limit)
+    while True:
+        try:
+            function, args = connection.recv()
+        except EOFError:
+            return
+        try:
+            result = ('ok', function(*args))
+        except MemoryError:
+            result = ('memory', None)
+        except Exception as e:
+            result = ('error', str(e))
+        connection.send(result)
+
+def convert_timed(react_code, output_format, options):
+    """Converted code and the timings of its stages"""
+    timings = {}
+    return convert_react_to_webflow(react_code, output_format, timings, options=options), timings
+
+class ConversionWorkers:
+    """Worker processes running conversions under a deadline and memory cap.
+
+    Each conversion checks out an idle worker. A worker that misses the
+    deadline, runs out of memory or dies is killed and replaced, so a
+    pathological input only costs its own request. Workers forked before
+    a rule was registered are replaced too. Workers start on
+    first use; with size 0, or where processes are unavailable,
+    conversions run in the calling thread without limits.
+    """
+
+    def __init__(self, size, timeout, memory_limit):
+        self.size = size
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.slots = threading.BoundedSemaphore(max(size, 1))
+        self.idle = []
+        self.lock = threading.Lock()
+        self.disabled = size < 1
+
+    def start(self):
+        import multiprocessing
+        connection, child_connection = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=conversion_worker, daemon=True,
+                                          args=(child_connection, self.memory_limit))
+        process.start()
+        child_connection.close()
+        worker_events.inc('started')
+        return process, connection, conversion_rules_revision
+
+    def stop(self, worker, cause):
+        process, connection, _ = worker
+        process.kill()
+        process.join(1)
+        connection.close()
+        worker_events.inc(cause)
+
+    def run(self, function, *args):
+        """function(*args), called in a worker; function must be module-level"""
+        if self.disabled:
+            return function(*args)
+
+        with self.slots:
+            with self.lock:
+                worker = self.idle.pop() if self.idle else None
+            if worker is not None and worker[2] != conversion_rules_revision:
+                self.stop(worker, 'recycled')
+                worker = None
+            try:
+                if worker is None or not worker[0].is_alive():
+                    worker = self.start()
+            except OSError as e:
+                logger.warning(f'Conversion workers unavailable, converting inline: {e}')
+                self.disabled = True
+                return function(*args)
+
+            try:
+                connection = worker[1]
+                connection.send((function, args))
+                if not connection.poll(self.timeout):
+                    self.stop(worker, 'timeout')
+                    worker = None
+                    raise TimeoutError(f'Conversion exceeded its time budget of {self.timeout:g}s')
+                status, value = connection.recv()
+                if status == 'memory':
+                    # The worker survived the MemoryError, but recycle it anyway
+                    self.stop(worker, 'memory')
+                    worker = None
+                    raise MemoryError(f'Conversion exceeded its memory limit of '
+                                      f'{self.memory_limit // (1024 * 1024)} MB')
+            except TimeoutError:
+                raise
+            except (EOFError, OSError):
+                self.stop(worker, 'crashed')
+                worker = None
+                raise ChildProcessError('Conversion worker exited unexpectedly')
+            finally:
+                if worker is not None:
+                    with self.lock:
+                        self.idle.append(worker)
+
+        if status == 'error':
+            raise Exception(value)
+        return value
+
+conversion_workers = ConversionWorkers(CONVERT_WORKERS, CONVERT_TIMEOUT, CONVERT_MEMORY_LIMIT)
+
+# Admission control settings
+MAX_QUEUED_CONVERSIONS = int(os.environ.get('MAX_QUEUED_CONVERSIONS', 64))
+LARGE_INPUT_SIZE = int(os.environ.get('LARGE_INPUT_SIZE', 32 * 1024))
+ADMISSION_LANES = ('small', 'large')
+
+class AdmissionQueue:
+    """Bounded, size-aware admission of conversions to the workers.
+
+    At most slots conversions run at once, and requests over the limit
+    wait in a small or large lane by input size. A free slot goes to the
+    oldest small request first, and large conversions never hold more
+    than half of the slots, so a burst of big dashboards cannot starve
+    the small snippets. Once depth requests are waiting, more are
+    refused with queue.Full.
+    """
+
+    def __init__(self, slots, depth, large_size):
+        self.slots = slots
+        self.depth = depth
+        self.large_size = large_size
+        self.large_slots = max(1, slots // 2)
+        self.running = dict.fromkeys(ADMISSION_LANES, 0)
+        self.waiting = {lane: deque() for lane in ADMISSION_LANES}
+        self.condition = threading.Condition()
+        # Moving average of conversion times, for Retry-After
+        self.average_seconds = 0.1
+
+    def lane(self, size):
+        return 'large' if size >= self.large_size else 'small'
+
+    def admissible(self, lane, ticket):
+        free = self.slots - sum(self.running.values())
+        if self.waiting[lane][0] is not ticket or free < 1:
+            return False
+        if lane == 'small':
+            return True
+        return self.running['large'] < self.large_slots and free > len(self.waiting['small'])
+
+    def enter(self, size):
+        """Wait for a slot; returns the lane and the seconds waited"""
+        lane = self.lane(size)
+        ticket = object()
+        started = time.perf_counter()
+        with self.condition:
+            if sum(len(waiting) for waiting in self.waiting.values()) >= self.depth:
+                admissions_total.inc('rejected')
+                raise queue.Full(f'{self.depth} conversions are already waiting')
+            self.waiting[lane].append(ticket)
+            while not self.admissible(lane, ticket):
+                self.condition.wait()
+            self.waiting[lane].popleft()
+            self.running[lane] += 1
+            # A slot may still be free for the next waiter
+            self.condition.notify_all()
+        waited = time.perf_counter() - started
+        admissions_total.inc('admitted')
+        queue_wait_seconds.observe(waited, lane)
+        return lane, waited
+
+    def leave(self, lane, seconds):
+        with self.condition:
+            self.running[lane] -= 1
+            self.average_seconds += (seconds - self.average_seconds) / 10
+            self.condition.notify_all()
+
+    def retry_after(self):
+        """Seconds until the current queue has likely drained"""
+        with self.condition:
+            waiting = sum(len(waiting) for waiting in self.waiting.values())
+        return max(1, math.ceil(waiting * self.average_seconds / self.slots))
+
+    def depths(self):
+        with self.condition:
+            return {lane: len(self.waiting[lane]) for lane in ADMISSION_LANES}
+
+admission = AdmissionQueue(max(CONVERT_WORKERS, 1), MAX_QUEUED_CONVERSIONS, LARGE_INPUT_SIZE)
+
+def run_admitted(size, timings, function, *args):
+    """conversion_workers.run(function, *args) once the admission queue lets
+    through work on size characters of input.
+
+    Without workers, conversions run in the request threads, which the
+    server already bounds, so they are not queued.
+    """
+    if conversion_workers.disabled:
+        return conversion_workers.run(function, *args)
+    lane, timings['queue'] = admission.enter(size)
+    started = time.perf_counter()
+    try:
+        return conversion_workers.run(function, *args)
+    finally:
+        admission.leave(lane, time.perf_counter() - started)
+
+def convert_admitted(react_code, output_format='pretty', timings=None, options=None):
+    """Convert in an isolated worker once the admission queue lets it through"""
+    if timings is None:
+        timings = {}
+    converted_code, worker_timings = run_admitted(len(react_code), timings, convert_timed,
+                                                  react_code, output_format, options)
+    timings.update(worker_timings)
+    return converted_code
+
+# Bump whenever a change alters converter output, so cached results from
+# older versions are never served
+CONVERTER_VERSION = '11'
+
+# Conversion cache settings
+CONVERSION_CACHE_SIZE = int(os.environ.get('CONVERSION_CACHE_SIZE', 256))
+# Total and per-output bytes held in memory; larger outputs are not cached
+CONVERSION_CACHE_BYTES = int(os.environ.get('CONVERSION_CACHE_BYTES', 64 * 1024 * 1024))
+CONVERSION_CACHE_ENTRY_BYTES = int(os.environ.get('CONVERSION_CACHE_ENTRY_BYTES', 1024 * 1024))
+CONVERSION_CACHE_DB = os.environ.get('CONVERSION_CACHE_DB')
+CONVERSION_CACHE_DB_SIZE = int(os.environ.get('CONVERSION_CACHE_DB_SIZE', 10000))
+# Writes between trims of the SQLite tier back to its size
+CACHE_PRUNE_INTERVAL = 64
+
+# (revision, hash) of the templates and rule tables
+rules_fingerprint = (None, None)
+
+def conversion_rules_fingerprint():
+    """Hash of the component templates and rule tables conversions use"""
+    global rules_fingerprint
+    revision, fingerprint = rules_fingerprint
+    if revision != conversion_rules_revision:
+        revision = conversion_rules_revision
+        tables = [[(name, template['pattern'].pattern, sorted(template['variants'].items()))
+                   for name, template in component_templates.items()], EVENT_MAPPINGS]
+        for rules in (EXPRESSION_PLACEHOLDERS, TEMPLATE_PLACEHOLDERS,
+                      TEMPLATE_FIELD_PLACEHOLDERS, CONDITION_PLACEHOLDERS):
+            tables.append((rules.exact, rules.table[0]))
+        fingerprint = hashlib.sha256(repr(tables).encode()).hexdigest()
+        rules_fingerprint = (revision, fingerprint)
+    return fingerprint
+
+def conversion_key(react_code, output_format='pretty', options=None):
+    """Content hash identifying a conversion result"""
+    digest = hashlib.sha256(CONVERTER_VERSION.encode())
+    digest.update(b'\0')
+    digest.update(conversion_rules_fingerprint().encode())
+    digest.update(b'\0')
+    digest.update(output_format.encode())
+    for name, value in sorted((options or {}).items()):
+        digest.update(f'\0{name}={value}'.encode())
+    digest.update(b'\0')
+    digest.update(react_code.encode())
+    return digest.hexdigest()
+
+class ConversionCache:
+    """Conversion results keyed by content hash.
+
+    Results live in an in-memory LRU bounded by max_entries and max_bytes
+    and, when db_path is set, in a SQLite table shared by every worker
+    process and kept across restarts. Outputs over max_entry_bytes are
+    not cached at all.
+    The table is trimmed to its max_disk_entries most recently written
+    rows every CACHE_PRUNE_INTERVAL writes. Concurrent requests for the
+    same key wait on a single computation.
+    """
+
+    def __init__(self, max_entries=256, db_path=None, max_disk_entries=10000,
+                 max_bytes=64 * 1024 * 1024, max_entry_bytes=1024 * 1024):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.saves = 0
+        # key: (value, size in bytes)
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.counters = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'coalesced': 0,
+                         'evictions': 0, 'disk_evictions': 0, 'disk_errors': 0, 'oversized': 0}
+        self.db = None
+        self.db_lock = threading.Lock()
+        if db_path:
+            try:
+                self.db = sqlite3.connect(db_path, timeout=5, check_same_thread=False)
+                self.db.execute('PRAGMA journal_mode=WAL')
+                self.db.execute('CREATE TABLE IF NOT EXISTS conversions '
+                                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)')
+                self.db.execute('CREATE INDEX IF NOT EXISTS conversions_created ON conversions (created)')
+                self.db.commit()
+                self.prune()
+            except sqlite3.Error as e:
+                logger.error(f'Conversion cache database unavailable: {e}')
+                self.db = None
+
+    def count(self, counter):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def remember(self, key, value):
+        """Hold value in memory; False when it is over max_entry_bytes"""
+        size = len(value.encode())
+        if size > self.max_entry_bytes:
+            self.count('oversized')
+            return False
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.bytes += size
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                self.bytes -= self.entries.popitem(last=False)[1][1]
+                self.counters['evictions'] += 1
+        return True
+
+    def load(self, key):
+        if self.db is None:
+            return None
+        try:
+            with self.db_lock:
+                row = self.db.execute('SELECT value FROM conversions WHERE key = ?', (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f'Conversion cache read failed: {e}')
+            self.count('disk_errors')
+            return None
+        return row[0] if row else None
+
+    def save(self, key, value):
+        if self.db is None:
+            return
+        try:
+            with self.db_lock:
+                self.db.execute('INSERT OR REPLACE INTO conversions VALUES (?, ?, ?)',
+                                (key, value, time.time()))
+                self.db.commit()
+                self.saves += 1
+                prune = self.saves % CACHE_PRUNE_INTERVAL == 0
+        except sqlite3.Error as e:
+            logger.error(f'Conversion cache write failed: {e}')
+            self.count('disk_errors')
+            return
+        if prune:
+            self.prune()
+
+    def prune(self):
+        """Delete the oldest rows beyond max_disk_entries"""
+        try:
+            with self.db_lock:
+                evicted = self.db.execute('DELETE FROM conversions WHERE key IN (SELECT key FROM conversions '
+                                          'ORDER BY created DESC LIMIT -1 OFFSET ?)',
+                                          (self.max_disk_entries,)).rowcount
+                self.db.commit()
+        except sqlite3.Error as e:
+            logger.error(f'Conversion cache trim failed: {e}')
+            self.count('disk_errors')
+            return
+        if evicted:
+            with self.lock:
+                self.counters['disk_evictions'] += evicted
+
+    def get(self, key):
+        """Return (value, outcome) for a cached key; value is None on a miss"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.counters['hits'] += 1
+                return entry[0], 'hit'
+        value = self.load(key)
+        if value is not None:
+            self.remember(key, value)
+            self.count('disk_hits')
+            return value, 'disk_hit'
+        self.count('misses')
+        return None, 'miss'
+
+    def put(self, key, value):
+        if self.remember(key, value):
+            self.save(key, value)
+
+    def get_or_compute(self, key, compute):
+        """Return (value, outcome), running compute() once per key at a time"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.counters['hits'] += 1
+                return entry[0], 'hit'
+            flight = self.in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.in_flight[key] = {'done': threading.Event(), 'value': None, 'error': None}
+            else:
+                self.counters['coalesced'] += 1
+
+        if not leader:
+            flight['done'].wait()
+            if flight['error'] is not None:
+                raise flight['error']
+            return flight['value'], 'coalesced'
+
+        try:
+            value = self.load(key)
+            if value is not None:
+                self.remember(key, value)
+                self.count('disk_hits')
+                outcome = 'disk_hit'
+            else:
+                self.count('misses')
+                value = compute()
+                self.put(key, value)
+                outcome = 'miss'
+            flight['value'] = value
+            return value, outcome
+        except Exception as e:
+            flight['error'] = e
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            flight['done'].set()
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, entries=len(self.entries), max_entries=self.max_entries,
+                        bytes=self.bytes, max_bytes=self.max_bytes, max_entry_bytes=self.max_entry_bytes,
+                        disk=self.db is not None, max_disk_entries=self.max_disk_entries)
+
+conversion_cache = ConversionCache(CONVERSION_CACHE_SIZE, CONVERSION_CACHE_DB, CONVERSION_CACHE_DB_SIZE,
+                                   CONVERSION_CACHE_BYTES, CONVERSION_CACHE_ENTRY_BYTES)
+
+def convert_cached(react_code, output_format='pretty', key=None, timings=None, options=None):
+    """convert_admitted through the conversion cache; returns (code, outcome)"""
+    return conversion_cache.get_or_compute(key or conversion_key(react_code, output_format, options),
+                                           lambda: convert_admitted(react_code, output_format, timings, options))
+
+def unknown_format(output_format, formats=OUTPUT_FORMATS):
+    return jsonify({'error': f"Unknown format: {output_format}, expected one of {', '.join(formats)}"}), 400
+
+# Conversion options besides the format, with their accepted values,
+# default first. Only non-default values are passed on, so requests
+# spelling out a default share cache entries with those that omit it.
+CONVERSION_OPTIONS = {
+    # 'classes' hoists repeated inline styles into a stylesheet
+    'styles': ('inline', 'classes'),
+}
+
+# Whole-number conversion options, with their default and largest value
+NUMERIC_CONVERSION_OPTIONS = {
+    # Rows rendered for each .map() over an array that is not a literal
+    'repeat': (REPEAT_COUNT, MAX_REPEAT_COUNT),
+}
+
+def conversion_options(values):
+    """Non-default conversion options from a JSON object or query args.
+
+    Raises ValueError for an unknown or out of range value.
+    """
+    options = {}
+    for name, accepted in CONVERSION_OPTIONS.items():
+        value = values.get(name, accepted[0])
+        if value not in accepted:
+            raise ValueError(f"Unknown {name}: {value}, expected one of {', '.join(accepted)}")
+        if value != accepted[0]:
+            options[name] = value
+    for name, (default, highest) in NUMERIC_CONVERSION_OPTIONS.items():
+        value = values.get(name, default)
+        if isinstance(value, str) and value.isdigit():
+            value = int(value)
+        if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value <= highest:
+            raise ValueError(f'Invalid {name}: {value}, expected a whole number from 0 to {highest}')
+        if value != default:
+            options[name] = value
+    return options
+
+# Metrics, aggregated per process
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+class Histogram:
+    """Prometheus histogram, with a series per value of an optional label"""
+
+    def __init__(self, name, description, buckets, label=None):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self.label = label
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, label_value=None):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(label_value)
+            if series is None:
+                series = self.series[label_value] = {'counts': [0] * (len(self.buckets) + 1),
+                                                     'sum': 0.0, 'count': 0}
+            series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self, lines):
+        lines.append(f'# HELP {self.name} {self.description}')
+        lines.append(f'# TYPE {self.name} histogram')
+        with self.lock:
+            series = sorted((label_value or '', dict(values, counts=list(values['counts'])))
+                            for label_value, values in self.series.items())
+        for label_value, values in series:
+            labels = f'{self.label}="{label_value}",' if self.label else ''
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values['counts']):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels}le="{bound}"}} {cumulative}')
+            labels = f'{{{labels[:-1]}}}' if labels else ''
+            lines.append(f"{self.name}_sum{labels} {values['sum']}")
+            lines.append(f"{self.name}_count{labels} {values['count']}")
+
+class Counter:
+    """Prometheus counter with a series per label value"""
+
+    def __init__(self, name, description, label):
+        self.name = name
+        self.description = description
+        self.label = label
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, label_value, amount=1):
+        with self.lock:
+            self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def render(self, lines):
+        lines.append(f'# HELP {self.name} {self.description}')
+        lines.append(f'# TYPE {self.name} counter')
+        with self.lock:
+            values = sorted(self.values.items())
+        for label_value, value in values:
+            lines.append(f'{self.name}{{{self.label}="{label_value}"}} {value}')
+
+stage_seconds = Histogram('converter_stage_seconds', 'Time spent in each conversion stage',
+                          STAGE_BUCKETS, 'stage')
+conversion_seconds = Histogram('converter_conversion_seconds',
+                               'Time to answer a conversion, cache lookups included', STAGE_BUCKETS)
+input_bytes = Histogram('converter_input_bytes', 'Size of converted React sources', SIZE_BUCKETS)
+output_bytes = Histogram('converter_output_bytes', 'Size of converted HTML', SIZE_BUCKETS)
+conversions_total = Counter('converter_conversions_total', 'Conversions by cache outcome', 'cache')
+queue_wait_seconds = Histogram('converter_queue_wait_seconds', 'Time conversions waited for a worker',
+                               STAGE_BUCKETS, 'lane')
+admissions_total = Counter('converter_admissions_total', 'Conversions admitted and refused', 'outcome')
+worker_events = Counter('converter_worker_events_total',
+                        'Conversion workers started, and stopped by cause', 'event')
+
+def record_conversion(react_code, converted_code, cache_outcome, timings, seconds):
+    for stage, stage_time in timings.items():
+        stage_seconds.observe(stage_time, stage)
+    conversion_seconds.observe(seconds)
+    input_bytes.observe(len(react_code.encode()))
+    if converted_code is not None:
+        output_bytes.observe(len(converted_code.encode()))
+    conversions_total.inc(cache_outcome)
+
+def server_timing(timings, cache_outcome, seconds):
+    """Server-Timing header value for one conversion, durations in ms"""
+    entries = [f'{stage};dur={stage_time * 1000:.3f}' for stage, stage_time in timings.items()]
+    entries.append(f'cache;desc="{cache_outcome}"')
+    entries.append(f'total;dur={seconds * 1000:.3f}')
+    return ', '.join(entries)
+
+# Raw source bodies accepted by /convert, besides JSON
+RAW_SOURCE_MIMETYPES = frozenset({'text/jsx', 'text/tsx', 'text/plain', 'text/javascript',
+                                  'application/javascript'})
+
+def request_gzipped():
+    """Whether the request body is sent with Content-Encoding: gzip"""
+    encoding = request.headers.get('Content-Encoding', 'identity').strip().lower()
+    if encoding not in ('identity', 'gzip', 'x-gzip'):
+        raise UnsupportedMediaType(f'Unsupported Content-Encoding: {encoding}')
+    return encoding != 'identity'
+
+def request_body():
+    """The request body, inflated when sent with Content-Encoding: gzip.
+
+    The inflated body is held to MAX_CONTENT_LENGTH like a plain one.
+    """
+    data = request.get_data()
+    if not request_gzipped():
+        return data
+    limit = app.config['MAX_CONTENT_LENGTH']
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        data = decompressor.decompress(data, limit + 1)
+    except zlib.error as e:
+        raise BadRequest(f'Invalid gzip body: {e}')
+    if len(data) > limit:
+        raise RequestEntityTooLarge(f'Inflated request body exceeds the limit of {limit} bytes')
+    if not decompressor.eof:
+        raise BadRequest('Truncated gzip body')
+    return data
+
+def not_modified(key):
+    response = app.response_class(status=304)
+    response.set_etag(key)
+    return response
+
+@app.route('/convert', methods=['POST'])
+def convert():
+    logger.info('=== Received conversion request ===')
+    # Headers can carry credentials and cookies, keep them out of INFO logs
+    logger.debug(f'Request headers: {dict(request.headers)}')
+    logger.info(f'Request method: {request.method}')
+    try:
+        body = request_body()
+        if request.mimetype in RAW_SOURCE_MIMETYPES:
+            data = dict(request.args.items(), react_code=body.decode('utf-8', errors='replace'))
+        else:
+            data = json.loads(body) if body else None
+        if not data:
+            logger.error('No JSON data received')
+            return jsonify({'error': 'No data received'}), 400
+
+        react_code = data.get('react_code')
+        if not react_code:
+            logger.error('No code provided in request')
+            return jsonify({'error': 'No code provided'}), 400
+
+        output_format = data.get('format', 'pretty')
+        if output_format not in OUTPUT_FORMATS:
+            return unknown_format(output_format)
+        options = conversion_options(data)
+
+        logger.debug(f'Received code: {react_code}')
+        # The ETag is known from the input alone, so a matching
+        # If-None-Match skips the conversion entirely
+        key = conversion_key(react_code, output_format, options)
+        if request.if_none_match.contains_weak(key):
+            return not_modified(key)
+
+        timings = {}
+        started = time.perf_counter()
+        converted_code, cache_outcome = convert_cached(react_code, output_format, key, timings, options)
+        seconds = time.perf_counter() - started
+        record_conversion(react_code, converted_code, cache_outcome, timings, seconds)
+        logger.debug(f'Converted code: {converted_code}')
+
+        response = jsonify({'converted_code': converted_code, 'hash': key})
+        response.set_etag(key)
+        response.headers['X-Conversion-Cache'] = cache_outcome
+        response.headers['Server-Timing'] = server_timing(timings, cache_outcome, seconds)
+        return response
+    except HTTPException as e:
+        logger.error(f'Invalid conversion request: {e.description}')
+        return jsonify({'error': e.description}), e.code
+    except queue.Full as e:
+        logger.warning(f'Conversion refused: {str(e)}')
+        response = jsonify({'error': 'Too many conversions queued, retry later'})
+        response.headers['Retry-After'] = str(admission.retry_after())
+        return response, 429
+    except TimeoutError as e:
+        logger.error(f'Conversion timed out: {str(e)}')
+        return jsonify({'error': str(e)}), 408
+    except MemoryError as e:
+        logger.error(f'Conversion ran out of memory: {str(e)}')
+        return jsonify({'error': str(e)}), 422
+    except ChildProcessError as e:
+        logger.error(f'Conversion worker failed: {str(e)}')
+        return jsonify({'error': str(e)}), 500
+    except Exception as e:
         logger.error(f'Error during conversion: {str(e)}')
         return jsonify({'error': str(e)}), 400
 
+@app.route('/convert/<string(length=64):key>', methods=['GET'])
+def convert_by_hash(key):
+    """A conversion still held by this process's cache, by its hash.
+
+    Best effort: the result is only there while the conversion cache (or
+    its shared SQLite tier) keeps it, so clients must be ready to POST
+    the code to /convert again on a 404.
+    """
+    if request.if_none_match.contains_weak(key):
+        return not_modified(key)
+    converted_code, cache_outcome = conversion_cache.get(key)
+    if converted_code is None:
+        response = jsonify({'error': 'Unknown conversion, POST the code to /convert first'})
+        response.headers['Cache-Control'] = 'no-store'
+        return response, 404
+
+    response = jsonify({'converted_code': converted_code, 'hash': key})
+    response.set_etag(key)
+    # The content for a hash never changes, but whether this URL can serve
+    # it does, so caches revalidate against the ETag
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Conversion-Cache'] = cache_outcome
+    return response
+
+# Streaming conversion settings
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_STREAM_COMPONENT_SIZE = int(os.environ.get('MAX_STREAM_COMPONENT_SIZE', 1024 * 1024))
+
+COMPONENT_NAME_PATTERN = re.compile(
+    r'^\s*(?:export\s+(?:default\s+)?)?(?:async\s+)?(?:function\s*\*?|const|let|var|class)\s+([A-Za-z_$][\w$]*)',
+    re.MULTILINE)
+# What the splitter looks for next in each kind of span. Brackets only
+# count in code; strings, template literals, comments and JSX text are
+# skipped.
+SPLITTER_PATTERNS = {
+    'code': re.compile(r'[(){}\[\]\n\'"`<]|//|/\*'),
+    "'": re.compile(r"[\\'\n]"),
+    '"': re.compile(r'[\\"\n]'),
+    'template': re.compile(r'[\\`]|\$\{'),
+    'line': re.compile(r'\n'),
+    'block': re.compile(r'\*/'),
+    'tag': re.compile(r'[\'"{>]|/>'),
+    'children': re.compile(r'[{<]'),
+}
+SPLITTER_TAG_PATTERN = re.compile(r'/?([A-Za-z][\w.:-]*)?')
+
+class ComponentSplitter:
+    """Split streamed source text into its top-level declarations.
+
+    A declaration ends at the first newline where the bracket depth is
+    back to zero after having opened, or after a top-level line ending
+    in a semicolon. Brackets inside strings, template literals, comments
+    and JSX text are not counted, so `const s = "(";` or a paragraph
+    reading "( optional" cannot throw the depth off. Text is scanned a
+    line at a time, so no token is cut between two chunks.
+    Memory is bounded by max_size: a larger declaration is still
+    tracked, but its text is dropped and it is reported as oversized.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        # Spans the scan is inside, innermost last. Code spans are
+        # [kind, bracket depth]; the first is the top level, the others
+        # are ${...} and JSX {...} expressions.
+        self.spans = [['code', 0]]
+        self.pending = ''
+        self.last = ''
+        self.reset()
+
+    def reset(self):
+        self.parts = []
+        self.size = 0
+        self.opened = False
+        self.oversized = False
+
+    def keep(self, text):
+        self.size += len(text)
+        if self.size > self.max_size:
+            self.oversized = True
+            self.parts = []
+        elif not self.oversized:
+            self.parts.append(text)
+
+    def finish(self):
+        source = None if self.oversized else ''.join(self.parts)
+        size = self.size
+        self.reset()
+        return source, size
+
+    def previous(self, text, index, start=0):
+        """Last non-blank character of text[start:index], else of earlier text"""
+        index -= 1
+        while index >= start and text[index].isspace():
+            index -= 1
+        return text[index] if index >= start else self.last
+
+    def starts_jsx(self, text, index):
+        """Whether the '<' at text[index] opens a JSX element in code"""
+        following = text[index + 1:index + 2]
+        if not (following.isalpha() or following == '>'):
+            return False
+        before = self.previous(text, index)
+        if not before or before in JSX_EXPRESSION_PREFIX:
+            return True
+        end = index
+        while end and text[end - 1].isspace():
+            end -= 1
+        return text[max(0, end - 6):end] == 'return' and not text[end - 7:end - 6].isidentifier()
+
+    def feed(self, text):
+        """Yield (source, size) for each declaration completed by text"""
+        text = self.pending + text
+        cut = text.rfind('\n') + 1
+        if not cut and len(text) <= self.max_size:
+            self.pending = text
+            return
+        if cut:
+            text, self.pending = text[:cut], text[cut:]
+        else:
+            self.pending = ''
+        yield from self.scan(text)
+
+    def scan(self, text):
+        spans = self.spans
+        start = pos = 0
+        while True:
+            span = spans[-1]
+            kind = span[0]
+            match = SPLITTER_PATTERNS['code' if kind == 'expression' else kind].search(text, pos)
+            if not match:
+                break
+            token = match.group()
+            pos = match.end()
+            if kind in ('code', 'expression'):
+                if token == '\n':
+                    if len(spans) == 1 and not span[1] and \
+                            (self.opened or self.previous(text, match.start(), start) == ';'):
+                        self.keep(text[start:pos])
+                        start = pos
+                        self.last = ''
+                        yield self.finish()
+                elif token in '([{':
+                    span[1] += 1
+                    if len(spans) == 1:
+                        self.opened = True
+                elif token in ')]}':
+                    if not span[1] and kind == 'expression':
+                        spans.pop()
+                    else:
+                        span[1] = max(span[1] - 1, 0)
+                elif token == '`':
+                    spans.append(['template'])
+                elif token == '//':
+                    spans.append(['line'])
+                elif token == '/*':
+                    spans.append(['block'])
+                elif token == '<':
+                    if self.starts_jsx(text, match.start()):
+                        spans.append(['tag', SPLITTER_TAG_PATTERN.match(text, pos).group()])
+                else:
+                    spans.append([token])
+            elif kind in ('"', "'"):
+                if token == '\\':
+                    pos += 1
+                else:
+                    spans.pop()
+                    if token == '\n':
+                        # Unterminated string, the newline is code again
+                        pos = match.start()
+            elif kind == 'template':
+                if token == '\\':
+                    pos += 1
+                elif token == '`':
+                    spans.pop()
+                else:
+                    spans.append(['expression', 0])
+            elif kind == 'line':
+                spans.pop()
+                pos = match.start()
+            elif kind == 'block':
+                spans.pop()
+            elif kind == 'tag':
+                if token == '{':
+                    spans.append(['expression', 0])
+                elif token in '"\'':
+                    spans.append([token])
+                else:
+                    name = span[1]
+                    spans.pop()
+                    if name.startswith('/'):
+                        # Closing tag, which ends the children it was in
+                        if spans[-1][0] == 'children':
+                            spans.pop()
+                    elif token == '>' and name.lower() not in VOID_ELEMENTS:
+                        spans.append(['children'])
+            elif token == '{':
+                spans.append(['expression', 0])
+            elif text[pos:pos + 1] == '/' or text[pos:pos + 1].isalpha() or text[pos:pos + 1] == '>':
+                spans.append(['tag', SPLITTER_TAG_PATTERN.match(text, pos).group()])
+        self.last = text[start:].rstrip()[-1:] or self.last
+        self.keep(text[start:])
+
+    def close(self):
+        if self.pending:
+            yield from self.scan(self.pending)
+            self.pending = ''
+        if self.size:
+            yield self.finish()
+
+def read_request_text(stream, gzipped=False):
+    """Yield the request body as text, a chunk at a time.
+
+    A gzipped body is inflated a chunk at a time too, and held to
+    MAX_CONTENT_LENGTH like request_body() holds it.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+    limit = app.config['MAX_CONTENT_LENGTH']
+    inflated = 0
+    while True:
+        chunk = stream.read(STREAM_CHUNK_SIZE)
+        if not chunk:
+            break
+        if decompressor is None:
+            yield decoder.decode(chunk)
+            continue
+        while chunk:
+            try:
+                data = decompressor.decompress(chunk, STREAM_CHUNK_SIZE)
+            except zlib.error as e:
+                raise BadRequest(f'Invalid gzip body: {e}')
+            chunk = decompressor.unconsumed_tail
+            inflated += len(data)
+            if inflated > limit:
+                raise RequestEntityTooLarge(f'Inflated request body exceeds the limit of {limit} bytes')
+            yield decoder.decode(data)
+    if decompressor is not None and not decompressor.eof:
+        raise BadRequest('Truncated gzip body')
+    yield decoder.decode(b'', final=True)
+
+def split_components(text_chunks, max_size=MAX_STREAM_COMPONENT_SIZE):
+    """Yield (source, size) for each top-level declaration in a source stream"""
+    splitter = ComponentSplitter(max_size)
+    for text in text_chunks:
+        for source, size in splitter.feed(text):
+            yield source, size
+    yield from splitter.close()
+
+def convert_stream(text_chunks, output, output_format='pretty', options=None):
+    """Convert each component of a source stream as soon as it is complete"""
+    try:
+        yield from convert_stream_components(text_chunks, output, output_format, options)
+    except HTTPException as e:
+        # The body turned out unreadable after the response started
+        if output == 'html':
+            yield f'<!-- Error reading the request body: {e.description} -->\n'
+        else:
+            yield json.dumps({'error': e.description}) + '\n'
+
+def convert_stream_components(text_chunks, output, output_format, options):
+    """Yield the output line or chunk of each component"""
+    index = 0
+    for source, size in split_components(text_chunks):
+        if source is not None and '<' not in source:
+            # Imports, exports and helpers without markup
+            continue
+        name = COMPONENT_NAME_PATTERN.search(source) if source else None
+        result = {'index': index, 'name': name.group(1) if name else None}
+        index += 1
+        if source is None:
+            result['error'] = f'Component of {size} characters exceeds the limit of {MAX_STREAM_COMPONENT_SIZE}'
+        else:
+            timings = {}
+            started = time.perf_counter()
+            try:
+                result['converted_code'], result['cache'] = convert_cached(source, output_format,
+                                                                           timings=timings, options=options)
+            except Exception as e:
+                result['error'] = str(e)
+            record_conversion(source, result.get('converted_code'), result.get('cache', 'error'),
+                              timings, time.perf_counter() - started)
+
+        if output == 'html':
+            if 'error' in result:
+                yield f"<!-- Error converting component {result['index']}: {result['error']} -->\n"
+            else:
+                yield result['converted_code'] + '\n'
+        else:
+            yield json.dumps(result) + '\n'
+
+@app.route('/convert/stream', methods=['POST'])
+def convert_stream_route():
+    """Stream conversions of a multi-component source file.
+
+    The body is the raw source (or a JSON object with react_code). Each
+    top-level component is emitted as an NDJSON line, or as a chunk of
+    HTML with ?output=html, as soon as it has been converted.
+    """
+    logger.info('=== Received streaming conversion request ===')
+    output = request.args.get('output', 'ndjson')
+    if output not in ('ndjson', 'html'):
+        return jsonify({'error': f'Unknown output: {output}'}), 400
+    output_format = request.args.get('format', 'pretty')
+    # Clipboard JSON documents cannot be concatenated into one HTML stream
+    formats = HTML_FORMATS if output == 'html' else OUTPUT_FORMATS
+    if output_format not in formats:
+        return unknown_format(output_format, formats)
+    try:
+        options = conversion_options(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        gzipped = request_gzipped()
+        if request.is_json:
+            try:
+                data = json.loads(request_body())
+            except ValueError:
+                data = None
+            react_code = data.get('react_code') if isinstance(data, dict) else None
+            if not react_code or not isinstance(react_code, str):
+                return jsonify({'error': 'No code provided'}), 400
+            text_chunks = [react_code]
+        else:
+            text_chunks = read_request_text(request.stream, gzipped)
+            # A body that is not gzip at all is refused before the response starts
+            text_chunks = itertools.chain([next(text_chunks)], text_chunks)
+    except HTTPException as e:
+        return jsonify({'error': e.description}), e.code
+
+    mimetype = 'text/html' if output == 'html' else 'application/x-ndjson'
+    return app.response_class(stream_with_context(convert_stream(text_chunks, output, output_format, options)),
+                              mimetype=mimetype)
+
+# Live conversion settings
+LIVE_SESSION_TTL = int(os.environ.get('LIVE_SESSION_TTL', 600))
+MAX_LIVE_SESSIONS = int(os.environ.get('MAX_LIVE_SESSIONS', 100))
+LIVE_HEARTBEAT = 15
+
+# Elements with more source characters than this are split into their
+# children, so an edit reconverts only a small part
+LIVE_SEGMENT_SIZE = 1024
+LIVE_OFFSET_PATTERN = re.compile(r"'(?:start|end)': \d+(?:, )?")
+
+def live_runs(nodes):
+    """Group nodes into runs that convert independently: an element, or
+    the text, expressions and comments between two elements"""
+    runs = []
+    for node in nodes:
+        # Fragments are flattened into their neighbours, so they stay in a run
+        separate = node['type'] == 'element' and node['tag']
+        if separate or not runs or runs[-1][-1]['type'] == 'element' and runs[-1][-1]['tag']:
+            runs.append([node])
+        else:
+            runs[-1].append(node)
+    return runs
+
+def convert_live_segments(runs, output_format):
+    """(html, repeat rows) of each (run, indent) of a live session"""
+    output = []
+    for run, indent in runs:
+        nodes = transform_jsx(run)
+        rows = repeat_rows(nodes)
+        check_repeat_rows(rows)
+        output.append((format_html(nodes, output_format, indent), rows))
+    return output
+
+def element_edges(node, indent, output_format):
+    """Converted opening and closing tags of an element, without its children"""
+    node = {'type': 'element', 'tag': node['tag'], 'attrs': transform_attributes(node['attrs']),
+            'children': []}
+    tag = node['tag']
+    if output_format == 'none':
+        return f"<{tag}{''.join(render_attribute(name, value) for name, value in node['attrs'])}>", f'</{tag}>'
+    if output_format == 'minified':
+        return f'{start_tag(node, True)}>', f'</{tag.lower()}>'
+    return f'{indent}{start_tag(node, False)}>\n', f'{indent}</{tag.lower()}>\n'
+
+class LiveSession:
+    """Source text and converted output of one live editor.
+
+    The output is a list of converted segments: runs of top-level nodes,
+    with elements larger than LIVE_SEGMENT_SIZE split into their tags and
+    the segments of their children. Each update re-parses the source, but
+    only segments whose parsed content changed are converted again; the
+    rest are reused by content hash. A delta splicing the changed
+    segments into the output is queued for the event stream.
+    """
+
+    def __init__(self, output_format='pretty'):
+        self.output_format = output_format
+        self.text = ''
+        self.revision = 0
+        self.keys = []
+        self.segments = {}
+        self.rows = {}
+        self.events = queue.Queue()
+        self.lock = threading.Lock()
+        self.touched = time.monotonic()
+
+    def snapshot(self):
+        """Current output; deltas queued so far are already part of it and dropped"""
+        with self.lock:
+            while True:
+                try:
+                    event = self.events.get_nowait()
+                except queue.Empty:
+                    break
+                if event is None:
+                    self.close()
+                    break
+            return {'revision': self.revision, 'segments': [self.segments[key] for key in self.keys]}
+
+    def edit(self, revision, react_code=None, edit=None):
+        """Apply the full text or a {start, end, text} splice made against revision.
+
+        Returns the new revision, or None when revision is stale and the
+        full text has to be sent again.
+        """
+        with self.lock:
+            if react_code is None:
+                if revision != self.revision:
+                    return None
+                start, end = edit['start'], edit['end']
+                react_code = self.text[:start] + edit['text'] + self.text[end:]
+            previous = self.text
+            self.text = react_code
+            self.revision += 1
+            try:
+                delta = self.update()
+            except Exception:
+                self.text = previous
+                self.revision -= 1
+                raise
+            self.events.put(('delta', delta))
+            return self.revision
+
+    def update(self):
+        code = strip_component_wrapper(self.text)
+        parsed = parse_component(code)
+        keys, segments, rows = [], {}, {}
+        if uses_state(code):
+            # Patterns and states rework the whole markup, convert it in one piece
+            html, _ = convert_cached(self.text, self.output_format)
+            keys.append(hashlib.sha1(html.encode()).hexdigest())
+            segments[keys[0]] = html
+            converted = 1
+        else:
+            nodes = [{'type': 'comment', 'value': GENERATED_COMMENT}, {'type': 'text', 'value': '\n'}]
+            nodes.extend(parsed)
+            pending = {}
+            self.split(code, nodes, '', keys, segments, rows, pending)
+            # Segments another session already converted come from the cache
+            cache_keys = {key: conversion_key(source, self.output_format, {'live_indent': len(indent)})
+                          for key, (_, indent, source) in pending.items()}
+            for key, cache_key in cache_keys.items():
+                cached, _ = conversion_cache.get(cache_key)
+                if cached is not None:
+                    segments[key], rows[key] = json.loads(cached)
+                    del pending[key]
+            if pending:
+                # New segments convert in a worker, under its deadline and
+                # memory cap, once admitted
+                converted_segments = run_admitted(sum(len(source) for _, _, source in pending.values()), {},
+                                                  convert_live_segments,
+                                                  [(run, indent) for run, indent, _ in pending.values()],
+                                                  self.output_format)
+                for key, (html, segment_rows) in zip(pending, converted_segments):
+                    segments[key], rows[key] = html, segment_rows
+                    conversion_cache.put(cache_keys[key], json.dumps([html, segment_rows]))
+            converted = len(pending)
+            check_repeat_rows(sum(rows.get(key, 0) for key in keys))
+
+        # Segments unchanged at either end are kept, the middle is replaced
+        start = 0
+        limit = min(len(keys), len(self.keys))
+        while start < limit and keys[start] == self.keys[start]:
+            start += 1
+        end = 0
+        while end < limit - start and keys[-1 - end] == self.keys[-1 - end]:
+            end += 1
+        delta = {'revision': self.revision, 'start': start,
+                 'deleted': len(self.keys) - start - end,
+                 'inserted': [segments[key] for key in keys[start:len(keys) - end]],
+                 'converted': converted}
+        self.keys, self.segments, self.rows = keys, segments, rows
+        return delta
+
+    def split(self, code, nodes, indent, keys, segments, rows, pending):
+        """Add the segments of nodes at an indent and the rows their repeats
+        expand to; segments that need converting go in pending as
+        (run, indent, source) where source identifies the run's content"""
+        for run in live_runs(nodes):
+            node = run[0]
+            if len(run) == 1 and node['type'] == 'element' and 'end' in node:
+                # An element converts the same wherever its source text is
+                source = code[node['start']:node['end']]
+            else:
+                # Source offsets of nested elements shift with every edit above them
+                source = LIVE_OFFSET_PATTERN.sub('', repr(run))
+            if node['type'] == 'element' and node['tag'] and \
+                    node['tag'].lower() not in VOID_ELEMENTS and \
+                    node['tag'].lower() not in RAW_TEXT_ELEMENTS and len(source) > LIVE_SEGMENT_SIZE:
+                # Large elements are split into their tags and children
+                opening, closing = element_edges(node, indent, self.output_format)
+                keys.append(f'<{opening}')
+                segments[keys[-1]] = opening
+                self.split(code, node['children'], indent + ' ', keys, segments, rows, pending)
+                keys.append(f'>{closing}')
+                segments[keys[-1]] = closing
+                continue
+            key = hashlib.sha1(f'{indent}\0{source}'.encode()).hexdigest()
+            keys.append(key)
+            if key in segments or key in pending:
+                continue
+            if key in self.segments:
+                segments[key] = self.segments[key]
+                rows[key] = self.rows.get(key, 0)
+            else:
+                pending[key] = (run, indent, source)
+
+    def close(self):
+        self.events.put(None)
+
+live_sessions = OrderedDict()
+live_sessions_lock = threading.Lock()
+
+def get_live_session(session_id):
+    expire_live_sessions()
+    with live_sessions_lock:
+        session = live_sessions.get(session_id)
+        if session is not None:
+            session.touched = time.monotonic()
+            live_sessions.move_to_end(session_id)
+        return session
+
+def expire_live_sessions():
+    """Close idle sessions and the oldest ones beyond the limit"""
+    now = time.monotonic()
+    with live_sessions_lock:
+        while live_sessions:
+            session_id, session = next(iter(live_sessions.items()))
+            if len(live_sessions) < MAX_LIVE_SESSIONS and now - session.touched < LIVE_SESSION_TTL:
+                break
+            del live_sessions[session_id]
+            session.close()
+
+@app.route('/live', methods=['POST'])
+def live_start():
+    """Start a live conversion session"""
+    data = request.get_json(silent=True) or {}
+    output_format = data.get('format', 'pretty')
+    # Segments are spliced as text, which only works for HTML
+    if output_format not in HTML_FORMATS:
+        return unknown_format(output_format, HTML_FORMATS)
+    expire_live_sessions()
+    session_id = secrets.token_urlsafe(16)
+    with live_sessions_lock:
+        live_sessions[session_id] = LiveSession(output_format)
+    logger.info(f'Started live session {session_id}')
+    return jsonify({'session': session_id,
+                    'events': url_for('live_events', session_id=session_id)}), 201
+
+@app.route('/live/<session_id>', methods=['POST'])
+def live_edit(session_id):
+    """Apply an edit; the resulting delta is sent on the event stream"""
+    session = get_live_session(session_id)
+    if session is None:
+        return jsonify({'error': 'Unknown live session'}), 404
+    data = request.get_json(silent=True) or {}
+    react_code = data.get('react_code')
+    edit = data.get('edit')
+    if react_code is not None and not isinstance(react_code, str):
+        return jsonify({'error': 'react_code must be a string'}), 400
+    if react_code is None and not (isinstance(edit, dict) and isinstance(edit.get('text'), str)
+                                   and isinstance(edit.get('start'), int)
+                                   and isinstance(edit.get('end'), int)):
+        return jsonify({'error': 'Send react_code or an edit with start, end and text'}), 400
+    try:
+        revision = session.edit(data.get('revision'), react_code, edit)
+    except queue.Full as e:
+        logger.warning(f'Live conversion refused: {str(e)}')
+        response = jsonify({'error': 'Too many conversions queued, retry later'})
+        response.headers['Retry-After'] = str(admission.retry_after())
+        return response, 429
+    except Exception as e:
+        logger.error(f'Error during live conversion: {str(e)}')
+        session.events.put(('conversion-error', {'error': str(e)}))
+        status = 408 if isinstance(e, TimeoutError) else 422 if isinstance(e, MemoryError) \
+            else 500 if isinstance(e, ChildProcessError) else 400
+        return jsonify({'error': str(e)}), status
+    if revision is None:
+        return jsonify({'error': 'Stale revision, send the full react_code',
+                        'revision': session.revision}), 409
+    return jsonify({'revision': revision}), 202
+
+@app.route('/live/<session_id>', methods=['DELETE'])
+def live_stop(session_id):
+    with live_sessions_lock:
+        session = live_sessions.pop(session_id, None)
+    if session is None:
+        return jsonify({'error': 'Unknown live session'}), 404
+    session.close()
+    return '', 204
+
+@app.route('/live/<session_id>/events')
+def live_events(session_id):
+    """Server-sent events: a snapshot, then a delta per edit"""
+    session = get_live_session(session_id)
+    if session is None:
+        return jsonify({'error': 'Unknown live session'}), 404
+
+    def events():
+        yield f'retry: 3000\nevent: snapshot\ndata: {json.dumps(session.snapshot())}\n\n'
+        while True:
+            try:
+                event = session.events.get(timeout=LIVE_HEARTBEAT)
+            except queue.Empty:
+                # Open streams expire idle sessions, this one included
+                expire_live_sessions()
+                yield ': keepalive\n\n'
+                continue
+            if event is None:
+                return
+            name, data = event
+            yield f'event: {name}\ndata: {json.dumps(data)}\n\n'
+
+    response = app.response_class(events(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# Batch conversion settings
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 100))
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', os.cpu_count() or 1))
+
+# Batch and project conversions share these workers. Each job is held to
+# the conversion deadline and memory cap on its own, so a job that
+# overruns or crashes only loses its own worker.
+batch_workers = ConversionWorkers(BATCH_WORKERS, CONVERT_TIMEOUT, CONVERT_MEMORY_LIMIT)
+
+def pool_error(e):
+    """Error message of a conversion that raised e in a pool worker"""
+    if isinstance(e, MemoryError):
+        return f'Conversion exceeded its memory limit of {CONVERT_MEMORY_LIMIT // (1024 * 1024)} MB'
+    # Some exceptions, such as a cancelled future's, carry no message
+    return str(e) or f'Conversion failed with {type(e).__name__}'
+
+def convert_batch_item(name, react_code, output_format='pretty', options=None):
+    """Convert one batch component; runs in a pool worker"""
+    started = time.perf_counter()
+    result = {'name': name, 'timings': {}}
+    try:
+        result['converted_code'] = convert_react_to_webflow(react_code, output_format, result['timings'],
+                                                            options=options)
+    except Exception as e:
+        result['error'] = pool_error(e)
+    result['duration_ms'] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+def run_in_pool(convert, jobs, results):
+    """Store convert(*args) in results[index] for each (index, args) job.
+
+    Jobs run in parallel in batch_workers, one thread per job in flight.
+    A job that misses the deadline, runs out of memory or kills its
+    worker gets an error result; the other jobs, of this request or of
+    concurrent ones, are not affected. Without usable worker processes
+    (e.g. a sandboxed serverless runtime) jobs are converted in this
+    process instead.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def run(job):
+        index, args = job
+        try:
+            results[index] = batch_workers.run(convert, *args)
+        except Exception as e:
+            results[index] = {'error': pool_error(e)}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(BATCH_WORKERS, len(jobs)))) as threads:
+        list(threads.map(run, jobs))
+
+@app.route('/convert/batch', methods=['POST'])
+def convert_batch():
+    logger.info('=== Received batch conversion request ===')
+    started = time.perf_counter()
+    try:
+        data = request.get_json()
+        components = data.get('components') if isinstance(data, dict) else None
+        if not isinstance(components, list) or not components:
+            logger.error('No components provided in batch request')
+            return jsonify({'error': 'No components provided'}), 400
+        if len(components) > MAX_BATCH_SIZE:
+            logger.error(f'Batch of {len(components)} exceeds limit of {MAX_BATCH_SIZE}')
+            return jsonify({'error': f'Batch size exceeds maximum of {MAX_BATCH_SIZE} components'}), 413
+        output_format = data.get('format', 'pretty')
+        if output_format not in OUTPUT_FORMATS:
+            return unknown_format(output_format)
+        options = conversion_options(data)
+
+        # Invalid items get their error inline, the rest are fanned out
+        results = [None] * len(components)
+        jobs = []
+        for index, component in enumerate(components):
+            if not isinstance(component, dict):
+                results[index] = {'name': None, 'error': 'Component must be an object'}
+                continue
+            name = component.get('name', str(index))
+            react_code = component.get('react_code')
+            if not react_code or not isinstance(react_code, str):
+                results[index] = {'name': name, 'error': 'No code provided'}
+                continue
+            cached, outcome = conversion_cache.get(conversion_key(react_code, output_format, options))
+            if cached is not None:
+                results[index] = {'name': name, 'converted_code': cached, 'cache': outcome,
+                                  'duration_ms': 0.0}
+                record_conversion(react_code, cached, outcome, {}, 0.0)
+                continue
+            jobs.append((index, name, react_code))
+
+        run_in_pool(convert_batch_item, [(index, (name, react_code, output_format, options))
+                                         for index, name, react_code in jobs], results)
+
+        for index, name, react_code in jobs:
+            result = results[index]
+            result.setdefault('name', name)
+            result['cache'] = 'miss' if 'converted_code' in result else 'error'
+            record_conversion(react_code, result.get('converted_code'), result['cache'],
+                              result.pop('timings', {}), result.get('duration_ms', 0.0) / 1000)
+            if 'converted_code' in result:
+                conversion_cache.put(conversion_key(react_code, output_format, options), result['converted_code'])
+
+        failed = sum(1 for result in results if 'error' in result)
+        logger.info(f'Batch of {len(results)} converted, {failed} failed')
+        return jsonify({
+            'results': results,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 3)
+        })
+    except Exception as e:
+        logger.error(f'Error during batch conversion: {str(e)}')
+        return jsonify({'error': str(e)}), 400
+
+# Project conversion settings
+MAX_PROJECT_FILES = int(os.environ.get('MAX_PROJECT_FILES', 500))
+MAX_PROJECT_SIZE = int(os.environ.get('MAX_PROJECT_SIZE', 10 * 1024 * 1024))
+PROJECT_EXTENSIONS = ('.jsx', '.tsx', '.js')
+PROJECT_SKIPPED_DIRS = frozenset({'node_modules', '__MACOSX', 'build', 'dist'})
+PROJECT_CHILD_MODES = ('inline', 'reference')
+
+LOCAL_IMPORT_PATTERN = re.compile(
+    r'^\s*import\s+(?:([A-Za-z_$][\w$]*)\s*,?\s*)?(?:\{([^}]*)\})?\s*from\s+[\'"](\.\.?(?:/[^\'"]*)?)[\'"]',
+    re.MULTILINE)
+DEFAULT_EXPORT_PATTERN = re.compile(
+    r'^\s*export\s+default\s+(?:(?:async\s+)?function\s*\*?\s*|class\s+)?([A-Za-z_$][\w$]*)', re.MULTILINE)
+COMPONENT_TAG_PATTERN = re.compile(r'<([A-Z][\w$]*)')
+
+def is_project_file(path):
+    """Whether a project path is a component source to convert"""
+    parts = path.split('/')
+    return (path.endswith(PROJECT_EXTENSIONS) and '..' not in parts and not path.startswith('/')
+            and not any(part.startswith('.') or part in PROJECT_SKIPPED_DIRS for part in parts))
+
+def read_project_zip(data):
+    """The component sources of a zip archive, by path"""
+    import zipfile
+    import zlib
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile:
+        raise ValueError('Project is not a valid zip archive')
+    with archive:
+        entries = [info for info in archive.infolist()
+                   if not info.is_dir() and is_project_file(posixpath.normpath(info.filename))]
+        # Check the declared sizes before inflating anything
+        check_project_size(len(entries), sum(info.file_size for info in entries))
+        try:
+            return {posixpath.normpath(info.filename): archive.read(info).decode('utf-8', errors='replace')
+                    for info in entries}
+        except (zipfile.BadZipFile, zlib.error, EOFError) as e:
+            raise ValueError(f'Project zip archive is corrupt: {e}')
+        except (NotImplementedError, RuntimeError) as e:
+            # Unsupported compression methods and encrypted members
+            raise ValueError(f'Project zip archive cannot be read: {e}')
+
+def read_project_uploads(uploads):
+    """The component sources of uploaded files named by their relative paths"""
+    files = {}
+    for upload in uploads:
+        path = posixpath.normpath((upload.filename or '').replace('\\', '/'))
+        if is_project_file(path):
+            files[path] = upload.read().decode('utf-8', errors='replace')
+    check_project_size(len(files), sum(len(source) for source in files.values()))
+    return files
+
+def check_project_size(count, size):
+    if count > MAX_PROJECT_FILES:
+        raise RequestEntityTooLarge(f'Project has {count} files, over the limit of {MAX_PROJECT_FILES}')
+    if size > MAX_PROJECT_SIZE:
+        raise RequestEntityTooLarge(f'Project has {size} bytes of source, over the limit of {MAX_PROJECT_SIZE}')
+
+def resolve_import(path, specifier, files):
+    """The project file a relative import in path refers to, if any"""
+    base = posixpath.normpath(posixpath.join(posixpath.dirname(path), specifier))
+    candidates = [base]
+    candidates.extend(base + extension for extension in PROJECT_EXTENSIONS)
+    candidates.extend(f'{base}/index{extension}' for extension in PROJECT_EXTENSIONS)
+    return next((candidate for candidate in candidates if candidate in files), None)
+
+def read_project_module(path, source):
+    """The components a file declares, its default export and its local imports.
+
+    Components are the top-level declarations containing markup, split
+    the same way as streamed sources. Imports are (local name, imported
+    name or 'default', specifier) for relative specifiers only.
+    """
+    declared = OrderedDict()
+    for code, size in split_components([source]):
+        if code is None or '<' not in code:
+            continue
+        name = COMPONENT_NAME_PATTERN.search(code)
+        declared[name.group(1) if name else posixpath.splitext(posixpath.basename(path))[0]] = code
+    default = DEFAULT_EXPORT_PATTERN.search(source)
+    default = default.group(1) if default and default.group(1) in declared else next(iter(declared), None)
+    imports = []
+    for match in LOCAL_IMPORT_PATTERN.finditer(source):
+        default_name, named, specifier = match.groups()
+        if default_name:
+            imports.append((default_name, 'default', specifier))
+        for binding in (named or '').split(','):
+            names = binding.split(' as ')
+            if names[0].strip():
+                imports.append((names[-1].strip(), names[0].strip(), specifier))
+    return declared, default, imports
+
+def project_graph(files):
+    """The components of a project and the child components each renders.
+
+    Components are keyed by (path, name). The children of a component map
+    the tags it renders to the components they are bound to, by a
+    relative import or a declaration in the same file.
+    """
+    modules = {path: read_project_module(path, source) for path, source in files.items()}
+    components = {}
+    children = {}
+    for path, (declared, default, imports) in modules.items():
+        bindings = {name: (path, name) for name in declared}
+        for local, imported, specifier in imports:
+            target = resolve_import(path, specifier, files)
+            if target is None:
+                continue
+            target_declared, target_default, _ = modules[target]
+            name = target_default if imported == 'default' else imported
+            if name in target_declared:
+                bindings[local] = (target, name)
+        for name, code in declared.items():
+            key = (path, name)
+            components[key] = code
+            children[key] = {tag: bindings[tag] for tag in COMPONENT_TAG_PATTERN.findall(code)
+                             if tag in bindings and bindings[tag] != key}
+    return components, children
+
+def dependency_levels(children):
+    """Group components into levels that only render components of earlier levels.
+
+    Components in an import cycle, or rendering one, cannot be ordered
+    and are returned separately.
+    """
+    remaining = {key: set(rendered.values()) for key, rendered in children.items()}
+    levels = []
+    while remaining:
+        level = sorted(key for key, rendered in remaining.items() if not rendered)
+        if not level:
+            break
+        levels.append(level)
+        for key in level:
+            del remaining[key]
+        for rendered in remaining.values():
+            rendered.difference_update(level)
+    return levels, sorted(remaining)
+
+def component_id(key):
+    return '#'.join(key)
+
+def convert_project_component(name, react_code, output_format, components, options=None):
+    """Convert one project component; runs in a pool worker.
+
+    Also returns its markup without the generated comment, for parents
+    to inline.
+    """
+    started = time.perf_counter()
+    result = {'name': name, 'timings': {}}
+    try:
+        nodes = convert_react_to_nodes(react_code, result['timings'], components)
+        mark = time.perf_counter()
+        formatted = apply_conversion_options(nodes, output_format, options)
+        result['converted_code'] = format_html(formatted, output_format).strip()
+        lap(result['timings'], 'format', mark)
+        if nodes[:1] == [{'type': 'comment', 'value': GENERATED_COMMENT}]:
+            nodes = nodes[2:]
+        result['markup'] = render_html(nodes).strip()
+    except Exception as e:
+        result['error'] = f'Failed to convert React code: {pool_error(e)}'
+    result['duration_ms'] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+def convert_project(files, output_format='pretty', child_mode='inline', options=None):
+    """Convert every component of a project once, children before parents.
+
+    Each level of the dependency graph is converted in parallel. Child
+    components are inlined into their parents, or with child_mode
+    'reference' replaced by an empty div whose data-component attribute
+    names them. Children that failed or are part of an import cycle are
+    always referenced.
+    """
+    components, children = project_graph(files)
+    levels, cyclic = dependency_levels(children)
+    if cyclic:
+        logger.warning(f'Import cycle between {len(cyclic)} components')
+        levels.append(cyclic)
+
+    markup = {}
+    results = []
+    for depth, level in enumerate(levels):
+        level_results = [None] * len(level)
+        jobs = []
+        for index, key in enumerate(level):
+            inlined = {}
+            for tag, child in children[key].items():
+                if child_mode == 'inline' and child in markup:
+                    inlined[tag] = markup[child]
+                else:
+                    inlined[tag] = f"<div{render_attribute('data-component', component_id(child))}></div>"
+            jobs.append((index, (key[1], components[key], output_format, inlined, options)))
+        run_in_pool(convert_project_component, jobs, level_results)
+
+        for key, result in zip(level, level_results):
+            if 'markup' in result:
+                markup[key] = result.pop('markup')
+            result.update(id=component_id(key), path=key[0], name=key[1], level=depth,
+                          children=sorted(component_id(child) for child in set(children[key].values())))
+            if key in cyclic:
+                result['cycle'] = True
+            result['cache'] = 'miss' if 'converted_code' in result else 'error'
+            record_conversion(components[key], result.get('converted_code'), result['cache'],
+                              result.pop('timings', {}), result.get('duration_ms', 0.0) / 1000)
+            results.append(result)
+    return results, len(levels)
+
+@app.route('/convert/project', methods=['POST'])
+def convert_project_route():
+    """Convert a whole project.
+
+    The body is a zip archive (raw, or as a single uploaded file), or a
+    multipart upload of the project's files named by their relative
+    paths, such as a browser directory upload.
+    """
+    logger.info('=== Received project conversion request ===')
+    started = time.perf_counter()
+    output_format = request.args.get('format', 'pretty')
+    if output_format not in OUTPUT_FORMATS:
+        return unknown_format(output_format)
+    child_mode = request.args.get('children', 'inline')
+    if child_mode not in PROJECT_CHILD_MODES:
+        return jsonify({'error': f'Unknown children mode: {child_mode}'}), 400
+    try:
+        options = conversion_options(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        uploads = request.files.getlist('project') or list(request.files.values())
+        if len(uploads) == 1 and (uploads[0].filename or '').endswith('.zip'):
+            files = read_project_zip(uploads[0].read())
+        elif uploads:
+            files = read_project_uploads(uploads)
+        else:
+            files = read_project_zip(request.get_data())
+    except RequestEntityTooLarge as e:
+        logger.error(e.description)
+        return jsonify({'error': e.description}), 413
+    except ValueError as e:
+        logger.error(f'Invalid project: {e}')
+        return jsonify({'error': str(e)}), 400
+    if not files:
+        return jsonify({'error': 'No component files in project'}), 400
+
+    results, levels = convert_project(files, output_format, child_mode, options)
+    failed = sum(1 for result in results if 'error' in result)
+    logger.info(f'Project of {len(files)} files converted: {len(results)} components '
+                f'in {levels} levels, {failed} failed')
+    return jsonify({
+        'components': results,
+        'levels': levels,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 3)
+    })
+
+@app.route('/cache/stats')
+def cache_stats():
+    return jsonify(conversion_cache.stats())
+
+@app.route('/metrics')
+def metrics():
+    """Conversion metrics in the Prometheus text format"""
+    lines = []
+    for metric in (stage_seconds, conversion_seconds, input_bytes, output_bytes, conversions_total,
+                   queue_wait_seconds, admissions_total, worker_events):
+        metric.render(lines)
+    stats = conversion_cache.stats()
+    cache_events = Counter('converter_cache_events_total', 'Conversion cache events', 'event')
+    for event in conversion_cache.counters:
+        cache_events.inc(event, stats[event])
+    cache_events.render(lines)
+    lines.append('# HELP converter_cache_entries Conversions held in memory')
+    lines.append('# TYPE converter_cache_entries gauge')
+    lines.append(f"converter_cache_entries {stats['entries']}")
+    lines.append('# HELP converter_cache_bytes Bytes of conversions held in memory')
+    lines.append('# TYPE converter_cache_bytes gauge')
+    lines.append(f"converter_cache_bytes {stats['bytes']}")
+    lines.append('# HELP converter_queue_depth Conversions waiting for a worker')
+    lines.append('# TYPE converter_queue_depth gauge')
+    for lane, depth in admission.depths().items():
+        lines.append(f'converter_queue_depth{{lane="{lane}"}} {depth}')
+    lines.append('')
+    return app.response_class('\n'.join(lines), mimetype='text/plain; version=0.0.4')
+
+# Warmup
+#
+# Cold starts pay for lazily filled caches (style properties, placeholder
+# classification, parsed fragments) on their first request. warmup()
+# fills them at import instead. That only pays off where instances are
+# initialized ahead of traffic: an import on the request path, as on a
+# serverless cold start, spends more on warmup than the first request
+# saves. WARMUP=1 enables it.
+WARMUP = os.environ.get('WARMUP') == '1'
+WARMUP_COMPONENTS = (
+    '''function Filters() {
+  return (
+    <div className="filters" style={{padding: 16, marginTop: 8, transitionDuration: 200}}>
+      <h2>{`${filteredResults.length} results`}</h2>
+      {[5,4,3,2,1].map(stars => (
+        <button key={stars} onClick={() => setRating(stars)}>{stars}</button>
+      ))}
+      {selectedCategory ? <span className="tag">{selectedCategory}</span> : null}
+      {isOpen && <p style={{opacity: 0.5}}>{user.name}</p>}
+      <img src={product.image} alt="" />
+    </div>
+  );
+}''',
+    '''function Modal() {
+  const [open, setOpen] = useState(false);
+  return (
+    <div className="modal"><button onClick={() => setOpen(true)}>Open</button></div>
+  );
+}''',
+)
+
+def warmup():
+    """Run sample conversions through every stage to fill lazy caches"""
+    started = time.perf_counter()
+    for react_code in WARMUP_COMPONENTS:
+        for output_format in OUTPUT_FORMATS:
+            convert_react_to_webflow(react_code, output_format, options={'styles': 'classes'})
+    for expr in ('user.name', 'product.price', 'item.createdAt'):
+        generate_placeholder_content(expr)
+    logger.info(f'Warmed up in {(time.perf_counter() - started) * 1000:.1f} ms')
+
+if WARMUP:
+    warmup()
+
+# Bulk conversion command
+CLI_MANIFEST = 'conversion-manifest.json'
+
+def convert_source_file(source, output_format='pretty', options=None):
+    """Convert each component of a source file; runs in a pool worker.
+
+    Returns the converted HTML, the number of components and the errors.
+    """
+    parts = []
+    errors = []
+    count = 0
+    for code, size in split_components([source]):
+        if code is not None and '<' not in code:
+            continue
+        count += 1
+        try:
+            if code is None:
+                raise ValueError(f'Component of {size} characters exceeds the limit of {MAX_STREAM_COMPONENT_SIZE}')
+            parts.append(convert_react_to_webflow(code, output_format, options=options) + '\n')
+        except Exception as e:
+            errors.append(str(e))
+            parts.append(f'<!-- Error converting component {count - 1}: {e} -->\n')
+    return ''.join(parts), count, errors
+
+def quiet_logging():
+    # Every conversion logs a few lines at INFO, the default level, and its
+    # input and output at DEBUG; far too much for a bulk run
+    logging.getLogger().setLevel(logging.WARNING)
+
+def source_tree(root):
+    """Relative paths of the component sources under root"""
+    for directory, dirs, names in os.walk(root):
+        dirs[:] = sorted(name for name in dirs if not name.startswith('.') and name not in PROJECT_SKIPPED_DIRS)
+        for name in sorted(names):
+            path = os.path.relpath(os.path.join(directory, name), root).replace(os.sep, '/')
+            if is_project_file(path):
+                yield path
+
+def write_file(path, text):
+    """Replace a file in one step, so an interrupted run leaves no partial output"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as output_file:
+        output_file.write(text)
+    os.replace(temporary, path)
+
+@app.cli.command('convert')
+@click.argument('source', type=click.Path(exists=True, file_okay=False))
+@click.argument('output', type=click.Path(file_okay=False))
+@click.option('--format', 'output_format', type=click.Choice(HTML_FORMATS), default='pretty',
+              help='HTML formatting of the output files.')
+@click.option('--styles', type=click.Choice(CONVERSION_OPTIONS['styles']), default='inline',
+              help='Keep styles inline, or hoist repeated ones into classes.')
+@click.option('--repeat', type=click.IntRange(0, MAX_REPEAT_COUNT), default=REPEAT_COUNT, show_default=True,
+              help='Rows to render for each .map() over an array that is not a literal.')
+@click.option('--workers', type=int, default=BATCH_WORKERS, show_default=True,
+              help='Worker processes to convert with.')
+@click.option('--force', is_flag=True, help='Reconvert files that are unchanged since the last run.')
+def convert_command(source, output, output_format, styles, repeat, workers, force):
+    """Convert every component under SOURCE into a mirrored tree in OUTPUT.
+
+    Each .jsx, .tsx or .js file with markup becomes an .html file at the
+    same relative path; sources that differ only in extension, such as
+    Button.jsx and Button.tsx, keep it (Button.jsx.html). A manifest in OUTPUT records a hash of every converted file, and
+    files whose source, format and converter version are unchanged since
+    the last run are skipped. Exits with status 1 when a file fails.
+    """
+    quiet_logging()
+    started = time.perf_counter()
+    options = conversion_options({'styles': styles, 'repeat': repeat})
+    manifest_path = os.path.join(output, CLI_MANIFEST)
+    previous = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path) as manifest_file:
+            previous = json.load(manifest_file).get('files', {})
+
+    paths = list(source_tree(source))
+    stems = {}
+    for path in paths:
+        stem = posixpath.splitext(path)[0]
+        stems[stem] = stems.get(stem, 0) + 1
+    entries = {}
+    jobs = []
+    skipped = 0
+    for path in paths:
+        with open(os.path.join(source, path), encoding='utf-8', errors='replace') as source_file:
+            code = source_file.read()
+        stem = posixpath.splitext(path)[0]
+        entry = {'key': conversion_key(code, output_format, options),
+                 'output': (path if stems[stem] > 1 else stem) + '.html'}
+        last = previous.get(path)
+        if (last and last['key'] == entry['key'] and not last.get('errors')
+                and (last['output'] is None or (last['output'] == entry['output']
+                                                and os.path.exists(os.path.join(output, last['output']))))):
+            entries[path] = last
+            skipped += 1
+            continue
+        entries[path] = entry
+        jobs.append((path, code))
+
+    converted_bytes = 0
+    components = 0
+    failed = []
+    if jobs:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=max(workers, 1), initializer=quiet_logging) as pool:
+            chunksize = max(1, len(jobs) // (max(workers, 1) * 4))
+            outputs = pool.map(convert_source_file, [code for path, code in jobs],
+                               [output_format] * len(jobs), [options] * len(jobs), chunksize=chunksize)
+            for (path, code), (html, count, errors) in zip(jobs, outputs):
+                entry = entries[path]
+                entry['components'] = count
+                if errors:
+                    entry['errors'] = errors
+                    failed.append(path)
+                    for error in errors:
+                        click.echo(f'{path}: {error}', err=True)
+                if count:
+                    write_file(os.path.join(output, entry['output']), html)
+                else:
+                    # Helpers and other modules without markup
+                    entry['output'] = None
+                converted_bytes += len(code.encode('utf-8'))
+                components += count
+
+    # Outputs of sources that no longer exist, or were renamed by a collision
+    outputs = {entry['output'] for entry in entries.values()}
+    for path, last in previous.items():
+        if last['output'] and last['output'] not in outputs:
+            stale = os.path.join(output, last['output'])
+            if os.path.exists(stale):
+                os.remove(stale)
+
+    write_file(manifest_path, json.dumps({'converter_version': CONVERTER_VERSION, 'format': output_format,
+                                          'files': entries}, indent=2, sort_keys=True) + '\n')
+
+    seconds = time.perf_counter() - started
+    click.echo(f'{len(jobs)} files converted ({components} components, {len(failed)} failed), '
+               f'{skipped} unchanged, in {seconds:.2f}s')
+    if jobs:
+        click.echo(f'{len(jobs) / seconds:.1f} files/s, {components / seconds:.1f} components/s, '
+                   f'{converted_bytes / seconds / 1e6:.2f} MB/s of source')
+    if failed:
+        sys.exit(1)
+
 if __name__ == '__main__':
     # Use environment variable for port with a fallback to 8081
     port = int(os.environ.get('PORT', 8081))
@@ -0,0 +1,251 @@
+"""Converter benchmarks.
+
+Times convert_react_to_webflow on the components in corpus/, then times
+the converter (on many elements, deep nesting, operator-dense expressions
+and a long dashboard), parse_style_object, generate_placeholder_content and
+state_variation_nodes on synthetic inputs of growing size. Fails when
+time grows faster than near-linearly with input size, or when a
+benchmark is slower than its entry in baseline.json.
+
+    python benchmarks/bench.py                    # run and check
+    python benchmarks/bench.py --quick            # sizes up to 8x the smallest, for CI
+    python benchmarks/bench.py --update-baseline  # record this machine's timings
+    python benchmarks/bench.py --plot curves.png  # also plot (needs matplotlib)
+"""
+import argparse
+import glob
+import json
+import logging
+import math
+import os
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(BENCHMARK_DIR, 'corpus')
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+import app  # noqa: E402
+
+# Every conversion logs a few lines at INFO, the default level, and its input
+# and output at DEBUG, which would dominate the timings
+logging.disable(logging.CRITICAL)
+
+# Synthetic inputs
+
+STYLE_PROPERTIES = ('marginTop', 'padding', 'fontSize', 'lineHeight', 'opacity', 'zIndex',
+                    'backgroundColor', 'transitionDuration', 'userSelect', 'borderRadius')
+PLACEHOLDER_FIELDS = ('user.name', 'item.price', 'post.title', 'order.status', 'product.rating',
+                      'profile.email', 'event.createdAt', 'task.priority', 'article.category')
+
+def generate_elements(count):
+    """A component rendering count sibling elements"""
+    items = '\n'.join(
+        f'      <div className="item item-{i}" onClick={{select}} style={{{{padding: {i % 16}, opacity: 0.9}}}}>\n'
+        f'        <span className="label">{{item.label}}</span> {{isActive ? <b>Active</b> : "Idle"}}\n'
+        f'      </div>'
+        for i in range(count))
+    return f'function List() {{\n  return (\n    <div className="list">\n{items}\n    </div>\n  );\n}}\n'
+
+def generate_nesting(depth):
+    """A component nesting depth elements inside each other"""
+    opening = ''.join(f'<div className="level-{i}">' for i in range(depth))
+    closing = '</div>' * depth
+    return f'function Nested() {{\n  return (\n    {opening}<p>Deep</p>{closing}\n  );\n}}\n'
+
+def generate_operators(count):
+    """A component with an expression of count operators and no whitespace"""
+    operators = ('==', '/', '<', '?.', '&', '|', '+', '!=')
+    expression = ''.join(f'a{i % 10}{operators[i % len(operators)]}' for i in range(count))
+    return f'function Operators() {{\n  return <p title={{{expression}b}}>{{{expression}b}}</p>;\n}}\n'
+
+def generate_dashboard(lines):
+    """corpus/dashboard.jsx with its main content repeated to about lines lines"""
+    with open(os.path.join(CORPUS_DIR, 'dashboard.jsx')) as source:
+        code = source.read().splitlines()
+    start = next(i for i, line in enumerate(code) if '<main' in line) + 1
+    end = next(i for i, line in enumerate(code) if '</main>' in line)
+    body = code[start:end]
+    repeats = max(1, (lines - len(code)) // len(body) + 1)
+    return '\n'.join(code[:start] + body * repeats + code[end:]) + '\n'
+
+def generate_style_object(count):
+    """A style object literal with count properties"""
+    props = ', '.join(f'{STYLE_PROPERTIES[i % len(STYLE_PROPERTIES)]}: {i % 50}' for i in range(count))
+    return f'{{{props}, ":hover": {{opacity: 1}}}}'
+
+def generate_state_nodes(count):
+    """Converted nodes of a stateful component with count children"""
+    children = ''.join(f'<p class="modal-text">Line {i}</p>' for i in range(count))
+    return app.parse_jsx(f'<div class="modal" style="width: 400px">{children}</div>')
+
+def generate_state_variations(nodes):
+    # Variants share the root's subtree, so serializing them is the real cost
+    return app.render_html(app.state_variation_nodes(nodes, 'modal'))
+
+def generate_placeholder_exprs(count):
+    """count distinct field expressions"""
+    return [f'{PLACEHOLDER_FIELDS[i % len(PLACEHOLDER_FIELDS)]}{i}' for i in range(count)]
+
+def generate_placeholders(exprs):
+    # Clear the memo so every call classifies every expression
+    app.placeholder_for.cache_clear()
+    for expr in exprs:
+        app.generate_placeholder_content(expr)
+
+# name: (function, input generator, sizes, unit of size)
+CURVES = {
+    # Steps of about sqrt(2), so one noisy large input cannot tip the fit
+    'convert-elements': (app.convert_react_to_webflow, generate_elements,
+                         (250, 354, 500, 707, 1000, 1414, 2000, 2828, 4000, 5657, 8000), 'elements'),
+    'convert-nesting': (app.convert_react_to_webflow, generate_nesting,
+                        (6, 12, 24, 48, 96, 192), 'levels'),
+    'convert-operators': (app.convert_react_to_webflow, generate_operators,
+                          (1250, 2500, 5000, 10000, 20000, 40000), 'operators'),
+    'convert-dashboard': (app.convert_react_to_webflow, generate_dashboard,
+                          (625, 1250, 2500, 5000), 'lines'),
+    'parse-style-object': (app.parse_style_object, generate_style_object,
+                           (50, 100, 200, 400, 800, 1600), 'properties'),
+    'component-states': (generate_state_variations, generate_state_nodes,
+                         (250, 500, 1000, 2000, 4000, 8000), 'elements'),
+    'placeholders': (generate_placeholders, generate_placeholder_exprs,
+                     (500, 1000, 2000, 4000, 8000, 16000), 'expressions'),
+}
+
+def measure(func, arg, min_time, repeat=5):
+    """Best seconds per call of func(arg) over repeat runs of at least min_time"""
+    best = math.inf
+    for _ in range(repeat):
+        calls = 0
+        started = time.perf_counter()
+        while True:
+            func(arg)
+            calls += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time:
+                break
+        best = min(best, elapsed / calls)
+    return best
+
+def calibration_workload(size):
+    """Fixed pure Python work, timed to factor out the speed of the machine"""
+    text = ' '.join(str(i) for i in range(size))
+    return sorted(text.split(), key=len)
+
+def scaling_exponent(sizes, seconds):
+    """Least squares slope of log(time) against log(size); 1 is linear"""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(value) for value in seconds]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    return covariance / variance
+
+def print_curve(name, unit, sizes, seconds, exponent):
+    print(f'\n{name}  (time ~ size^{exponent:.2f})')
+    longest = max(seconds)
+    for size, value in zip(sizes, seconds):
+        bar = '#' * max(1, round(40 * value / longest))
+        print(f'  {size:>7} {unit:<11} {value * 1000:>10.3f} ms  {bar}')
+
+def plot_curves(curves, path):
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print('matplotlib is not installed, skipping the plot')
+        return
+    figure, axes = plt.subplots()
+    for name, (sizes, seconds) in curves.items():
+        # Normalize so curves of different units share the axes
+        axes.loglog([size / sizes[0] for size in sizes], [value / seconds[0] for value in seconds],
+                    marker='o', label=name)
+    axes.loglog([1, 32], [1, 32], linestyle='--', color='grey', label='linear')
+    axes.set_xlabel('input size (relative to smallest)')
+    axes.set_ylabel('time (relative to smallest)')
+    axes.legend()
+    figure.savefig(path)
+    print(f'Plot written to {path}')
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the React to Webflow converter')
+    parser.add_argument('--quick', action='store_true', help='smaller inputs and shorter runs')
+    parser.add_argument('--max-exponent', type=float, default=1.25,
+                        help='fail when time grows faster than size to this power')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='fail when a benchmark is this much slower than the baseline')
+    parser.add_argument('--update-baseline', action='store_true', help='write timings to baseline.json')
+    parser.add_argument('--plot', metavar='PATH', help='plot the scaling curves to an image file')
+    args = parser.parse_args()
+    min_time = 0.1 if args.quick else 0.2
+
+    results = {'calibration': measure(calibration_workload, 20000, min_time)}
+    points = {}
+    failures = []
+
+    print('Corpus')
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, '*.jsx'))):
+        with open(path) as source:
+            code = source.read()
+        seconds = measure(app.convert_react_to_webflow, code, min_time)
+        name = f'corpus/{os.path.basename(path)}'
+        results[name] = seconds
+        print(f'  {name:<28} {len(code):>7} chars {seconds * 1000:>9.3f} ms '
+              f'{len(code) / seconds / 1e6:>7.2f} MB/s {1 / seconds:>9.0f} conversions/s')
+
+    curves = {}
+    for name, (func, generate, sizes, unit) in CURVES.items():
+        if args.quick:
+            sizes = [size for size in sizes if size <= sizes[0] * 8]
+        seconds = [measure(func, generate(size), min_time) for size in sizes]
+        exponent = scaling_exponent(sizes, seconds)
+        curves[name] = (sizes, seconds)
+        # Every size gets a baseline, so a --quick run finds the entry for
+        # its own largest input, but only that one is compared
+        points.update({f'curve/{name}@{size}': value for size, value in zip(sizes, seconds)})
+        results[f'curve/{name}@{sizes[-1]}'] = seconds[-1]
+        print_curve(name, unit, sizes, seconds, exponent)
+        if exponent > args.max_exponent:
+            failures.append(f'{name} scales as size^{exponent:.2f}, over the limit of {args.max_exponent}')
+
+    if args.plot:
+        plot_curves(curves, args.plot)
+
+    if args.update_baseline:
+        # Keep the entries of other benchmarks, such as cold_start.py
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH) as baseline_file:
+                baseline = json.load(baseline_file)
+        baseline.update({name: round(value, 9) for name, value in {**results, **points}.items()})
+        with open(BASELINE_PATH, 'w') as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write('\n')
+        print(f'\nBaseline written to {BASELINE_PATH}')
+    elif os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as baseline_file:
+            baseline = json.load(baseline_file)
+        # Compare relative to the calibration run, so a slower or busier
+        # machine does not read as a regression
+        speed = results['calibration'] / baseline.get('calibration', results['calibration'])
+        print(f'\nAgainst baseline (machine speed {1 / speed:.2f}x the baseline)')
+        for name, value in results.items():
+            if name not in baseline or name == 'calibration':
+                continue
+            ratio = value / baseline[name] / speed
+            print(f'  {name:<28} {ratio:>6.2f}x')
+            if ratio > 1 + args.tolerance:
+                failures.append(f'{name} is {ratio:.2f}x its baseline time')
+
+    if failures:
+        print('\nFAILED')
+        for failure in failures:
+            print(f'  {failure}')
+        sys.exit(1)
+    print('\nOK')
+
+if __name__ == '__main__':
+    main()
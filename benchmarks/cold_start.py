@@ -0,0 +1,123 @@
+"""Cold-start benchmark.
+
+Starts fresh interpreters the way a serverless platform does and times
+importing app.py, the first /convert request and the whole process.
+Fails when the median import plus first request is over the budget, or
+slower than its entry in baseline.json.
+
+    python benchmarks/cold_start.py                    # run and check
+    python benchmarks/cold_start.py --details          # also list the slowest imports
+    python benchmarks/cold_start.py --update-baseline  # record this machine's timings
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from bench import BASELINE_PATH, calibration_workload, measure
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in each fresh interpreter and prints its timings as JSON
+CHILD = '''
+import io, json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+body = json.dumps({'react_code': '<div className="card" style={{padding: 8}}>{user.name}</div>'}).encode()
+environ = {'REQUEST_METHOD': 'POST', 'PATH_INFO': '/convert', 'SERVER_NAME': 'localhost', 'SERVER_PORT': '80',
+           'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(body),
+           'wsgi.errors': io.StringIO(), 'CONTENT_TYPE': 'application/json', 'CONTENT_LENGTH': str(len(body))}
+statuses = []
+b''.join(app.app(environ, lambda status, headers: statuses.append(status)))
+print(json.dumps({'import': imported - started, 'first-request': time.perf_counter() - imported,
+                  'status': statuses[0]}))
+'''
+
+def cold_start(environment):
+    """Timings of one fresh interpreter importing the app and serving a request"""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', CHILD], cwd=PACKAGE_DIR, env=environment,
+                            capture_output=True, text=True, check=True)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    if not timings.pop('status').startswith('200'):
+        raise RuntimeError(f'First request failed:\n{result.stderr}')
+    timings['process'] = time.perf_counter() - started
+    return timings
+
+def slowest_imports(environment, count=10):
+    """(cumulative seconds, module) of the slowest imports under -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=PACKAGE_DIR,
+                            env=environment, capture_output=True, text=True, check=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and 'cumulative' not in line:
+            _, cumulative, module = line[len('import time:'):].split('|')
+            imports.append((int(cumulative) / 1e6, module.rstrip()))
+    return sorted(imports, reverse=True)[:count]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cold starts of the React to Webflow converter')
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters to start')
+    parser.add_argument('--budget', type=float, default=500,
+                        help='fail when import plus first request takes longer, in ms')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='fail when a timing is this much slower than the baseline')
+    parser.add_argument('--no-serverless', action='store_true',
+                        help='start as a long-running server would, with workers and no warmup')
+    parser.add_argument('--details', action='store_true', help='list the slowest imports')
+    parser.add_argument('--update-baseline', action='store_true', help='write timings to baseline.json')
+    args = parser.parse_args()
+
+    # Default settings, whatever the calling shell has set
+    environment = dict(os.environ, LOG_LEVEL='WARNING', WARMUP='0')
+    if not args.no_serverless:
+        environment['VERCEL'] = '1'
+    runs = [cold_start(environment) for _ in range(args.runs)]
+    results = {f'cold-start/{name}': statistics.median(run[name] for run in runs) for name in runs[0]}
+    results['cold-start/calibration'] = measure(calibration_workload, 20000, 0.1)
+    failures = []
+
+    print(f'Cold start, median of {args.runs} runs')
+    for name in ('import', 'first-request', 'process'):
+        print(f'  {name:<14} {results[f"cold-start/{name}"] * 1000:>9.1f} ms')
+    critical = (results['cold-start/import'] + results['cold-start/first-request']) * 1000
+    if critical > args.budget:
+        failures.append(f'import plus first request takes {critical:.1f} ms, over the budget of {args.budget:g} ms')
+
+    if args.details:
+        print('\nSlowest imports (cumulative)')
+        for seconds, module in slowest_imports(environment):
+            print(f'  {seconds * 1000:>9.1f} ms  {module.strip()}')
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as baseline_file:
+            baseline = json.load(baseline_file)
+    if args.update_baseline:
+        baseline.update({name: round(value, 9) for name, value in results.items()})
+        with open(BASELINE_PATH, 'w') as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write('\n')
+        print(f'\nBaseline written to {BASELINE_PATH}')
+    elif 'cold-start/calibration' in baseline:
+        speed = results['cold-start/calibration'] / baseline['cold-start/calibration']
+        print(f'\nAgainst baseline (machine speed {1 / speed:.2f}x the baseline)')
+        for name in ('cold-start/import', 'cold-start/first-request'):
+            ratio = results[name] / baseline[name] / speed
+            print(f'  {name:<28} {ratio:>6.2f}x')
+            if ratio > 1 + args.tolerance:
+                failures.append(f'{name} is {ratio:.2f}x its baseline time')
+
+    if failures:
+        print('\nFAILED')
+        for failure in failures:
+            print(f'  {failure}')
+        sys.exit(1)
+    print('\nOK')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+export default function Button() {
+  return (
+    <button className="btn btn-primary" onClick={handleClick} style={{padding: 12, borderRadius: 6}}>
+      Get started
+    </button>
+  );
+}
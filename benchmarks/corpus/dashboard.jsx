@@ -0,0 +1,100 @@
+function Dashboard() {
+  return (
+    <div className="dashboard">
+      <aside className="sidebar" style={{width: 240, minHeight: '100vh'}}>
+        <div className="sidebar-brand">Acme Analytics</div>
+        <nav className="sidebar-nav">
+          <a className="sidebar-link active" href="/overview">Overview</a>
+          <a className="sidebar-link" href="/reports">Reports</a>
+          <a className="sidebar-link" href="/customers">Customers</a>
+          <a className="sidebar-link" href="/settings">Settings</a>
+        </nav>
+      </aside>
+      <main className="dashboard-main">
+        <header className="dashboard-header">
+          <h1 className="page-title">Overview</h1>
+          <div className="header-actions">
+            <input type="search" className="search-input" placeholder="Search..." onChange={updateQuery} />
+            <button className="btn btn-primary" onClick={exportReport}>Export</button>
+          </div>
+        </header>
+        <section className="stats-grid">
+          <div className="stat-card">
+            <span className="stat-label">Revenue</span>
+            <span className="stat-value">{formatCurrency(stats.revenue)}</span>
+            <span className={stats.revenueDelta > 0 ? 'stat-delta up' : 'stat-delta down'}>{stats.revenueDelta}%</span>
+          </div>
+          <div className="stat-card">
+            <span className="stat-label">Active users</span>
+            <span className="stat-value">{stats.activeUsers}</span>
+            <span className="stat-delta up">+4.1%</span>
+          </div>
+          <div className="stat-card">
+            <span className="stat-label">Conversion</span>
+            <span className="stat-value">{stats.conversion}%</span>
+            <span className="stat-delta down">-0.3%</span>
+          </div>
+          <div className="stat-card">
+            <span className="stat-label">Churn</span>
+            <span className="stat-value">{stats.churn}%</span>
+            <span className="stat-delta up">-1.2%</span>
+          </div>
+        </section>
+        <section className="panel">
+          <div className="panel-header">
+            <h2 className="panel-title">Recent orders</h2>
+            <div className="filter-group">
+              <button className={filter === 'all' ? 'filter-btn active' : 'filter-btn'} onClick={() => setFilter('all')}>All</button>
+              <button className={filter === 'paid' ? 'filter-btn active' : 'filter-btn'} onClick={() => setFilter('paid')}>Paid</button>
+              <button className={filter === 'refunded' ? 'filter-btn active' : 'filter-btn'} onClick={() => setFilter('refunded')}>Refunded</button>
+            </div>
+          </div>
+          <table className="orders-table">
+            <thead>
+              <tr>
+                <th>Order</th>
+                <th>Customer</th>
+                <th>Status</th>
+                <th style={{textAlign: 'right'}}>Total</th>
+              </tr>
+            </thead>
+            <tbody>
+              <tr className="order-row" onClick={openOrder}>
+                <td>#1042</td>
+                <td>Jane Smith</td>
+                <td><span className="status paid">Paid</span></td>
+                <td style={{textAlign: 'right'}}>$129.00</td>
+              </tr>
+              <tr className="order-row" onClick={openOrder}>
+                <td>#1041</td>
+                <td>Michael Johnson</td>
+                <td><span className="status refunded">Refunded</span></td>
+                <td style={{textAlign: 'right'}}>$49.00</td>
+              </tr>
+            </tbody>
+          </table>
+          {loading && <div className="spinner" style={{margin: 24}} />}
+        </section>
+        <section className="panel">
+          <div className="panel-header">
+            <h2 className="panel-title">Top categories</h2>
+          </div>
+          <ul className="category-list">
+            <li className="category-item">
+              <span className="category-name">Electronics</span>
+              <div className="bar" style={{width: `${share.electronics}%`, height: 8}} />
+            </li>
+            <li className="category-item">
+              <span className="category-name">Clothing</span>
+              <div className="bar" style={{width: `${share.clothing}%`, height: 8}} />
+            </li>
+            <li className="category-item">
+              <span className="category-name">Home &amp; Garden</span>
+              <div className="bar" style={{width: `${share.home}%`, height: 8}} />
+            </li>
+          </ul>
+        </section>
+      </main>
+    </div>
+  );
+}
@@ -0,0 +1,20 @@
+function Navbar() {
+  return (
+    <nav className="navbar" style={{height: 64, padding: '0 24px', zIndex: 10}}>
+      <a className="brand-link" href="/">
+        <img className="brand-logo" src="logo.svg" alt="Acme" />
+        <span className="brand-name">Acme</span>
+      </a>
+      <ul className="nav-links">
+        <li><a className="nav-link active" href="/">Home</a></li>
+        <li><a className="nav-link" href="/products" onMouseEnter={prefetchProducts}>Products</a></li>
+        <li><a className="nav-link" href="/pricing">Pricing</a></li>
+        <li><a className="nav-link" href="/about">About</a></li>
+      </ul>
+      <div className="nav-actions">
+        {isLoggedIn && <span className="greeting">Welcome back</span>}
+        <button className="btn btn-outline" onClick={toggleMenu}>Menu</button>
+      </div>
+    </nav>
+  );
+}
@@ -0,0 +1,46 @@
+function PricingTable() {
+  return (
+    <section className="pricing">
+      <div className="pricing-header">
+        <h2 className="section-title">Simple, transparent pricing</h2>
+        <div className="billing-toggle" onClick={toggleBilling}>
+          <span className={yearly ? 'toggle-label' : 'toggle-label active'}>Monthly</span>
+          <span className={yearly ? 'toggle-label active' : 'toggle-label'}>Yearly</span>
+        </div>
+      </div>
+      <div className="pricing-grid">
+        <div className="pricing-card">
+          <h3 className="plan-name">Starter</h3>
+          <p className="plan-price">{yearly ? '$90/year' : '$9/month'}</p>
+          <ul className="plan-features">
+            <li>1 project</li>
+            <li>Basic analytics</li>
+            <li>Email support</li>
+          </ul>
+          <button className="btn btn-outline" onClick={() => choosePlan('starter')}>Choose Starter</button>
+        </div>
+        <div className="pricing-card featured" style={{transform: 'scale(1.05)', boxShadow: '0 8px 24px rgba(0, 0, 0, 0.12)'}}>
+          <span className="badge">Most popular</span>
+          <h3 className="plan-name">Pro</h3>
+          <p className="plan-price">{yearly ? '$290/year' : '$29/month'}</p>
+          <ul className="plan-features">
+            <li>Unlimited projects</li>
+            <li>Advanced analytics</li>
+            <li>Priority support</li>
+          </ul>
+          <button className="btn btn-primary" onClick={() => choosePlan('pro')}>Choose Pro</button>
+        </div>
+        <div className="pricing-card">
+          <h3 className="plan-name">Enterprise</h3>
+          <p className="plan-price">Contact us</p>
+          <ul className="plan-features">
+            <li>SSO and audit logs</li>
+            <li>Dedicated manager</li>
+            <li>Custom contracts</li>
+          </ul>
+          <button className="btn btn-outline" onClick={contactSales}>Talk to sales</button>
+        </div>
+      </div>
+    </section>
+  );
+}
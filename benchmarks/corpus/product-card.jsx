@@ -0,0 +1,26 @@
+import React from 'react';
+
+function ProductCard() {
+  return (
+    <div className="product-card" onMouseEnter={showQuickView}>
+      <img className="product-image" src="sneaker.jpg" alt="Running sneaker" />
+      <div className="product-info">
+        <span className="product-category">{product.category}</span>
+        <h3 className="product-title">{product.title}</h3>
+        <div className="product-rating">
+          {[5, 4, 3, 2, 1].map(stars => (
+            <span key={stars} className="star">★</span>
+          ))}
+        </div>
+        <div className="product-price-wrapper">
+          {product.onSale ? <span className="sale-price">$79.99</span> : <span className="price">$99.99</span>}
+        </div>
+        <button className="add-to-cart-btn" onClick={() => addToCart(product.id)} style={{width: '100%', marginTop: 12}}>
+          Add to Cart
+        </button>
+      </div>
+    </div>
+  );
+}
+
+export default ProductCard;
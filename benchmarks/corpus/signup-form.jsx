@@ -0,0 +1,30 @@
+function SignupForm() {
+  return (
+    <form className="signup-form" onSubmit={handleSubmit}>
+      <div className="form-header">
+        <h2 className="form-title">Create your account</h2>
+        <p className="form-subtitle">Free for 14 days, no credit card required.</p>
+      </div>
+      <div className="form-group">
+        <label htmlFor="name">Full name</label>
+        <input id="name" type="text" className="form-input" placeholder="Jane Smith" onChange={updateName} />
+      </div>
+      <div className="form-group">
+        <label htmlFor="email">Email</label>
+        <input id="email" type="email" className="form-input" placeholder="jane@example.com" onChange={updateEmail} onBlur={validateEmail} />
+        {emailError && <span className="validation-message">Please enter a valid email</span>}
+      </div>
+      <div className="form-group">
+        <label htmlFor="password">Password</label>
+        <input id="password" type="password" className="form-input" onChange={updatePassword} />
+        <div className="strength-meter" style={{height: 4, width: `${strength}%`, backgroundColor: strengthColor}} />
+      </div>
+      <label className="checkbox">
+        <input type="checkbox" onChange={toggleTerms} /> I agree to the <a href="/terms">terms</a>
+      </label>
+      <button type="submit" className="submit-btn" disabled={!canSubmit} style={{marginTop: 16, opacity: canSubmit ? 1 : 0.5}}>
+        {submitting ? 'Creating account...' : 'Create account'}
+      </button>
+    </form>
+  );
+}
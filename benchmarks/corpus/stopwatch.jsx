@@ -0,0 +1,35 @@
+import React, { useState, useEffect } from 'react';
+
+export default function Stopwatch({ precision }) {
+  const [elapsed, setElapsed] = useState(0);
+  const [running, setRunning] = useState(false);
+  const [laps, setLaps] = useState([]);
+
+  useEffect(() => {
+    if (!running) return;
+    const timer = setInterval(() => setElapsed(value => value + 10), 10);
+    return () => clearInterval(timer);
+  }, [running]);
+
+  const seconds = (elapsed / 1000).toFixed(precision);
+
+  return (
+    <section className="stopwatch">
+      <h2 className="stopwatch-title">Stopwatch</h2>
+      <p className="stopwatch-display" style={{fontSize: 48, letterSpacing: 2}}>{seconds}s</p>
+      <div className="stopwatch-controls">
+        <button className="control start" onClick={() => setRunning(!running)}>
+          {running ? 'Pause' : 'Start'}
+        </button>
+        <button className="control lap" onClick={() => setLaps([...laps, elapsed])}>Lap</button>
+        <button className="control reset" onClick={() => { setElapsed(0); setLaps([]); }}>Reset</button>
+      </div>
+      <ol className="laps">
+        {laps.map((lap, index) => (
+          <li key={index} className="lap-time" style={{padding: 4}}>Lap {index + 1}</li>
+        ))}
+      </ol>
+      {laps.length > 0 && <p className="laps-summary">{laps.length} laps recorded</p>}
+    </section>
+  );
+}
@@ -36,6 +36,28 @@ document.addEventListener('DOMContentLoaded', function() {
         div.style.color = isError ? '#991b1b' : '#166534';
     }
 
+    // Results of recent conversions keyed by a hash of the input, so
+    // converting unchanged code again never reaches the server
+    const MAX_MEMOIZED_CONVERSIONS = 20;
+    const conversionMemo = new Map();
+
+    async function hashCode(code) {
+        // crypto.subtle is only available in secure contexts
+        if (!window.crypto || !window.crypto.subtle) {
+            return code;
+        }
+        const digest = await window.crypto.subtle.digest('SHA-256', new TextEncoder().encode(code));
+        return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+    }
+
+    function rememberConversion(key, convertedCode) {
+        conversionMemo.delete(key);
+        conversionMemo.set(key, convertedCode);
+        if (conversionMemo.size > MAX_MEMOIZED_CONVERSIONS) {
+            conversionMemo.delete(conversionMemo.keys().next().value);
+        }
+    }
+
     // Convert button click handler
     // Add click handler for convert button
     const convertBtn = document.getElementById('convertBtn');
@@ -56,10 +78,20 @@ document.addEventListener('DOMContentLoaded', function() {
         showStatus('Converting...');
         
         try {
+            const memoKey = await hashCode(reactCode);
+            if (conversionMemo.has(memoKey)) {
+                console.log('Using memoized conversion');
+                const convertedCode = conversionMemo.get(memoKey);
+                rememberConversion(memoKey, convertedCode);
+                webflowEditor.setValue(convertedCode);
+                showStatus('Conversion successful!');
+                return;
+            }
+
             console.log('Attempting to send code to server:', reactCode);
             showStatus('Sending request to server...');
             
-            const url = 'http://localhost:8080/convert';
+            const url = '/convert';
             console.log('Sending POST request to:', url);
             
             const response = await fetch(url, {
@@ -68,7 +100,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     'Content-Type': 'application/json',
                     'Accept': 'application/json'
                 },
-                body: JSON.stringify({ code: reactCode })
+                body: JSON.stringify({ react_code: reactCode })
             });
 
             console.log('Server response:', response);
@@ -76,6 +108,7 @@ document.addEventListener('DOMContentLoaded', function() {
             console.log('Response data:', data);
             
             if (response.ok) {
+                rememberConversion(memoKey, data.converted_code);
                 webflowEditor.setValue(data.converted_code);
                 showStatus('Conversion successful!');
             } else {
@@ -104,6 +137,55 @@ document.addEventListener('DOMContentLoaded', function() {
             });
     });
 
+    // Copy for Webflow: the Designer pastes its own clipboard JSON, which
+    // has to be on the clipboard as application/json rather than text
+    const webflowCopyBtn = document.createElement('button');
+    webflowCopyBtn.textContent = 'Copy for Webflow';
+    webflowCopyBtn.className = 'bg-green-700 hover:bg-green-800 text-white font-bold py-2 px-6 rounded-lg transition duration-200';
+    document.querySelector('.flex.justify-center.mt-8.space-x-4').appendChild(webflowCopyBtn);
+
+    function copyWebflowClipboard(json) {
+        const onCopy = event => {
+            event.clipboardData.setData('application/json', json);
+            event.preventDefault();
+        };
+        document.addEventListener('copy', onCopy);
+        try {
+            return document.execCommand('copy');
+        } finally {
+            document.removeEventListener('copy', onCopy);
+        }
+    }
+
+    webflowCopyBtn.addEventListener('click', async () => {
+        const reactCode = reactEditor.getValue();
+        if (!reactCode.trim()) {
+            showStatus('Please enter some React code to convert', true);
+            return;
+        }
+        try {
+            const response = await fetch('/convert', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Accept': 'application/json'
+                },
+                body: JSON.stringify({ react_code: reactCode, format: 'webflow' })
+            });
+            const data = await response.json();
+            if (!response.ok) {
+                showStatus('Error: ' + (data.error || 'Unknown error occurred'), true);
+            } else if (copyWebflowClipboard(data.converted_code)) {
+                showStatus('Copied! Paste into the Webflow Designer.');
+            } else {
+                showStatus('The browser blocked the copy, try again', true);
+            }
+        } catch (error) {
+            console.error('Conversion error:', error);
+            showStatus('Error converting code. Check console for details.', true);
+        }
+    });
+
     // Add example button
     const exampleBtn = document.createElement('button');
     exampleBtn.textContent = 'Load Example';
@@ -126,4 +208,160 @@ document.addEventListener('DOMContentLoaded', function() {
         reactEditor.setValue(exampleCode);
         showStatus('Example code loaded!');
     });
+
+    // Live preview: edits are sent as text splices and the server streams
+    // back only the parts of the converted code that changed
+    const LIVE_DEBOUNCE_MS = 150;
+    let live = null;
+
+    const liveBtn = document.createElement('button');
+    liveBtn.textContent = 'Live Preview: Off';
+    liveBtn.className = 'bg-blue-500 hover:bg-blue-600 text-white font-bold py-2 px-6 rounded-lg transition duration-200';
+    document.querySelector('.flex.justify-center.mt-8.space-x-4').appendChild(liveBtn);
+
+    function textSplice(before, after) {
+        const limit = Math.min(before.length, after.length);
+        let start = 0;
+        while (start < limit && before[start] === after[start]) {
+            start++;
+        }
+        let end = 0;
+        while (end < limit - start && before[before.length - 1 - end] === after[after.length - 1 - end]) {
+            end++;
+        }
+        return { start: start, end: before.length - end, text: after.slice(start, after.length - end) };
+    }
+
+    function renderLive() {
+        const scroll = webflowEditor.getScrollInfo();
+        webflowEditor.setValue(live.segments.join('').trim());
+        webflowEditor.scrollTo(scroll.left, scroll.top);
+    }
+
+    function postLive(session, body) {
+        return fetch('/live/' + session.id, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(body)
+        });
+    }
+
+    async function sendLiveEdit() {
+        const session = live;
+        if (!session) {
+            return;
+        }
+        if (session.sending) {
+            session.pending = true;
+            return;
+        }
+        const text = reactEditor.getValue();
+        if (text === session.sent) {
+            return;
+        }
+        session.sending = true;
+        // Offsets are counted in code points on the server, so text with
+        // surrogate pairs is always sent whole
+        const body = session.revision === null || /[\uD800-\uDFFF]/.test(text + session.sent)
+            ? { react_code: text }
+            : { revision: session.revision, edit: textSplice(session.sent, text) };
+        try {
+            let response = await postLive(session, body);
+            if (response.status === 409) {
+                response = await postLive(session, { react_code: text });
+            }
+            if (response.status === 404) {
+                console.log('Live session expired, starting a new one');
+                session.sending = false;
+                stopLive();
+                await startLive();
+                return;
+            }
+            const data = await response.json();
+            if (response.ok) {
+                session.revision = data.revision;
+                session.sent = text;
+            } else {
+                showStatus('Error: ' + (data.error || 'Unknown error occurred'), true);
+            }
+        } catch (error) {
+            console.error('Live conversion error:', error);
+            showStatus('Error sending live edit. Check console for details.', true);
+        } finally {
+            session.sending = false;
+            if (session.pending && live === session) {
+                session.pending = false;
+                sendLiveEdit();
+            }
+        }
+    }
+
+    function onLiveChange() {
+        clearTimeout(live.timer);
+        live.timer = setTimeout(sendLiveEdit, LIVE_DEBOUNCE_MS);
+    }
+
+    async function startLive() {
+        const response = await fetch('/live', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ format: 'pretty' })
+        });
+        const data = await response.json();
+        if (!response.ok) {
+            showStatus('Error: ' + (data.error || 'Could not start live preview'), true);
+            return;
+        }
+        live = { id: data.session, revision: null, sent: null, shown: 0, segments: [],
+                 sending: false, pending: false, timer: null, source: new EventSource(data.events) };
+        live.source.addEventListener('snapshot', event => {
+            const snapshot = JSON.parse(event.data);
+            live.segments = snapshot.segments;
+            live.shown = snapshot.revision;
+            renderLive();
+        });
+        live.source.addEventListener('delta', event => {
+            const delta = JSON.parse(event.data);
+            if (delta.revision <= live.shown) {
+                return;
+            }
+            live.segments.splice(delta.start, delta.deleted, ...delta.inserted);
+            live.shown = delta.revision;
+            renderLive();
+            showStatus('Live preview updated');
+        });
+        live.source.addEventListener('conversion-error', event => {
+            showStatus('Error: ' + JSON.parse(event.data).error, true);
+        });
+        reactEditor.on('change', onLiveChange);
+        liveBtn.textContent = 'Live Preview: On';
+        showStatus('Live preview started');
+        sendLiveEdit();
+    }
+
+    function stopLive() {
+        if (!live) {
+            return;
+        }
+        clearTimeout(live.timer);
+        live.source.close();
+        reactEditor.off('change', onLiveChange);
+        fetch('/live/' + live.id, { method: 'DELETE' }).catch(() => {});
+        live = null;
+        liveBtn.textContent = 'Live Preview: Off';
+    }
+
+    liveBtn.addEventListener('click', async () => {
+        if (live) {
+            stopLive();
+            showStatus('Live preview stopped');
+            return;
+        }
+        try {
+            await startLive();
+        } catch (error) {
+            console.error('Live preview error:', error);
+            showStatus('Error starting live preview. Check console for details.', true);
+        }
+    });
 });
@@ -0,0 +1,9 @@
+import logging
+import os
+import sys
+
+# Run from anywhere, importing app.py from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Conversions log every input, which would bury test failures
+logging.disable(logging.INFO)
@@ -0,0 +1,12 @@
+function Card() {
+  return (
+    <div className="card">
+      <img src="photo.jpg" className="card-image" />
+      <div className="card-body">
+        <h3 className="card-title">Product</h3>
+        <p className="card-text">Some description text</p>
+        <span className='price'>$99</span>
+      </div>
+    </div>
+  );
+}
@@ -0,0 +1,28 @@
+import React, { useState } from 'react';
+
+function ProductFilters() {
+  return (
+    <div className="filters" style={{padding: 16, backgroundColor: '#f8f9fa', borderRadius: 8}}>
+      {/* Category select */}
+      <select className="category-select" onChange={(e) => setSelectedCategory(e.target.value)}>
+        {categories.map(category => <option value={category.id}>{category.name}</option>)}
+      </select>
+      <div className="rating-filter">
+        {[5,4,3,2,1].map(stars => <button onClick={() => setSelectedRating(stars)}>{stars}★ & up</button>)}
+      </div>
+      <div className="price-range">
+        <input type="number" placeholder="Min" onChange={(e) => setMinPrice(e.target.value)} />
+        <input type="number" placeholder="Max" onChange={(e) => setMaxPrice(e.target.value)} />
+      </div>
+      <p className="results-count">Showing {filteredResults.length} results</p>
+      {selectedCategory && <span className="active-category">{selectedCategory}</span>}
+      <div className="active-filters">
+        {activeFilters.map(filter => <span className="filter-tag">{filter.label}</span>)}
+      </div>
+      <span className="label">{`Price: ${minPrice} - ${maxPrice}`}</span>
+      <img src="divider.png" alt="" />
+    </div>
+  );
+}
+
+export default ProductFilters;
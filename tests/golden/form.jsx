@@ -0,0 +1,11 @@
+function ContactForm() {
+  return (
+    <form className="contact-form" onSubmit={handleSubmit}>
+      <label htmlFor="email">Email</label>
+      <input id="email" type="email" className="form-input" onFocus={onFocus} onBlur={onBlur} />
+      <textarea className="form-textarea" onKeyPress={handleKey}></textarea>
+      {error ? <span className="error">Invalid</span> : <span className="hint">Required</span>}
+      <button type="submit" className="submit-btn" style={{margin: 8, padding: 12}}>Send</button>
+    </form>
+  );
+}
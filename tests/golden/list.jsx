@@ -0,0 +1,11 @@
+function TodoList() {
+  return (
+    <ul className="todo-list">
+      {todos.map(todo => <li className="todo">{todo.title}</li>)}
+      {loading && <li className="loading">Loading</li>}
+      <li className="summary">{maxPrice}</li>
+      <li className="summary">{minPrice}</li>
+      <li className="summary">{selectedRating}</li>
+    </ul>
+  );
+}
@@ -0,0 +1,13 @@
+function Modal() {
+  return (
+    <div className="modal-wrapper">
+      <div className="modal-overlay" onClick={close} />
+      <div className="modal" style={{width: 400, height: 300}}>
+        <h2 className="modal-title">Notice</h2>
+        <p className="modal-body">Please confirm.</p>
+        <button className="modal-btn" onClick={confirm}>OK</button>
+        <button className="modal-btn" onClick={close}>Cancel</button>
+      </div>
+    </div>
+  );
+}
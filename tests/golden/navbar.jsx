@@ -0,0 +1,18 @@
+import React from 'react';
+import './Navbar.css';
+
+function Navbar() {
+  return (
+    <nav className="navbar">
+      <a href="/" className="brand">Brand</a>
+      <ul className="nav-links">
+        <li><a href="/about" onMouseEnter={() => setHover(true)}>About</a></li>
+        <li><a href="/contact" onMouseLeave={handleLeave}>Contact</a></li>
+      </ul>
+      <button className="menu-toggle" onClick={toggle}>{text}</button>
+      <br />
+    </nav>
+  );
+}
+
+export default Navbar;
@@ -0,0 +1,5 @@
+<div className="hero">
+  <h2 className="hero-title">Welcome</h2>
+  <p>Static text only</p>
+  <hr />
+</div>
@@ -0,0 +1,29 @@
+"""The conversion cache"""
+import app
+
+def test_evicts_least_recently_used_beyond_max_entries():
+    cache = app.ConversionCache(max_entries=2)
+    cache.put('a', 'A')
+    cache.put('b', 'B')
+    assert cache.get('a') == ('A', 'hit')
+    cache.put('c', 'C')
+    assert cache.get('b') == (None, 'miss')
+    assert cache.get('a') == ('A', 'hit')
+    assert cache.stats()['evictions'] == 1
+
+def test_evicts_beyond_max_bytes():
+    cache = app.ConversionCache(max_bytes=100)
+    cache.put('a', 'a' * 40)
+    cache.put('b', 'b' * 40)
+    cache.put('c', 'c' * 40)
+    assert cache.get('a') == (None, 'miss')
+    assert cache.stats()['bytes'] == 80
+    # Replacing an entry counts its new size only
+    cache.put('c', 'c' * 10)
+    assert cache.stats()['bytes'] == 50
+
+def test_skips_outputs_over_max_entry_bytes(tmp_path):
+    cache = app.ConversionCache(db_path=str(tmp_path / 'cache.db'), max_entry_bytes=10)
+    cache.put('big', 'x' * 11)
+    assert cache.get('big') == (None, 'miss')
+    assert cache.stats()['oversized'] == 1
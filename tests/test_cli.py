@@ -0,0 +1,23 @@
+"""The flask convert command"""
+import app
+
+def component(text):
+    return f'export default function Button() {{ return <button>{text}</button>; }}\n'
+
+def test_sources_differing_only_in_extension_keep_it(tmp_path):
+    source, output = tmp_path / 'src', tmp_path / 'webflow'
+    source.mkdir()
+    (source / 'Button.jsx').write_text(component('jsx'))
+    (source / 'Button.tsx').write_text(component('tsx'))
+    runner = app.app.test_cli_runner()
+
+    result = runner.invoke(args=['convert', str(source), str(output), '--workers', '1'])
+    assert result.exit_code == 0
+    assert 'jsx' in (output / 'Button.jsx.html').read_text()
+    assert 'tsx' in (output / 'Button.tsx.html').read_text()
+
+    # Without the collision the output takes the usual name again
+    (source / 'Button.tsx').unlink()
+    result = runner.invoke(args=['convert', str(source), str(output), '--workers', '1'])
+    assert result.exit_code == 0
+    assert sorted(path.name for path in output.iterdir()) == ['Button.html', 'conversion-manifest.json']
@@ -0,0 +1,40 @@
+"""Converter output on the golden corpus, in every output format.
+
+Inputs are the components in tests/golden/ and benchmarks/corpus/; the
+expected outputs live in tests/golden/expected/. After an intended
+change to converter output, bump CONVERTER_VERSION and regenerate them:
+
+    UPDATE_GOLDEN=1 python -m pytest tests/test_golden.py
+"""
+import glob
+import os
+
+import pytest
+
+import app
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+EXPECTED_DIR = os.path.join(TESTS_DIR, 'golden', 'expected')
+CORPORA = {
+    'golden': os.path.join(TESTS_DIR, 'golden'),
+    'benchmarks': os.path.join(os.path.dirname(TESTS_DIR), 'benchmarks', 'corpus'),
+}
+
+def golden_cases():
+    for corpus, directory in CORPORA.items():
+        for path in sorted(glob.glob(os.path.join(directory, '*.jsx'))):
+            name = os.path.splitext(os.path.basename(path))[0]
+            for output_format in app.OUTPUT_FORMATS:
+                yield pytest.param(path, f'{corpus}-{name}.{output_format}', output_format,
+                                   id=f'{corpus}/{name}/{output_format}')
+
+@pytest.mark.parametrize('path, expected_name, output_format', list(golden_cases()))
+def test_golden_output(path, expected_name, output_format):
+    with open(path, encoding='utf-8') as source:
+        converted = app.convert_react_to_webflow(source.read(), output_format)
+    expected_path = os.path.join(EXPECTED_DIR, expected_name)
+    if os.environ.get('UPDATE_GOLDEN'):
+        with open(expected_path, 'w', encoding='utf-8') as expected_file:
+            expected_file.write(converted)
+    with open(expected_path, encoding='utf-8') as expected_file:
+        assert converted == expected_file.read()
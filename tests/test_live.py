@@ -0,0 +1,36 @@
+"""Live editing sessions"""
+import os
+
+import app
+
+DASHBOARD = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'benchmarks', 'corpus', 'dashboard.jsx')
+
+def test_small_edit_reconverts_one_segment():
+    with open(DASHBOARD) as source:
+        code = source.read()
+    session = app.LiveSession('pretty')
+    session.edit(0, code)
+    session.events.get()
+    segments = len(session.keys)
+
+    # Renaming a heading shifts the source offsets of everything below it
+    start = code.index('Overview')
+    session.edit(1, None, {'start': start, 'end': start + len('Overview'), 'text': 'Summary'})
+    _, delta = session.events.get()
+    assert (delta['deleted'], len(delta['inserted']), delta['converted']) == (1, 1, 1)
+    assert len(session.keys) == segments
+
+    edited = code[:start] + 'Summary' + code[start + len('Overview'):]
+    fresh = app.LiveSession('pretty')
+    fresh.edit(0, edited)
+    assert session.snapshot()['segments'] == fresh.snapshot()['segments']
+
+def test_idle_sessions_expire_on_the_next_request(monkeypatch):
+    monkeypatch.setattr(app, 'live_sessions', app.OrderedDict())
+    idle, active = app.LiveSession(), app.LiveSession()
+    app.live_sessions.update(idle=idle, active=active)
+    idle.touched -= app.LIVE_SESSION_TTL
+    assert app.get_live_session('active') is active
+    assert 'idle' not in app.live_sessions
+    assert idle.events.get_nowait() is None
@@ -0,0 +1,21 @@
+"""Parsing JSX expressions and attributes"""
+import pytest
+
+import app
+
+@pytest.mark.parametrize('code, expected', [
+    ("<b className={isActive ? 'filter-btn active' : 'filter-btn'}>Go</b>", '<b class="filter-btn active">Go</b>'),
+    ('<b className={yearly ? "label" : "label active"}>Go</b>', '<b class="label">Go</b>'),
+    ("<b className={open && 'menu-open'}>Go</b>", '<b class="menu-open">Go</b>'),
+    ("<b className={a && b && 'both'}>Go</b>", '<b class="both">Go</b>'),
+    ("<b className={(wide ? 'wide' : 'narrow')}>Go</b>", '<b class="wide">Go</b>'),
+    ("<b className={'plain'}>Go</b>", '<b class="plain">Go</b>'),
+])
+def test_attribute_expressions_resolve_to_a_value(code, expected):
+    assert app.convert_react_to_webflow(code, 'minified') == expected
+
+@pytest.mark.parametrize('operators', [10, 10000])
+def test_operator_dense_expressions(operators):
+    expression = ''.join(f'a{i % 10}{("==", "/", "<", "?.", "&", "|")[i % 6]}' for i in range(operators)) + 'b'
+    code = f'<div><p title={{{expression}}}>{{{expression}}}</p><span>after</span></div>'
+    assert app.convert_react_to_webflow(code, 'minified') == '<div><p title=""></p><span>after</span></div>'
@@ -0,0 +1,41 @@
+"""Project conversion uploads"""
+import io
+import zipfile
+
+import pytest
+
+import app
+
+COMPONENT = 'export default function App() { return <div className="app">Hello</div>; }\n'
+
+def project_zip(files):
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for path, source in files.items():
+            archive.writestr(path, source)
+    return data.getvalue()
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+def test_reads_components_from_a_zip():
+    assert app.read_project_zip(project_zip({'src/App.jsx': COMPONENT, 'README.md': '# App'})) == {
+        'src/App.jsx': COMPONENT}
+
+@pytest.mark.parametrize('offset', range(30, 60, 3))
+def test_corrupt_zip_members_are_bad_requests(client, offset):
+    data = bytearray(project_zip({'App.jsx': COMPONENT * 20}))
+    data[offset] ^= 0xff
+    response = client.post('/convert/project', data=bytes(data), content_type='application/zip')
+    assert response.status_code == 400
+    assert 'zip archive' in response.get_json()['error']
+
+def test_not_a_zip_is_a_bad_request(client):
+    response = client.post('/convert/project', data=b'not a zip', content_type='application/zip')
+    assert response.status_code == 400
+
+def test_upload_without_a_filename_is_a_bad_request(client):
+    response = client.post('/convert/project', data={'project': (io.BytesIO(b'x'), '')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 400
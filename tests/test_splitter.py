@@ -0,0 +1,44 @@
+"""Splitting streamed sources into top-level declarations"""
+import pytest
+
+import app
+
+SOURCE = '''const open = "(";
+const close = ')';
+const pattern = `[${open}`;
+
+// A comment with an unbalanced ( bracket
+function Hint() {
+  /* } */
+  return <p className="hint">( optional, see [notes</p>;
+}
+
+function Note() {
+  return (
+    <div>
+      <span>{"}"}</span> :)
+    </div>
+  );
+}
+'''
+
+def chunks(text, size):
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 100, 65536])
+def test_brackets_in_strings_comments_and_text_are_not_counted(chunk_size):
+    sources = [source for source, _ in app.split_components(chunks(SOURCE, chunk_size))]
+    assert [source.strip().split('\n')[-1] for source in sources] == [
+        'const open = "(";',
+        "const close = ')';",
+        'const pattern = `[${open}`;',
+        '}',
+        '}',
+    ]
+    assert 'function Hint()' in sources[3]
+    assert 'function Note()' in sources[4]
+
+def test_oversized_declarations_are_dropped():
+    sources = list(app.split_components(chunks(SOURCE, 7), max_size=40))
+    assert [source is None for source, _ in sources] == [False, False, False, True, True]
+    assert sum(size for _, size in sources) == len(SOURCE)
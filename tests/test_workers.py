@@ -0,0 +1,41 @@
+"""Conversion worker processes and the shared batch pool"""
+import os
+import threading
+import time
+
+import app
+
+def pool_job(kind):
+    """A batch job that succeeds, hangs, kills its worker or raises without a message"""
+    if kind == 'hang':
+        time.sleep(60)
+    elif kind == 'crash':
+        os._exit(1)
+    elif kind == 'raise':
+        raise ValueError()
+    return {'converted_code': kind}
+
+def test_failing_jobs_do_not_affect_concurrent_requests(monkeypatch):
+    monkeypatch.setattr(app, 'batch_workers', app.ConversionWorkers(3, 1, app.CONVERT_MEMORY_LIMIT))
+    failing = [None] * 3
+    concurrent = [None] * 4
+
+    def other_request():
+        app.run_in_pool(pool_job, [(index, ('ok',)) for index in range(4)], concurrent)
+
+    thread = threading.Thread(target=other_request)
+    thread.start()
+    app.run_in_pool(pool_job, [(0, ('hang',)), (1, ('crash',)), (2, ('ok',))], failing)
+    thread.join()
+
+    assert 'time budget' in failing[0]['error']
+    assert 'exited unexpectedly' in failing[1]['error']
+    assert failing[2] == {'converted_code': 'ok'}
+    assert concurrent == [{'converted_code': 'ok'}] * 4
+
+def test_failed_jobs_report_an_error_message(monkeypatch):
+    monkeypatch.setattr(app, 'batch_workers', app.ConversionWorkers(1, 5, app.CONVERT_MEMORY_LIMIT))
+    results = [None] * 2
+    app.run_in_pool(pool_job, [(0, ('raise',)), (1, ('ok',))], results)
+    assert results[0] == {'error': 'Conversion failed with Exception'}
+    assert results[1] == {'converted_code': 'ok'}